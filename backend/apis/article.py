@@ -1,13 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status as fast_status, Query, Body
+from fastapi.responses import StreamingResponse
 from core.integrations.supabase.auth import get_current_user
 from core.articles import article_repo
+from core.articles.repo import ARTICLE_PROJECTIONS
 from core.feeds import feed_repo
 from core.integrations.supabase.storage import supabase_storage_articles
+from core.integrations.supabase.keyset import InvalidCursorError, next_cursor
+from core.articles.search import keyword_terms, highlight_row
+from core.articles import cleaning
+from core.articles.retention import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_RETENTION_DAYS,
+    retention_job,
+)
+from core.export import (
+    EXPORT_FORMATS,
+    MEDIA_TYPES,
+    export_articles,
+    parquet_available,
+    parse_day_range,
+)
 from schemas import success_response, error_response, format_search_kw
 from core.common.log import logger
 from typing import Optional, List, Dict, Any, cast
 import re
-from datetime import datetime, timedelta, timezone
 
 router = APIRouter(prefix=f"/articles", tags=["文章管理"])
 
@@ -79,43 +95,50 @@ async def _safe_delete_article_image_mapping(article_id: str) -> None:
         logger.warning(f"删除文章图片映射失败 article_id={article_id}: {e}")
 
 
-async def _safe_delete_article_image_mappings(article_ids: List[str]) -> None:
-    ids = [str(i).strip() for i in (article_ids or []) if str(i).strip()]
-    if not ids:
-        return
-    try:
-        await article_repo.delete_article_images_by_articles(ids)
-    except Exception as e:
-        logger.warning(f"批量删除文章图片映射失败 count={len(ids)}: {e}")
-
-
 @router.get("", summary="获取文章列表")
 async def get_articles(
     mp_id: Optional[str] = Query(None),
     offset: int = Query(0, ge=0),
     limit: int = Query(5, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，传入后忽略 offset"),
+    search: Optional[str] = Query(None, description="全文检索关键词，空格为且、| 为或"),
     _current_user: dict = Depends(get_current_user),
 ):
     try:
-        articles_raw = await article_repo.get_articles(
-            mp_id=mp_id,
-            limit=limit,
-            offset=offset,
-            order_by="publish_time.desc",
-        )
-        # 显式标注类型，便于静态类型检查
-        articles: List[Dict[str, Any]] = cast(List[Dict[str, Any]], articles_raw)
+        if search and search.strip():
+            # 检索模式：按相关度排序，附带 title_highlight / snippet
+            hits = await article_repo.search_articles(
+                search, mp_id=mp_id, limit=limit, cursor=cursor, offset=offset
+            )
+            terms = keyword_terms(search)
+            articles: List[Dict[str, Any]] = [highlight_row(h, terms) for h in hits]
+            total = await article_repo.count_search_articles(search, mp_id=mp_id)
+            cursor_next = next_cursor(articles, limit, "rank", "id")
+        else:
+            articles_raw = await article_repo.get_articles(
+                mp_id=mp_id,
+                limit=limit,
+                offset=offset,
+                order_by=article_repo.PAGE_ORDER,
+                cursor=cursor,
+                projection="summary",
+            )
+            # 显式标注类型，便于静态类型检查
+            articles = cast(List[Dict[str, Any]], articles_raw)
 
-        total = await article_repo.count_articles(
-            mp_id=mp_id,
-        )
+            total = await article_repo.count_articles(
+                mp_id=mp_id,
+            )
+            cursor_next = next_cursor(articles, limit, "publish_time", "id")
 
         # 获取相关的feed信息
         mp_ids = {article.get("mp_id") for article in articles}
         mp_names = {}
 
         if mp_ids:
-            feeds_raw = await feed_repo.get_feeds()
+            feeds_raw = await feed_repo.get_feeds(
+                filters={"id": {"in": [i for i in mp_ids if i]}}, columns="id,name"
+            )
             feeds: List[Dict[str, Any]] = cast(List[Dict[str, Any]], feeds_raw)
             for feed in feeds:
                 if feed["id"] in mp_ids:
@@ -128,10 +151,21 @@ async def get_articles(
             article_dict["mp_name"] = mp_names.get(article.get("mp_id"), "未知公众号")
             article_list.append(article_dict)
 
-        return success_response({"list": article_list, "total": total})
+        return success_response(
+            {
+                "list": article_list,
+                "total": total,
+                "next_cursor": cursor_next,
+            }
+        )
 
     except HTTPException as e:
         raise e
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message=str(e)),
+        )
     except Exception as e:
         logger.error(f"获取文章列表失败: {str(e)}")
         raise HTTPException(
@@ -140,6 +174,47 @@ async def get_articles(
         )
 
 
+@router.get("/retention", summary="过期文章清理任务进度")
+async def get_retention_status(_current_user: dict = Depends(get_current_user)):
+    return success_response(retention_job.status())
+
+
+@router.get("/export", summary="流式导出文章（NDJSON / Parquet）")
+async def export_articles_stream(
+    format: str = Query("ndjson", description="ndjson 或 parquet"),
+    projection: str = Query("full", description="summary / with_markdown / full"),
+    mp_id: Optional[str] = Query(None),
+    tag_id: Optional[str] = Query(None),
+    start: Optional[str] = Query(None, description="发布日期起（YYYY-MM-DD）"),
+    end: Optional[str] = Query(None, description="发布日期止（YYYY-MM-DD，含当天）"),
+    _current_user: dict = Depends(get_current_user),
+):
+    # 响应开始流式输出后无法再返回错误码，参数在此提前校验
+    if format not in EXPORT_FORMATS or projection not in ARTICLE_PROJECTIONS:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message="不支持的导出格式或列预设"),
+        )
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=fast_status.HTTP_501_NOT_IMPLEMENTED,
+            detail=error_response(code=50101, message="Parquet 导出需要安装 pyarrow"),
+        )
+    try:
+        parse_day_range(start, end)
+    except ValueError:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message="日期格式应为 YYYY-MM-DD"),
+        )
+
+    return StreamingResponse(
+        export_articles(format, projection, mp_id, tag_id, start, end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="articles.{format}"'},
+    )
+
+
 @router.get("/{article_id}", summary="获取文章详情")
 async def get_article_detail(
     article_id: str,
@@ -171,7 +246,9 @@ async def get_next_article(
 ):
     try:
         # 获取当前文章
-        current_article_rows_raw = await article_repo.get_articles_by_id(article_id)
+        current_article_rows_raw = await article_repo.get_articles_by_id(
+            article_id, projection="id,mp_id,publish_time"
+        )
         current_article_rows: List[Dict[str, Any]] = cast(
             List[Dict[str, Any]], current_article_rows_raw
         )
@@ -181,27 +258,23 @@ async def get_next_article(
                 detail=error_response(code=40401, message="当前文章不存在"),
             )
         current_article = current_article_rows[0]
-        # 获取同一公众号的文章
-        articles_raw = await article_repo.get_articles(
-            mp_id=current_article["mp_id"], order_by="publish_time.desc"
-        )
-        articles: List[Dict[str, Any]] = cast(List[Dict[str, Any]], articles_raw)
 
-        # 找到当前文章的位置
-        current_index = None
-        for i, article in enumerate(articles):
-            if article["id"] == article_id:
-                current_index = i
-                break
+        # 按 (publish_time, id) 取同一公众号中更新的一篇
+        next_article = None
+        if current_article.get("publish_time") is not None:
+            next_article = await article_repo.get_adjacent_article(
+                mp_id=current_article.get("mp_id"),
+                publish_time=current_article["publish_time"],
+                article_id=article_id,
+                newer=True,
+            )
 
-        if current_index is None or current_index == 0:
+        if not next_article:
             raise HTTPException(
                 status_code=fast_status.HTTP_406_NOT_ACCEPTABLE,
                 detail=error_response(code=40402, message="没有下一篇文章"),
             )
 
-        # 返回下一篇文章
-        next_article = articles[current_index - 1]
         return success_response(next_article)
 
     except HTTPException as e:
@@ -220,7 +293,9 @@ async def get_prev_article(
 ):
     try:
         # 获取当前文章
-        current_article_rows_raw = await article_repo.get_articles_by_id(article_id)
+        current_article_rows_raw = await article_repo.get_articles_by_id(
+            article_id, projection="id,mp_id,publish_time"
+        )
         current_article_rows: List[Dict[str, Any]] = cast(
             List[Dict[str, Any]], current_article_rows_raw
         )
@@ -231,27 +306,22 @@ async def get_prev_article(
             )
         current_article = current_article_rows[0]
 
-        # 获取同一公众号的文章
-        articles_raw = await article_repo.get_articles(
-            mp_id=current_article["mp_id"], order_by="publish_time.desc"
-        )
-        articles: List[Dict[str, Any]] = cast(List[Dict[str, Any]], articles_raw)
-
-        # 找到当前文章的位置
-        current_index = None
-        for i, article in enumerate(articles):
-            if article["id"] == article_id:
-                current_index = i
-                break
+        # 按 (publish_time, id) 取同一公众号中更旧的一篇
+        prev_article = None
+        if current_article.get("publish_time") is not None:
+            prev_article = await article_repo.get_adjacent_article(
+                mp_id=current_article.get("mp_id"),
+                publish_time=current_article["publish_time"],
+                article_id=article_id,
+                newer=False,
+            )
 
-        if current_index is None or current_index >= len(articles) - 1:
+        if not prev_article:
             raise HTTPException(
                 status_code=fast_status.HTTP_406_NOT_ACCEPTABLE,
                 detail=error_response(code=40403, message="没有上一篇文章"),
             )
 
-        # 返回上一篇文章
-        prev_article = articles[current_index + 1]
         return success_response(prev_article)
 
     except HTTPException as e:
@@ -265,26 +335,21 @@ async def get_prev_article(
 
 
 @router.delete("/clean_expired", summary="清理过期文章(删除15天前的publish_time)")
-async def clean_expired_articles(_current_user: dict = Depends(get_current_user)):
+async def clean_expired_articles(
+    days: int = Query(DEFAULT_RETENTION_DAYS, ge=1),
+    batch_size: int = Query(DEFAULT_BATCH_SIZE, ge=1, le=1000),
+    resume: bool = Query(False, description="沿用上次未完成任务的截止时间续跑（忽略 days）"),
+    _current_user: dict = Depends(get_current_user),
+):
     try:
-        cutoff_ts = int((datetime.now(timezone.utc) - timedelta(days=15)).timestamp())
-        expired_rows_raw = await article_repo.get_articles_base(
-            filters={"publish_time": {"lt": cutoff_ts}}
-        )
-        expired_rows: List[Dict[str, Any]] = cast(List[Dict[str, Any]], expired_rows_raw)
-        article_ids = [str(row.get("id")) for row in expired_rows if row.get("id")]
-
-        storage_deleted_count = 0
-        for article in expired_rows:
-            storage_deleted_count += await _delete_article_storage_objects(article)
-
-        deleted_count = await article_repo.clean_expired_articles(days=15)
-        await _safe_delete_article_image_mappings(article_ids)
+        # 后台分批执行，立即返回任务进度；进度查询 GET /articles/retention
+        state = retention_job.start(days=days, batch_size=batch_size, resume=resume)
         return success_response(
             {
-                "message": "清理过期文章成功",
-                "deleted_count": deleted_count,
-                "storage_deleted_count": storage_deleted_count,
+                "message": "清理过期文章任务已启动",
+                "deleted_count": state.get("deleted_articles", 0),
+                "storage_deleted_count": state.get("deleted_objects", 0),
+                "job": state,
             }
         )
     except Exception as e:
@@ -296,31 +361,18 @@ async def clean_expired_articles(_current_user: dict = Depends(get_current_user)
 
 
 @router.delete("/clean", summary="清理无效文章(MP_ID不存在于Feeds表中的文章)")
-async def clean_orphan_articles(_current_user: dict = Depends(get_current_user)):
+async def clean_orphan_articles(
+    batch_size: int = Query(500, ge=1, le=1000),
+    _current_user: dict = Depends(get_current_user),
+):
     try:
-        # 获取所有有效的feed ID
-        feeds_raw = await feed_repo.get_feeds()
-        feeds: List[Dict[str, Any]] = cast(List[Dict[str, Any]], feeds_raw)
-        valid_feed_ids = {feed["id"] for feed in feeds}
-
-        # 获取所有文章
-        articles_raw = await article_repo.get_articles()
-        articles: List[Dict[str, Any]] = cast(List[Dict[str, Any]], articles_raw)
-
-        deleted_count = 0
-        storage_deleted_count = 0
-        for article in articles:
-            if article["mp_id"] not in valid_feed_ids:
-                storage_deleted_count += await _delete_article_storage_objects(article)
-                await article_repo.delete_article(article["id"])
-                await _safe_delete_article_image_mapping(str(article["id"]))
-                deleted_count += 1
-
+        report = await cleaning.clean_orphan_articles(batch_size=batch_size)
         return success_response(
             {
                 "message": "清理无效文章成功",
-                "deleted_count": deleted_count,
-                "storage_deleted_count": storage_deleted_count,
+                "deleted_count": report["deleted"],
+                "storage_deleted_count": report["storage_deleted"],
+                "report": report,
             }
         )
     except Exception as e:
@@ -332,12 +384,19 @@ async def clean_orphan_articles(_current_user: dict = Depends(get_current_user))
 
 
 @router.delete("/clean_duplicate_articles", summary="清理重复文章")
-async def clean_duplicate(_current_user: dict = Depends(get_current_user)):
+async def clean_duplicate(
+    batch_size: int = Query(500, ge=1, le=1000),
+    _current_user: dict = Depends(get_current_user),
+):
     try:
-        from core.articles.cleaning import clean_duplicate_articles
-
-        (msg, deleted_count) = clean_duplicate_articles()
-        return success_response({"message": msg, "deleted_count": deleted_count})
+        report = await cleaning.clean_duplicate_articles_report(batch_size=batch_size)
+        return success_response(
+            {
+                "message": f"已清理 {report['deleted']} 篇重复文章",
+                "deleted_count": report["deleted"],
+                "report": report,
+            }
+        )
     except Exception as e:
         logger.error(f"清理重复文章: {str(e)}")
         raise HTTPException(
@@ -359,7 +418,10 @@ async def delete_articles_batch(
                 detail=error_response(code=40001, message="article_ids 不能为空"),
             )
 
-        rows_raw = await article_repo.get_articles_base(filters={"id": {"in": ids}})
+        # content 仅用于映射缺失时从正文提取图片路径
+        rows_raw = await article_repo.get_articles_base(
+            filters={"id": {"in": ids}}, projection="id,content"
+        )
         rows: List[Dict[str, Any]] = cast(List[Dict[str, Any]], rows_raw)
         rows_by_id = {str(r.get("id")): r for r in rows}
 
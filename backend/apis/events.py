@@ -1,7 +1,7 @@
 import os
 import re
 import json
-import requests
+import time
 from typing import Tuple
 from fastapi import (
     APIRouter,
@@ -9,20 +9,49 @@ from fastapi import (
     HTTPException,
     Query,
     Body,
+    Response,
     status as fast_status,
 )
+from fastapi.responses import StreamingResponse
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta, timezone
 from core.integrations.supabase.auth import get_current_user
 from core.articles import article_repo
+from core.articles.content_format import format_content
 from core.events import event_repo
+from core.export import (
+    EXPORT_FORMATS,
+    MEDIA_TYPES,
+    export_events,
+    parquet_available,
+    parse_day_range,
+)
 from schemas import success_response, error_response, EventCreate, EventUpdate
+from core.integrations.supabase.keyset import InvalidCursorError, next_cursor
 from core.common.log import logger
+from core.common.metrics import counter, histogram
 
 
 router = APIRouter(prefix="/events", tags=["活动"])
 
-
+LLM_SECONDS = histogram(
+    "llm_request_duration_seconds", "活动抽取 LLM 请求耗时", ["model", "outcome"]
+)
+LLM_TOKENS = counter("llm_tokens_total", "活动抽取 LLM token 用量", ["model", "kind"])
+
+
+async def _article_markdown(art: Dict[str, Any]) -> str:
+    """LLM 分析用正文：优先 content_md，为空时取 HTML 正文现转 Markdown"""
+    if art.get("content_md"):
+        return art["content_md"]
+    rows = await article_repo.get_articles_by_id(art["id"], projection="full")
+    content = (rows[0].get("content") if rows else None) or ""
+    if not content:
+        return ""
+    logger.warning(
+        f"[events.fetch] content_md empty, fallback to html article_id={art['id']}"
+    )
+    return format_content(content, "markdown")
 
 
 def _get_date_range(scope: str):
@@ -41,6 +70,8 @@ def _get_date_range(scope: str):
 def _analyze_article_by_llm(
     title: str, content: Optional[str], default_url: Optional[str]
 ) -> Dict[str, Any]:
+    import requests
+
     api_base = os.getenv(
         "LLM_API_BASE", "https://api.siliconflow.cn/v1/chat/completions"
     )
@@ -129,7 +160,15 @@ def _analyze_article_by_llm(
     )
 
     try:
-        resp = requests.post(api_base, headers=headers, json=payload, timeout=600)
+        start = time.perf_counter()
+        try:
+            resp = requests.post(api_base, headers=headers, json=payload, timeout=600)
+        except Exception:
+            LLM_SECONDS.observe(time.perf_counter() - start, model=model, outcome="error")
+            raise
+        LLM_SECONDS.observe(
+            time.perf_counter() - start, model=model, outcome=str(resp.status_code)
+        )
         logger.debug(
             "[events.llm] response "
             f"status={resp.status_code}, elapsed={getattr(resp, 'elapsed', None)}"
@@ -139,6 +178,10 @@ def _analyze_article_by_llm(
         # 尝试解析 JSON
         data = resp.json()
         logger.debug(f"[events.llm] resp_json_keys={list(data.keys())}")
+        usage = data.get("usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if isinstance(usage.get(kind), int):
+                LLM_TOKENS.inc(usage[kind], model=model, kind=kind.split("_")[0])
 
         content_text = (data.get("choices", [{}])[0].get("message", {}) or {}).get(
             "content", ""
@@ -329,18 +372,22 @@ async def fetch_events(
                 f"[events.fetch] date_range: {start.isoformat()} ~ {end.isoformat()}"
             )
 
-        # 获取文章列表
+        # 获取文章列表（只取分析需要的列，正文用 markdown，不拉 HTML）
         if start and end:
-            articles = await article_repo.get_articles(
-                date_range=(start, end), limit=limit
+            articles = await article_repo.get_articles_by_time_range(
+                start, end, limit=limit, projection="with_markdown"
             )
         else:
-            articles = await article_repo.get_articles(limit=limit)
+            articles = await article_repo.get_articles(
+                limit=limit, projection="with_markdown"
+            )
 
         logger.info(f"[events.fetch] scanned_articles={len(articles)}")
 
-        # 获取已存在的活动文章ID
-        existing_ids = set(await event_repo.get_event_article_ids())
+        # 获取已存在的活动文章ID（限定在本次扫描的文章内）
+        existing_ids = set(
+            await event_repo.get_event_article_ids([a["id"] for a in articles])
+        )
         logger.info(f"[events.fetch] existing_events={len(existing_ids)}")
 
         created, updated = [], []
@@ -356,8 +403,14 @@ async def fetch_events(
                 f"url={art.get('url')}"
             )
 
+            content_md = await _article_markdown(art)
+            if not content_md:
+                logger.warning(
+                    f"[events.fetch] skip article without content article_id={art['id']}"
+                )
+                continue
             analysis = _analyze_article_by_llm(
-                art.get("title"), art.get("content"), art.get("url")
+                art.get("title"), content_md, art.get("url")
             )
             logger.debug(
                 f"[events.fetch] analysis article_id={art['id']} -> {analysis}"
@@ -405,7 +458,10 @@ async def create_event(
         updated_at = payload.updated_at or now
 
         # 统一从文章库获取URL
-        art = await article_repo.get_articles_by_id(payload.article_id)
+        art_rows = await article_repo.get_articles_by_id(
+            payload.article_id, projection="summary"
+        )
+        art = art_rows[0] if art_rows else None
         if not art:
             raise HTTPException(
                 status_code=fast_status.HTTP_400_BAD_REQUEST,
@@ -439,16 +495,27 @@ async def create_event(
 
 @router.get("", summary="查询活动记录列表")
 async def list_events(
+    response: Response,
     article_id: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor，传入后忽略 offset"),
     _current_user: dict = Depends(get_current_user),
 ):
     try:
         events = await event_repo.get_events(
-            article_id=article_id, limit=limit, offset=offset
+            article_id=article_id, limit=limit, offset=offset, cursor=cursor
         )
+        # 保持列表响应结构不变，下一页游标通过响应头返回
+        cursor_next = next_cursor(events or [], limit, "created_at", "id")
+        if cursor_next:
+            response.headers["X-Next-Cursor"] = cursor_next
         return success_response(events)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message=str(e)),
+        )
     except Exception as e:
         logger.exception(f"[events.list] failed: {e}")
         raise HTTPException(
@@ -457,6 +524,41 @@ async def list_events(
         )
 
 
+@router.get("/export", summary="流式导出活动记录（NDJSON / Parquet）")
+async def export_events_stream(
+    format: str = Query("ndjson", description="ndjson 或 parquet"),
+    mp_id: Optional[str] = Query(None),
+    tag_id: Optional[str] = Query(None),
+    start: Optional[str] = Query(None, description="创建日期起（YYYY-MM-DD）"),
+    end: Optional[str] = Query(None, description="创建日期止（YYYY-MM-DD，含当天）"),
+    _current_user: dict = Depends(get_current_user),
+):
+    # 响应开始流式输出后无法再返回错误码，参数在此提前校验
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message=f"不支持的导出格式: {format}"),
+        )
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=fast_status.HTTP_501_NOT_IMPLEMENTED,
+            detail=error_response(code=50101, message="Parquet 导出需要安装 pyarrow"),
+        )
+    try:
+        parse_day_range(start, end)
+    except ValueError:
+        raise HTTPException(
+            status_code=fast_status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message="日期格式应为 YYYY-MM-DD"),
+        )
+
+    return StreamingResponse(
+        export_events(format, mp_id, tag_id, start, end),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="events.{format}"'},
+    )
+
+
 @router.get("/{event_id}", summary="获取活动记录详情")
 async def get_event(
     event_id: str,
@@ -511,7 +613,10 @@ async def update_event(
             update_data["registration_title"] = payload.registration_title
 
         # 每次更新都从文章库刷新一次URL（保证一致性）
-        art = await article_repo.get_articles_by_id(evt["article_id"])
+        art_rows = await article_repo.get_articles_by_id(
+            evt["article_id"], projection="summary"
+        )
+        art = art_rows[0] if art_rows else None
         update_data["article_url"] = (art.get("url") if art else None) or "无"
 
         # 时间字段更新（允许覆盖created_at；若未提供updated_at则写当前时间）
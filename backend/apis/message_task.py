@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from datetime import datetime
 from typing import List, Optional
@@ -205,7 +206,8 @@ async def fresh_message_task(current_user: dict = Depends(get_current_user)):
     """重载任务"""
     from jobs.wechat_accounts import reload_job
 
-    reload_job()
+    # 重载会同步读取 Supabase，放到线程中执行；开启选主时非主节点只通知主节点重载
+    await asyncio.to_thread(reload_job)
     return success_response(message="任务已经重载成功")
 
 
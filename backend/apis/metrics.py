@@ -0,0 +1,44 @@
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
+
+from core.common.app_settings import settings
+from core.common.metrics import CONTENT_TYPE, gauge, render
+from core.common.utils.task_queue import get_all_queue_info
+from schemas import error_response
+
+router = APIRouter(tags=["监控"])
+
+QUEUE_DEPTH = gauge("task_queue_depth", "任务队列中的任务数", ["queue", "state"])
+QUEUE_OLDEST_PENDING = gauge(
+    "task_queue_oldest_pending_age_seconds", "最早一个待执行任务的等待时长", ["queue"]
+)
+
+
+def _queue_depth():
+    for name, info in get_all_queue_info().items():
+        for state in ("pending", "ready", "running", "dead"):
+            yield {"queue": name, "state": state}, info.get(f"{state}_tasks")
+
+
+def _queue_oldest_pending():
+    for name, info in get_all_queue_info().items():
+        yield {"queue": name}, info.get("oldest_pending_age_s") or 0
+
+
+QUEUE_DEPTH.set_function(_queue_depth)
+QUEUE_OLDEST_PENDING.set_function(_queue_oldest_pending)
+
+
+@router.get("/metrics", summary="Prometheus 指标", include_in_schema=False)
+async def metrics(request: Request):
+    # 配置了 METRICS_TOKEN 时要求 Bearer 认证，未配置则开放（由网络层控制访问）
+    if settings.metrics_token:
+        auth = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(auth, f"Bearer {settings.metrics_token}"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=error_response(code=40101, message="无效的指标访问令牌"),
+            )
+    return Response(render(), media_type=CONTENT_TYPE)
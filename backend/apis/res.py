@@ -1,96 +1,57 @@
-from fastapi import APIRouter, Request, HTTPException
+from urllib.parse import urlparse
+
 import httpx
-from fastapi.responses import Response
-import os
-import hashlib
-import time
-import json
-from core.common.app_settings import settings
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response
+
 from core.common.log import logger
+from core.common.res.image_cache import image_cache
 
-CACHE_DIR = settings.cache_dir
-CACHE_TTL = 3600  # 缓存过期时间1小时
+router = APIRouter(prefix="/res", tags=["资源反向代理"])
 
-if not os.path.exists(CACHE_DIR):
-    os.makedirs(CACHE_DIR)
+ALLOWED_HOSTS = ("mmbiz.qpic.cn", "mmbiz.qlogo.cn", "mmecoa.qpic.cn")
 
-router = APIRouter(prefix="/res", tags=["资源反向代理"])
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
 
 
 @router.get("/logo/{path:path}", operation_id="reverse_proxy_logo")
 async def reverse_proxy(request: Request, path: str):
-    hosts = ["mmbiz.qpic.cn", "mmbiz.qlogo.cn", "mmecoa.qpic.cn"]
     path = path.replace("https://", "http://")
-    from urllib.parse import urlparse
-
-    parsed_url = urlparse(path)
-    host = parsed_url.netloc
-    if host not in hosts:
+    host = urlparse(path).netloc
+    if host not in ALLOWED_HOSTS:
         return Response(
             content="只允许访问微信公众号图标，请使用正确的域名。",
             status_code=301,
             headers={"Location": path},
         )
 
-    # 生成缓存文件名
-    cache_key = f"{request.method}_{path}".encode("utf-8")
-    cache_filename = os.path.join(CACHE_DIR, hashlib.sha256(cache_key).hexdigest())
-
-    # 检查缓存是否存在且有效
-    if os.path.exists(cache_filename):
-        file_mtime = os.path.getmtime(cache_filename)
-        if time.time() - file_mtime < CACHE_TTL:
-            with open(cache_filename, "rb") as f:
-                content = f.read()
-
-            # 读取缓存的状态码和响应头
-            headers_filename = cache_filename + ".headers"
-            if os.path.exists(headers_filename):
-                with open(headers_filename, "r", encoding="utf-8") as f:
-                    headers = json.load(f)
-            else:
-                headers = {}
-
-            media_type = headers.get("Content-Type")
-            status_code = 200  # 默认状态码
-
-            return Response(
-                content=content,
-                status_code=status_code,
-                headers=headers,
-                media_type=media_type,
-            )
-
-    target_url = path
-
-    client = httpx.AsyncClient()
-    request_data = await request.body()
-    headers = dict(request.headers)
-    headers.pop("host", host)
-    headers.pop("referer", None)
-    logger.info(headers)
-    resp = await client.request(
-        method=request.method,
-        url=target_url,
-        # headers=headers,
-        content=request_data,
-    )
-
-    content = resp.content
-    status_code = resp.status_code
-    headers = dict(resp.headers)
-    media_type = resp.headers.get("Content-Type")
+    # Range 请求交给 FileResponse 处理，不预先读出内容
+    inline = "range" not in request.headers
     try:
-        # 缓存响应
-        with open(cache_filename, "wb") as f:
-            f.write(content)
-
-        # 缓存响应头
-        headers_filename = cache_filename + ".headers"
-        with open(headers_filename, "w", encoding="utf-8") as f:
-            json.dump(headers, f)
-    except Exception as e:
-        logger.info(f"缓存响应失败: {str(e)}")
-    return Response(
-        content=content, status_code=status_code, headers=headers, media_type=media_type
+        item = await image_cache.get(path, inline=inline)
+    except httpx.HTTPError as e:
+        logger.warning(f"图片回源失败 {path}: {e}")
+        return Response(content="图片获取失败", status_code=502)
+
+    if item.status_code != 200:
+        return Response(content=item.content, status_code=item.status_code, media_type=item.content_type)
+
+    headers = {**item.headers, "Cache-Control": f"public, max-age={image_cache.ttl}"}
+    if _etag_matches(request.headers.get("if-none-match", ""), item.etag):
+        return Response(status_code=304, headers=headers)
+    if item.path is None or (inline and item.content is not None):
+        # 小文件（或未落盘的内容）直接返回
+        return Response(content=item.content, headers=headers, media_type=item.content_type)
+    # FileResponse 自行处理 Range / If-Range，按块（或 sendfile）发送文件
+    return FileResponse(
+        item.path,
+        headers=headers,
+        media_type=item.content_type,
+        stat_result=item.stat,
     )
@@ -6,9 +6,12 @@ from typing import Dict, Any
 from core.integrations.supabase.auth import get_current_user
 from schemas import success_response, error_response, API_VERSION
 from core.common.app_settings import settings
-from jobs.wechat_accounts import TaskQueue
-from driver.wx.service import get_state as wx_get_state, get_session_info as wx_get_session_info
-from driver.wx.state import LoginState
+from core.common.utils.task_queue import get_all_queue_info
+from core.integrations.notice import notice_dispatcher
+from core.common.res.image_cache import image_cache
+from core.common.base import VERSION as CORE_VERSION, get_latest_version
+
+# 调度器（jobs）、公众号驱动（Playwright）与 psutil 在接口内按需导入，不拖慢服务启动
 
 
 router = APIRouter(prefix="/sys", tags=["系统信息"])
@@ -20,8 +23,6 @@ _START_TIME = time.time()
 @router.get("/base_info", summary="常规信息")
 async def get_base_info() -> Dict[str, Any]:
     try:
-        from core.common.base import VERSION as CORE_VERSION, LATEST_VERSION
-
         base_info = {
             "api_version": API_VERSION,
             "core_version": CORE_VERSION,
@@ -38,9 +39,6 @@ async def get_base_info() -> Dict[str, Any]:
         )
 
 
-from core.common.resource import get_system_resources
-
-
 @router.get("/resources", summary="获取系统资源使用情况")
 async def system_resources(
     current_user: dict = Depends(get_current_user),
@@ -54,8 +52,22 @@ async def system_resources(
         - disk: 磁盘使用情况
     """
     try:
+        from core.common.resource import get_system_resources
+        from core.integrations.wx.context import session_context
+        from core.integrations.wx.transport import wx_transport
+        from jobs.wechat_accounts import TaskQueue
+
         resources_info = get_system_resources()
         resources_info["queue"] = TaskQueue.get_queue_info()
+        # 各命名队列：运行/等待数量与执行延迟（avg / p95）
+        resources_info["queues"] = get_all_queue_info()
+        # 通知发件箱：待发送 / 发送中 / 放弃的消息数
+        resources_info["notice"] = notice_dispatcher.get_info()
+        resources_info["image_cache"] = image_cache.get_info()
+        # 公众号请求上下文缓存：加载代数与是否持有 Cookie / token
+        resources_info["wx_context"] = session_context.get_info()
+        # 公众号平台共用连接池：各主机请求数、新建连接数与连接复用率
+        resources_info["wx_http"] = wx_transport.get_info()
         return success_response(data=resources_info)
     except Exception as e:
         raise HTTPException(
@@ -64,10 +76,6 @@ async def system_resources(
         )
 
 
-from core.articles.lax import laxArticle
-from schemas import API_VERSION
-from core.common.base import VERSION as CORE_VERSION, LATEST_VERSION
-
 # TODO : 后面优化这个接口，改成异步的
 
 @router.get("/info", summary="获取系统信息")
@@ -84,7 +92,12 @@ def get_system_info(
         - system: 系统详细信息
     """
     try:
+        from core.articles.lax import laxArticle
+        from driver.wx.service import get_state as wx_get_state, get_session_info as wx_get_session_info
+        from driver.wx.state import LoginState
+        from jobs.wechat_accounts import TaskQueue
 
+        latest_version = get_latest_version()
         # 获取系统信息
         system_info = {
             "os": {
@@ -101,8 +114,8 @@ def get_system_info(
             },
             "api_version": API_VERSION,
             "core_version": CORE_VERSION,
-            "latest_version": LATEST_VERSION,
-            "need_update": CORE_VERSION != LATEST_VERSION,
+            "latest_version": latest_version,
+            "need_update": CORE_VERSION != latest_version,
             "wx": {
                 # 是否已登录公众号后台（基于 Wx/SessionManager 的统一状态机）
                 "login": wx_get_state().get("state") == LoginState.SUCCESS.value,
@@ -16,13 +16,12 @@ from fastapi.responses import FileResponse
 from fastapi.background import BackgroundTasks
 from core.integrations.supabase.auth import get_current_user
 from core.feeds import feed_repo
+from core.integrations.supabase.keyset import InvalidCursorError, next_cursor
 from core.feeds.collector import collect_feed_articles
-from core.integrations.wx import search_Biz
 from schemas import success_response, error_response
 from core.common.log import logger
 from core.common.runtime_settings import runtime_settings
 from core.common.res import save_avatar_locally
-from jobs.article import UpdateArticle
 
 
 router = APIRouter(prefix="/wechat-accounts", tags=["公众号管理"])
@@ -54,6 +53,8 @@ async def search_mp(
     _current_user: dict = Depends(get_current_user),
 ):
     try:
+        from core.integrations.wx import search_Biz
+
         result = search_Biz(kw, limit=limit, offset=offset)
         data = {
             "list": result.get("list") if result is not None else [],
@@ -78,6 +79,7 @@ async def list_wechat_accounts(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     kw: str = Query(""),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor，传入后忽略 offset"),
     _current_user: dict = Depends(get_current_user),
 ):
     try:
@@ -90,9 +92,14 @@ async def list_wechat_accounts(
 
         # 获取分页数据
         feeds_raw = await feed_repo.get_feeds(
-            filters=filters, limit=limit, offset=offset, order_by="created_at"
+            filters=filters,
+            limit=limit,
+            offset=offset,
+            order_by="created_at.asc,id.asc",
+            cursor=cursor,
         )
         feeds: List[Dict[str, Any]] = cast(List[Dict[str, Any]], feeds_raw)
+        cursor_next = next_cursor(feeds, limit, "created_at", "id")
 
         return success_response(
             {
@@ -100,10 +107,21 @@ async def list_wechat_accounts(
                     _feed_to_api(feed)
                     for feed in feeds
                 ],
-                "page": {"limit": limit, "offset": offset, "total": total},
+                "page": {
+                    "limit": limit,
+                    "offset": offset,
+                    "total": total,
+                    "next_cursor": cursor_next,
+                },
                 "total": total,
+                "next_cursor": cursor_next,
             }
         )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error_response(code=40001, message=str(e)),
+        )
     except Exception as e:
         logger.info(f"获取公众号列表错误: {str(e)}")
         raise HTTPException(
@@ -155,6 +173,8 @@ async def sync_wechat_account_articles(
                     data={"time_span": time_span},
                 ),
             )
+        from jobs.article import UpdateArticle
+
         def UpArt(mp_data):
             try:
                 collect_feed_articles(
@@ -0,0 +1,7 @@
+"""性能基准脚本集合。
+
+约定：
+- 每个脚本可单独运行：python -m bench.<name> [--参数]
+- 结果以 JSON 打印到 stdout，便于对比前后改动。
+- bench.offline 使用 bench.fakes 中的本地模拟服务，无需 Supabase 与外网，可在 CI 中运行。
+"""
@@ -0,0 +1,120 @@
+"""上一篇/下一篇导航基准。
+
+对比两种实现（同一公众号下 N 篇文章）：
+- linear: 旧实现，拉取该公众号全部文章后线性查找当前位置
+- keyset: 新实现，(publish_time, id) 两次 keyset 查询，各 limit 1
+
+用法：
+    python -m bench.article_neighbors --articles 50000 --samples 50
+
+会在配置的 Supabase 中写入一个临时公众号及其文章，结束后删除（级联删除文章）。
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from core.articles import article_repo
+from core.feeds import feed_repo
+from core.integrations.supabase.client import supabase_client
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.fmean(values) * 1000, 2) if values else 0,
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+    }
+
+
+async def _seed(mp_id: str, total: int, batch: int = 1000) -> list[dict]:
+    await feed_repo.create_feed({"id": mp_id, "name": f"bench-{mp_id}", "status": 1})
+    base_ts = int(time.time()) - total * 60
+    rows: list[dict] = []
+    for i in range(total):
+        rows.append(
+            {
+                "id": f"{mp_id}_{i}",
+                "mp_id": mp_id,
+                "title": f"bench article {i}",
+                "content": "<p>bench</p>",
+                # 每 10 篇共用一个时间戳，覆盖 publish_time 相同时的 id 兜底排序
+                "publish_time": base_ts + (i // 10) * 60,
+                "url": f"https://example.invalid/{i}",
+            }
+        )
+    for start in range(0, total, batch):
+        await supabase_client.upsert(
+            article_repo.ARTICLE_TABLE, rows[start : start + batch], on_conflict="id"
+        )
+    return rows
+
+
+async def _linear(article: dict) -> None:
+    articles = await article_repo.get_articles(
+        mp_id=article["mp_id"], order_by="publish_time.desc"
+    )
+    for i, row in enumerate(articles):
+        if row["id"] == article["id"]:
+            _ = articles[i - 1] if i > 0 else None
+            _ = articles[i + 1] if i + 1 < len(articles) else None
+            break
+
+
+async def _keyset(article: dict) -> None:
+    for newer in (True, False):
+        await article_repo.get_adjacent_article(
+            mp_id=article["mp_id"],
+            publish_time=article["publish_time"],
+            article_id=article["id"],
+            newer=newer,
+        )
+
+
+async def main(total: int, samples: int, linear_samples: int) -> dict:
+    mp_id = f"BENCH_{uuid.uuid4().hex[:8]}"
+    rows = await _seed(mp_id, total)
+    try:
+        picks = random.sample(rows, min(samples, len(rows)))
+        keyset_times: list[float] = []
+        for art in picks:
+            t0 = time.perf_counter()
+            await _keyset(art)
+            keyset_times.append(time.perf_counter() - t0)
+
+        linear_times: list[float] = []
+        for art in picks[:linear_samples]:
+            t0 = time.perf_counter()
+            await _linear(art)
+            linear_times.append(time.perf_counter() - t0)
+
+        return {
+            "articles": total,
+            "keyset": _summary(keyset_times),
+            "linear": _summary(linear_times),
+        }
+    finally:
+        await feed_repo.delete_feed(mp_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=50000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--linear-samples", type=int, default=5)
+    args = parser.parse_args()
+    result = asyncio.run(main(args.articles, args.samples, args.linear_samples))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,101 @@
+"""文章检索基准。
+
+对比两种实现（N 篇文章，随机中文词表生成标题/正文）：
+- like: 旧实现，search_articles_like（title LIKE %kw%，无法走索引且不搜正文）
+- fts:  新实现，search_vector GIN 索引 + 相关度排序（标题 + 正文）
+
+用法：
+    python -m bench.article_search --articles 100000 --samples 50
+
+会在配置的 Supabase 中写入一个临时公众号及其文章，结束后删除（级联删除文章）。
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+from bench.article_neighbors import _summary
+from core.articles import article_repo
+from core.articles.search import with_search_fields
+from core.feeds import feed_repo
+from core.integrations.supabase.client import supabase_client
+
+WORDS = [
+    "人工智能", "大模型", "开源", "数据库", "公众号", "活动", "报名", "讲座",
+    "招聘", "比赛", "论坛", "年会", "培训", "直播", "新品", "发布会",
+    "志愿者", "展览", "音乐节", "读书会", "编程", "创业", "投资", "医疗",
+]
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return "，".join(rng.choice(WORDS) for _ in range(n))
+
+
+async def _seed(mp_id: str, total: int, batch: int = 1000) -> None:
+    await feed_repo.create_feed({"id": mp_id, "name": f"bench-{mp_id}", "status": 1})
+    rng = random.Random(42)
+    base_ts = int(time.time()) - total * 60
+    for start in range(0, total, batch):
+        rows = [
+            with_search_fields(
+                {
+                    "id": f"{mp_id}_{i}",
+                    "mp_id": mp_id,
+                    "title": _sentence(rng, 3),
+                    "content_md": _sentence(rng, 200),
+                    "publish_time": base_ts + i * 60,
+                    "url": f"https://example.invalid/{i}",
+                }
+            )
+            for i in range(start, min(total, start + batch))
+        ]
+        await supabase_client.upsert(
+            article_repo.ARTICLE_TABLE, rows, on_conflict="id"
+        )
+
+
+async def _timed(fn, keywords: list[str]) -> list[float]:
+    times: list[float] = []
+    for kw in keywords:
+        t0 = time.perf_counter()
+        await fn(kw)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+async def main(total: int, samples: int, limit: int) -> dict:
+    mp_id = f"BENCH_{uuid.uuid4().hex[:8]}"
+    await _seed(mp_id, total)
+    try:
+        rng = random.Random(7)
+        keywords = [
+            " ".join(rng.sample(WORDS, rng.choice((1, 2)))) for _ in range(samples)
+        ]
+        like_times = await _timed(
+            lambda kw: article_repo.search_articles_like(kw, limit=limit), keywords
+        )
+        fts_times = await _timed(
+            lambda kw: article_repo.search_articles(kw, mp_id=mp_id, limit=limit),
+            keywords,
+        )
+        return {
+            "articles": total,
+            "limit": limit,
+            "like": _summary(like_times),
+            "fts": _summary(fts_times),
+        }
+    finally:
+        await feed_repo.delete_feed(mp_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    result = asyncio.run(main(args.articles, args.samples, args.limit))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
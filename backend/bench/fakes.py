@@ -0,0 +1,691 @@
+"""离线基准用的本地模拟服务（仅依赖标准库）。
+
+- FakeSupabase: PostgREST 子集（过滤/or-and 逻辑树/排序/分页/计数/upsert/rpc）+ Storage 对象接口
+- FakeWeixin:   mp.weixin.qq.com 的 appmsg / appmsgpublish / searchbiz 列表、文章页与图片，
+                可配置延迟与 200013 频控注入
+- FakeLLM:      OpenAI 兼容 /v1/chat/completions，返回活动抽取 JSON 与 usage
+
+所有服务监听 127.0.0.1 随机端口，HTTP/1.1 keep-alive，每个请求按路由计数（hits）。
+只模拟本项目用到的语义，不追求与真实服务逐字节一致。
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+Reply = Tuple[int, Dict[str, str], bytes]
+
+
+def _json_reply(status: int, obj: Any, headers: Optional[Dict[str, str]] = None) -> Reply:
+    h = {"Content-Type": "application/json; charset=utf-8"}
+    h.update(headers or {})
+    return status, h, json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+class FakeServer:
+    """后台线程运行的 ThreadingHTTPServer，子类实现 handle() 返回 (status, headers, body)"""
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0.0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.hits: Counter = Counter()
+        # 接受的 TCP 连接数（keep-alive 下一个连接可承载多个请求）
+        self.connections = 0
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        assert self._httpd is not None, "服务未启动"
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self.rng.random()
+
+    def delay(self) -> None:
+        # 0.5~1.5 倍抖动，模拟网络与服务端处理时间
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * (0.5 + self.random()) / 1000)
+
+    def handle(self, method: str, path: str, query: List[Tuple[str, str]], headers, body: bytes) -> Reply:
+        raise NotImplementedError
+
+    def _handler_class(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with owner._rng_lock:
+                    owner.connections += 1
+                super().setup()
+
+            def _dispatch(self):
+                parts = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    status, headers, payload = owner.handle(
+                        self.command,
+                        unquote(parts.path),
+                        parse_qsl(parts.query, keep_blank_values=True),
+                        self.headers,
+                        body,
+                    )
+                except Exception as e:
+                    status, headers, payload = _json_reply(500, {"message": str(e)})
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = do_PUT = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeServer":
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True, name=f"{self.name}-server"
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------------------------------------------------------------------------
+# PostgREST
+# ---------------------------------------------------------------------------
+
+_RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _split_top(expr: str) -> List[str]:
+    """按顶层逗号切分（忽略括号与双引号内的逗号）"""
+    out, buf, depth, quoted, escaped = [], [], 0, False, False
+    for ch in expr:
+        if escaped:
+            buf.append(ch)
+            escaped = False
+            continue
+        if ch == "\\" and quoted:
+            buf.append(ch)
+            escaped = True
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            out.append("".join(buf))
+            buf = []
+            continue
+        buf.append(ch)
+    if buf:
+        out.append("".join(buf))
+    return [s.strip() for s in out if s.strip()]
+
+
+def _unquote_value(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def _coerce(value: str, sample: Any) -> Any:
+    """按行内已有值的类型转换过滤值"""
+    if isinstance(sample, bool):
+        return value.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+    if isinstance(sample, float):
+        return float(value)
+    return value
+
+
+def _like(pattern: str, value: Any, flags: int = 0) -> bool:
+    regex = "^" + ".*".join(re.escape(p) for p in re.split(r"[*%]", pattern)) + "$"
+    return re.match(regex, str(value), flags | re.S) is not None
+
+
+def _get_path(row: Dict[str, Any], column: str) -> Any:
+    # 支持嵌入资源上的过滤，如 articles.mp_id
+    cur: Any = row
+    for part in column.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
+def _match_op(row: Dict[str, Any], column: str, op: str, raw: str) -> bool:
+    negate = False
+    if op.startswith("not."):
+        negate, op = True, op[4:]
+    actual = _get_path(row, column)
+    if op == "is":
+        lowered = raw.lower()
+        result = (actual is None) if lowered == "null" else (actual is (lowered == "true"))
+    elif op == "in":
+        values = [_unquote_value(v) for v in _split_top(raw.strip()[1:-1])]
+        result = actual is not None and actual in [_coerce(v, actual) for v in values]
+    elif op in ("fts", "plfts", "phfts", "wfts"):
+        # 不模拟分词与排序，只做子串包含
+        result = actual is not None and all(t in str(actual) for t in re.split(r"[&|! ]+", raw) if t)
+    else:
+        value = _unquote_value(raw)
+        if op in ("like", "ilike"):
+            result = actual is not None and _like(value, actual, re.I if op == "ilike" else 0)
+        elif actual is None:
+            result = False
+        else:
+            v = _coerce(value, actual)
+            try:
+                result = {
+                    "eq": actual == v,
+                    "neq": actual != v,
+                    "gt": actual > v,
+                    "gte": actual >= v,
+                    "lt": actual < v,
+                    "lte": actual <= v,
+                }[op]
+            except TypeError:
+                result = False
+            except KeyError:
+                raise ValueError(f"不支持的过滤操作: {op}")
+    return not result if negate else result
+
+
+def _parse_logic(expr: str) -> Callable[[Dict[str, Any]], bool]:
+    """解析 or=(a.eq.1,and(b.eq.2,c.lt.3)) 中括号内的单个条件"""
+    m = re.match(r"^(not\.)?(and|or)\((.*)\)$", expr, re.S)
+    if m:
+        negate, kind, inner = bool(m.group(1)), m.group(2), m.group(3)
+        parts = [_parse_logic(p) for p in _split_top(inner)]
+        combine = all if kind == "and" else any
+
+        def node(row):
+            return combine(p(row) for p in parts) != negate
+
+        return node
+    column, rest = expr.split(".", 1)
+    op, raw = rest.split(".", 1)
+    if op == "not":
+        op2, raw = raw.split(".", 1)
+        op = f"not.{op2}"
+    return lambda row: _match_op(row, column, op, raw)
+
+
+def _build_filters(query: List[Tuple[str, str]]) -> List[Callable[[Dict[str, Any]], bool]]:
+    preds = []
+    for key, value in query:
+        if key in _RESERVED_PARAMS:
+            continue
+        if key in ("or", "and", "not.or", "not.and"):
+            preds.append(_parse_logic(f"{key}{value}"))
+            continue
+        op, raw = value.split(".", 1)
+        if op == "not":
+            op2, raw = raw.split(".", 1)
+            op = f"not.{op2}"
+        preds.append(lambda row, k=key, o=op, r=raw: _match_op(row, k, o, r))
+    return preds
+
+
+def _sort_rows(rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+    # 从最后一个排序键开始做稳定排序；默认 asc 时 null 在后、desc 时 null 在前
+    for token in reversed([t for t in order.split(",") if t]):
+        parts = token.split(".")
+        column = parts[0]
+        desc = "desc" in parts[1:]
+        nulls_first = "nullsfirst" in parts[1:] or (desc and "nullslast" not in parts[1:])
+        present = [r for r in rows if _get_path(r, column) is not None]
+        missing = [r for r in rows if _get_path(r, column) is None]
+        present.sort(key=lambda r: _get_path(r, column), reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+class FakeSupabase(FakeServer):
+    """内存版 PostgREST + Storage。
+
+    tables: 表名 -> 行列表；primary_keys 指定主键列（默认 id，缺省时自动生成 uuid）
+    views:  只读表，查询时由函数根据当前数据计算（如 article_counts）
+    rpcs:   函数名 -> fn(fake, params)
+    """
+
+    name = "supabase"
+
+    def __init__(self, latency_ms: float = 0.0, seed: int = 42):
+        super().__init__(latency_ms, seed)
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.primary_keys: Dict[str, Tuple[str, ...]] = {}
+        self.views: Dict[str, Callable[["FakeSupabase"], List[Dict[str, Any]]]] = {}
+        self.rpcs: Dict[str, Callable[["FakeSupabase", Dict[str, Any]], Any]] = {}
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self.lock = threading.RLock()
+
+    # -- 数据准备 ----------------------------------------------------------
+    def seed(self, table: str, rows: List[Dict[str, Any]], primary_key: Tuple[str, ...] = ("id",)) -> None:
+        with self.lock:
+            self.primary_keys[table] = tuple(primary_key)
+            self.tables.setdefault(table, []).extend(dict(r) for r in rows)
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            if table in self.views:
+                return self.views[table](self)
+            return self.tables.setdefault(table, [])
+
+    # -- 路由 --------------------------------------------------------------
+    def handle(self, method, path, query, headers, body) -> Reply:
+        self.delay()
+        if path.startswith("/rest/v1/rpc/"):
+            fn = path[len("/rest/v1/rpc/"):]
+            self.hits[f"rpc:{fn}"] += 1
+            return self._rpc(fn, body)
+        if path.startswith("/rest/v1/"):
+            table = path[len("/rest/v1/"):]
+            self.hits[f"{method} {table}"] += 1
+            return self._rest(method, table, query, headers, body)
+        if path.startswith("/storage/v1/object"):
+            self.hits[f"storage:{method}"] += 1
+            return self._storage(method, path[len("/storage/v1/object"):], body, headers)
+        return _json_reply(404, {"message": f"not found: {path}"})
+
+    def _rpc(self, fn: str, body: bytes) -> Reply:
+        handler = self.rpcs.get(fn)
+        if handler is None:
+            return _json_reply(
+                404, {"code": "PGRST202", "message": f"Could not find the function public.{fn}"}
+            )
+        params = json.loads(body or b"{}")
+        with self.lock:
+            return _json_reply(200, handler(self, params))
+
+    def _project(self, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        columns = _split_top(select or "*")
+        plain = [c for c in columns if "(" not in c]
+        embeds = [c for c in columns if "(" in c]
+        out = []
+        for row in rows:
+            item = dict(row) if "*" in plain else {c: row.get(c) for c in plain}
+            for embed in embeds:
+                name = embed.split("(", 1)[0].split("!", 1)[0].split(":", 1)[-1]
+                if name in row:
+                    item[name] = row[name]
+            out.append(item)
+        return out
+
+    def _embed(self, rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        """多对一嵌入：events.article_id -> articles，按 <单数>_id 外键关联"""
+        embeds = [c for c in _split_top(select or "*") if "(" in c]
+        if not embeds:
+            return rows
+        out = []
+        for row in rows:
+            row = dict(row)
+            keep = True
+            for embed in embeds:
+                head, cols = embed.split("(", 1)
+                name = head.split("!", 1)[0].split(":", 1)[-1]
+                inner = "!inner" in head
+                fk = f"{name.rstrip('s')}_id"
+                target = next((r for r in self.rows(name) if r.get("id") == row.get(fk)), None)
+                if target is None and inner:
+                    keep = False
+                row[name] = self._project([target], cols[:-1])[0] if target else None
+            if keep:
+                out.append(row)
+        return out
+
+    def _rest(self, method, table, query, headers, body) -> Reply:
+        params = dict(query)
+        prefer = headers.get("Prefer") or ""
+        with self.lock:
+            rows = self._embed(self.rows(table), params.get("select", "*"))
+            preds = _build_filters(query)
+            matched = [r for r in rows if all(p(r) for p in preds)]
+
+            if method in ("GET", "HEAD"):
+                total = len(matched)
+                if params.get("order"):
+                    matched = _sort_rows(matched, params["order"])
+                offset = int(params.get("offset") or 0)
+                limit = params.get("limit")
+                page = matched[offset: offset + int(limit)] if limit else matched[offset:]
+                data = self._project(page, params.get("select", "*"))
+                h = {}
+                if "count=" in prefer:
+                    rng = f"{offset}-{offset + len(page) - 1}" if page else "*"
+                    h["Content-Range"] = f"{rng}/{total}"
+                if "vnd.pgrst.object" in (headers.get("Accept") or ""):
+                    if len(data) != 1:
+                        return _json_reply(406, {"code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned"})
+                    return _json_reply(200, data[0], h)
+                return _json_reply(200, data, h)
+
+            if method == "POST":
+                return self._insert(table, params, prefer, json.loads(body or b"[]"))
+            if method == "PATCH":
+                patch = json.loads(body or b"{}")
+                raw = self.rows(table)
+                changed = []
+                for r in raw:
+                    if all(p(r) for p in preds):
+                        r.update(patch)
+                        changed.append(r)
+                return self._write_reply(changed, prefer, params)
+            if method == "DELETE":
+                raw = self.rows(table)
+                keep = [r for r in raw if not all(p(r) for p in preds)]
+                deleted = [r for r in raw if all(p(r) for p in preds)]
+                self.tables[table] = keep
+                return self._write_reply(deleted, prefer, params)
+        return _json_reply(405, {"message": method})
+
+    def _insert(self, table, params, prefer, payload) -> Reply:
+        items = payload if isinstance(payload, list) else [payload]
+        raw = self.rows(table)
+        keys = tuple(
+            c.strip() for c in (params.get("on_conflict") or "").split(",") if c.strip()
+        ) or self.primary_keys.get(table, ("id",))
+        now = datetime.now(timezone.utc).isoformat()
+        written = []
+        for item in items:
+            item = dict(item)
+            if keys == ("id",) and item.get("id") is None:
+                item["id"] = str(uuid.uuid4())
+            item.setdefault("created_at", now)
+            item.setdefault("updated_at", now)
+            existing = next(
+                (r for r in raw if all(r.get(k) == item.get(k) for k in keys)), None
+            )
+            if existing is not None:
+                if "resolution=merge-duplicates" in prefer:
+                    item.pop("created_at", None)
+                    existing.update(item)
+                    written.append(existing)
+                    continue
+                if "resolution=ignore-duplicates" in prefer:
+                    continue
+                return _json_reply(
+                    409, {"code": "23505", "message": f"duplicate key value violates unique constraint \"{table}_pkey\""}
+                )
+            raw.append(item)
+            written.append(item)
+        return self._write_reply(written, prefer, params, status=201)
+
+    def _write_reply(self, rows, prefer, params, status: int = 200) -> Reply:
+        h = {}
+        if "count=" in prefer:
+            h["Content-Range"] = f"*/{len(rows)}"
+        if "return=minimal" in prefer:
+            return 204 if status == 200 else status, h, b""
+        return _json_reply(status, self._project(rows, params.get("select", "*")), h)
+
+    # -- Storage -----------------------------------------------------------
+    def _storage(self, method, rest, body, headers) -> Reply:
+        if rest.startswith("/sign/"):
+            bucket, _, path = rest[len("/sign/"):].partition("/")
+            return _json_reply(200, {"signedURL": f"/object/public/{bucket}/{path}?token=bench"})
+        if rest.startswith("/public/"):
+            rest = rest[len("/public"):]
+        bucket, _, path = rest.lstrip("/").partition("/")
+        with self.lock:
+            if not path and method == "DELETE":
+                prefixes = json.loads(body or b"{}").get("prefixes") or []
+                for p in prefixes:
+                    self.objects.pop((bucket, p), None)
+                return _json_reply(200, [{"name": p} for p in prefixes])
+            key = (bucket, path)
+            if method == "POST" or method == "PUT":
+                if key in self.objects and method == "POST":
+                    return _json_reply(400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"})
+                self.objects[key] = (body, headers.get("Content-Type") or "application/octet-stream")
+                return _json_reply(200, {"Key": f"{bucket}/{path}"})
+            if key not in self.objects:
+                return _json_reply(404 if method != "HEAD" else 400, {"error": "not_found", "message": "Object not found"})
+            if method == "DELETE":
+                self.objects.pop(key)
+                return _json_reply(200, {"message": "Successfully deleted"})
+            data, ctype = self.objects[key]
+            return 200, {"Content-Type": ctype}, data
+
+
+# ---------------------------------------------------------------------------
+# mp.weixin.qq.com
+# ---------------------------------------------------------------------------
+
+
+class FakeWeixin(FakeServer):
+    """公众号平台模拟：每个 fakeid 有 articles_per_feed 篇按时间倒序的文章。
+
+    - 需携带 Cookie slave_sid，否则返回 200003（会话失效）
+    - 列表接口按 freq_control_rate 概率返回 200013（频控）
+    - 文章页正文含 images_per_article 张 data-src 图片，指向本服务的 /mmbiz_jpg/
+    """
+
+    name = "weixin"
+    TOKEN = "1234567890"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        seed: int = 42,
+        articles_per_feed: int = 10,
+        freq_control_rate: float = 0.0,
+        images_per_article: int = 3,
+        image_bytes: int = 48 * 1024,
+        paragraphs: int = 40,
+    ):
+        super().__init__(latency_ms, seed)
+        self.articles_per_feed = articles_per_feed
+        self.freq_control_rate = freq_control_rate
+        self.images_per_article = images_per_article
+        self.image_bytes = image_bytes
+        self.paragraphs = paragraphs
+        self.feeds: Dict[str, int] = {}
+        self.base_time = int(time.time())
+        self._publish_tpl = json.loads((FIXTURES / "appmsgpublish.json").read_text("utf-8"))
+        self._appmsg_tpl = json.loads((FIXTURES / "appmsg.json").read_text("utf-8"))
+        self._article_tpl = (FIXTURES / "article.html").read_text("utf-8")
+
+    def add_feed(self, fakeid: str) -> str:
+        """登记一个公众号，返回其在本服务中的序号前缀（用于生成唯一 aid）"""
+        self.feeds.setdefault(fakeid, len(self.feeds) + 1)
+        return fakeid
+
+    def aid(self, fakeid: str, index: int) -> str:
+        return f"{2247400000 + self.feeds[fakeid] * 1000 + index}_1"
+
+    def _item(self, fakeid: str, index: int) -> Dict[str, Any]:
+        aid = self.aid(fakeid, index)
+        ts = self.base_time - index * 3600 - self.feeds[fakeid] * 60
+        item = dict(self._appmsg_tpl["app_msg_list"][0])
+        item.update(
+            {
+                "aid": aid,
+                "appmsgid": int(aid.split("_")[0]),
+                "title": f"{fakeid} 第{index + 1}期：周末活动报名开启",
+                "digest": "本周六下午两点，欢迎报名参加线下分享会。",
+                "link": f"{self.url}/s/{aid}",
+                "cover": f"{self.url}/mmbiz_jpg/{aid}/cover",
+                "create_time": ts,
+                "update_time": ts,
+            }
+        )
+        return item
+
+    def _page(self, fakeid: str, begin: int, count: int) -> List[Dict[str, Any]]:
+        end = min(begin + count, self.articles_per_feed)
+        return [self._item(fakeid, i) for i in range(begin, end)]
+
+    def _session_error(self, headers) -> Optional[Reply]:
+        if "slave_sid=" not in (headers.get("Cookie") or ""):
+            return _json_reply(200, {"base_resp": {"ret": 200003, "err_msg": "invalid session"}})
+        if self.random() < self.freq_control_rate:
+            self.hits["freq_control"] += 1
+            return _json_reply(200, {"base_resp": {"ret": 200013, "err_msg": "freq control"}})
+        return None
+
+    def handle(self, method, path, query, headers, body) -> Reply:
+        self.delay()
+        params = dict(query)
+        if path == "/cgi-bin/home":
+            self.hits["home"] += 1
+            html = f'<script>window.wx={{data:{{t:"{self.TOKEN}"}}}};var cgiData={{token: "{self.TOKEN}"}};</script>'
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8")
+        if path == "/cgi-bin/appmsgpublish":
+            self.hits["appmsgpublish"] += 1
+            err = self._session_error(headers)
+            if err:
+                return err
+            fakeid = self.add_feed(params.get("fakeid", ""))
+            items = self._page(fakeid, int(params.get("begin") or 0), int(params.get("count") or 5))
+            publish = json.loads(json.dumps(self._publish_tpl["publish_page"]))
+            pub_tpl = publish["publish_list"][0]
+            info_tpl = pub_tpl["publish_info"]
+            publish["total_count"] = publish["publish_count"] = self.articles_per_feed
+            publish["publish_list"] = [
+                dict(pub_tpl, publish_info=json.dumps(dict(info_tpl, appmsgex=[it]), ensure_ascii=False))
+                for it in items
+            ]
+            resp = dict(self._publish_tpl, publish_page=json.dumps(publish, ensure_ascii=False))
+            return _json_reply(200, resp)
+        if path == "/cgi-bin/appmsg":
+            self.hits["appmsg"] += 1
+            err = self._session_error(headers)
+            if err:
+                return err
+            fakeid = self.add_feed(params.get("fakeid", ""))
+            items = self._page(fakeid, int(params.get("begin") or 0), int(params.get("count") or 5))
+            return _json_reply(200, dict(self._appmsg_tpl, app_msg_cnt=self.articles_per_feed, app_msg_list=items))
+        if path == "/cgi-bin/searchbiz":
+            self.hits["searchbiz"] += 1
+            err = self._session_error(headers)
+            if err:
+                return err
+            kw = params.get("query", "")
+            found = [
+                {"fakeid": f, "nickname": f, "alias": f, "round_head_img": f"{self.url}/mmbiz_jpg/{f}/head", "service_type": 1}
+                for f in self.feeds
+                if kw in f
+            ]
+            return _json_reply(200, {"base_resp": {"ret": 0, "err_msg": "ok"}, "list": found, "total": len(found)})
+        if path.startswith("/s/"):
+            self.hits["article"] += 1
+            aid = path[len("/s/"):]
+            rng = random.Random(aid)
+            paragraphs = "\n".join(
+                f"<p>第{i + 1}段：活动时间为本周六 14:00，地点在市图书馆报告厅，费用免费，面向公众开放报名。</p>"
+                for i in range(self.paragraphs)
+            )
+            images = "\n".join(
+                f'<p><img data-src="{self.url}/mmbiz_jpg/{aid}/{i}" style="width: 677px !important;" data-type="jpeg"></p>'
+                for i in range(self.images_per_article)
+            )
+            html = self._article_tpl.format(
+                title=f"文章 {aid}", aid=aid, body=paragraphs + "\n" + images, nonce=rng.randint(0, 10**9)
+            )
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8")
+        if path.startswith("/mmbiz_jpg/"):
+            self.hits["image"] += 1
+            seed = hashlib.sha256(path.encode("utf-8")).digest()
+            data = (seed * (self.image_bytes // len(seed) + 1))[: self.image_bytes]
+            return 200, {"Content-Type": "image/jpeg", "Cache-Control": "max-age=2592000"}, data
+        return 404, {"Content-Type": "text/plain"}, b"not found"
+
+
+# ---------------------------------------------------------------------------
+# LLM
+# ---------------------------------------------------------------------------
+
+
+class FakeLLM(FakeServer):
+    """OpenAI 兼容对话接口：按提示词哈希决定是否为活动，返回固定结构 JSON"""
+
+    name = "llm"
+
+    def __init__(self, latency_ms: float = 0.0, seed: int = 42, event_rate: float = 0.5):
+        super().__init__(latency_ms, seed)
+        self.event_rate = event_rate
+
+    def handle(self, method, path, query, headers, body) -> Reply:
+        self.delay()
+        if not path.endswith("/chat/completions"):
+            return _json_reply(404, {"error": {"message": "not found"}})
+        self.hits["chat"] += 1
+        payload = json.loads(body or b"{}")
+        prompt = "".join(m.get("content", "") for m in payload.get("messages") or [])
+        bucket = int(hashlib.md5(prompt.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+        if bucket < self.event_rate:
+            result = {
+                "is_event": True,
+                "registration_title": "周末线下分享会",
+                "registration_time": "即刻报名",
+                "registration_method": "参考公众号文章内容",
+                "event_time": "本周六 14:00",
+                "event_fee": "免费",
+                "audience": "公众",
+            }
+        else:
+            result = {"is_event": False}
+        content = json.dumps(result, ensure_ascii=False)
+        prompt_tokens = len(prompt) // 2
+        completion_tokens = len(content) // 2
+        return _json_reply(
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "model": payload.get("model", "bench"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+        )
@@ -0,0 +1,134 @@
+"""文章图片派生图基准：编码耗时与阅读一篇文章下载的图片字节数。
+
+合成带渐变与噪点的照片类图片（PNG 与 JPEG 各半，模拟公众号正文的大图），
+用 VariantEncoder 在不同进程数下生成派生图，输出 JSON：
+- encode:  各进程数下每张图耗时分位数与吞吐
+- per_view: 每篇文章（--images-per-article 张）按 360/720/1080 像素显示时的下载字节数，
+            原图 vs 按 srcset 选出的派生图
+
+用法：
+    python -m bench.image_variants --images 24 --width 1920 --workers 1,2,4
+"""
+
+import argparse
+import io
+import json
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.common.image_variants import VariantEncoder, view_bytes  # noqa: E402
+
+VIEW_WIDTHS = (360, 720, 1080)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _image(i: int, width: int) -> bytes:
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = random.Random(i)
+    height = width * 2 // 3
+    img = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r = rng.randrange(20, width // 6)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    img = img.filter(ImageFilter.GaussianBlur(3))
+    noise = Image.effect_noise((width, height), 24).convert("RGB")
+    img = Image.blend(img, noise, 0.15)
+    buf = io.BytesIO()
+    if i % 2:
+        img.save(buf, format="JPEG", quality=92)
+    else:
+        img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def bench_encode(images: List[bytes], workers: int, widths, formats) -> dict:
+    encoder = VariantEncoder(workers, widths, formats)
+    # 预热：启动子进程并完成首次导入
+    encoder.generate(images[0])
+    timings: List[float] = []
+
+    def one(data: bytes):
+        start = time.perf_counter()
+        variants = encoder.generate(data)
+        timings.append(time.perf_counter() - start)
+        return variants
+
+    start = time.perf_counter()
+    # 与采集一致：多个线程同时提交，CPU 由进程池大小限制
+    with ThreadPoolExecutor(max_workers=max(4, workers * 2)) as pool:
+        results = list(pool.map(one, images))
+    elapsed = time.perf_counter() - start
+    encoder.shutdown()
+    return {
+        "workers": workers,
+        "p50_ms": round(_percentile(timings, 50) * 1000, 1),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 1),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 1),
+        "images_per_s": round(len(images) / elapsed, 2),
+        "_results": results,
+    }
+
+
+def main(args: argparse.Namespace) -> dict:
+    widths = [int(w) for w in args.widths.split(",")]
+    formats = [f.strip() for f in args.formats.split(",")]
+    images = [_image(i, args.width) for i in range(args.images)]
+
+    encode = []
+    results = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        item = bench_encode(images, workers, widths, formats)
+        results = item.pop("_results")
+        encode.append(item)
+
+    per_image = []
+    for data, variants in zip(images, results):
+        sizes = [(v.format, v.width, len(v.data)) for v in variants]
+        per_image.append({w: view_bytes(len(data), sizes, w) for w in VIEW_WIDTHS})
+    per_article = args.images_per_article
+    original = sum(len(d) for d in images) / len(images) * per_article
+    per_view = {
+        "original_kb": round(original / 1024, 1),
+        **{
+            f"{w}px_kb": round(sum(p[w] for p in per_image) / len(per_image) * per_article / 1024, 1)
+            for w in VIEW_WIDTHS
+        },
+    }
+    return {
+        "images": args.images,
+        "source_width": args.width,
+        "widths": widths,
+        "formats": VariantEncoder(1, widths, formats).formats,
+        "encode": encode,
+        "images_per_article": per_article,
+        "per_view": per_view,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--images-per-article", type=int, default=8)
+    parser.add_argument("--widths", default="360,720,1080")
+    parser.add_argument("--formats", default="avif,webp")
+    parser.add_argument("--workers", default="1,2")
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
@@ -0,0 +1,170 @@
+"""启动导入耗时基准：解析 python -X importtime 输出，跟踪 Web 与任务进程的冷启动时间。
+
+每个目标在全新的子进程中导入（--repeat 次，取总耗时中位数的那一次），输出 JSON：
+- total_ms:  导入目标模块的累计耗时
+- packages:  按顶层包汇总的自身耗时（前 --top 个）
+- slowest:   累计耗时最大的业务模块（apis / core / driver / jobs 等，前 --top 个）
+- heavy:     重依赖（FastAPI、Playwright、supabase-py、bs4 等）是否在导入时加载及其累计耗时
+
+目标：
+- web:  web.py（uvicorn 加载的应用）
+- jobs: jobs.wechat_accounts（python main.py -job True -web False 的任务进程）
+
+传 --compare 与基线结果对比，总耗时增加超过 --max-regression，
+或任务进程新加载了 Web 框架（fastapi / uvicorn）时退出码为 1。
+
+用法：
+    python -m bench.import_time --repeat 5 -o result.json
+    python -m bench.import_time --compare baseline.json --max-regression 0.25
+
+说明：
+- 在临时目录中运行，使用假的 Supabase 地址，不访问网络
+- 结果受磁盘缓存影响，对比前后改动时先各跑一次预热
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+BENCH_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+TARGETS = {"web": "web", "jobs": "jobs.wechat_accounts"}
+HEAVY = ("fastapi", "uvicorn", "playwright", "supabase", "bs4", "markdownify", "requests", "psutil", "PIL")
+# 任务进程不应加载的 Web 依赖
+WEB_ONLY = ("fastapi", "uvicorn")
+APP_PACKAGES = ("web", "apis", "core", "driver", "jobs", "schemas")
+
+# (模块名, 自身耗时 us, 累计耗时 us, 嵌套深度)
+Row = Tuple[str, int, int, int]
+
+
+def parse_importtime(text: str) -> List[Row]:
+    """解析 "import time: self | cumulative | name" 行，名称前的缩进表示嵌套深度"""
+    rows: List[Row] = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def _env(workdir: Path) -> Dict[str, str]:
+    pythonpath = os.pathsep.join(p for p in (str(BACKEND_DIR), os.environ.get("PYTHONPATH", "")) if p)
+    return {
+        **os.environ,
+        "PYTHONPATH": pythonpath,
+        "SUPABASE_URL": "http://127.0.0.1:9",
+        "SUPABASE_SERVICE_KEY": BENCH_KEY,
+        "SUPABASE_ANON_KEY": BENCH_KEY,
+        "QUEUE_DB": str(workdir / "task_queue.db"),
+        "CACHE_DIR": str(workdir / "cache"),
+        "LOG_FILE": str(workdir / "bench.log"),
+        "LOG_LEVEL": "ERROR",
+    }
+
+
+def measure(module: str, env: Dict[str, str], cwd: Path) -> List[Row]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr)
+
+
+def summarize(module: str, rows: List[Row], top: int) -> Dict[str, Any]:
+    cumulative = {name: cum for name, _, cum, _ in rows}
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    slowest = sorted(
+        ((name, cum) for name, _, cum, _ in rows if name.split(".")[0] in APP_PACKAGES and not (module + ".").startswith(name + ".")),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {
+        "total_ms": round(cumulative.get(module, 0) / 1000, 1),
+        "modules": len(rows),
+        "packages": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        },
+        "slowest": {name: round(cum / 1000, 1) for name, cum in slowest[:top]},
+        "heavy": {name: round(cumulative[name] / 1000, 1) if name in cumulative else None for name in HEAVY},
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="wx-bench-import-"))
+    try:
+        env = _env(workdir)
+        targets: Dict[str, Any] = {}
+        for name in args.targets:
+            module = TARGETS[name]
+            runs = [measure(module, env, workdir) for _ in range(args.repeat)]
+            totals = [next((cum for n, _, cum, _ in rows if n == module), 0) for rows in runs]
+            median = statistics.median_low(totals)
+            summary = summarize(module, runs[totals.index(median)], args.top)
+            summary["module"] = module
+            summary["runs_ms"] = [round(t / 1000, 1) for t in totals]
+            targets[name] = summary
+        return {"python": sys.version.split()[0], "repeat": args.repeat, "targets": targets}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """返回回退项说明；总耗时增加超过 tolerance，或任务进程加载了 Web 依赖视为回退"""
+    regressions = []
+    for name, cur in result["targets"].items():
+        if name == "jobs":
+            for dep in WEB_ONLY:
+                if cur["heavy"].get(dep) is not None:
+                    regressions.append(f"{name}: 导入时加载了 {dep}")
+        base = baseline.get("targets", {}).get(name)
+        if not base:
+            continue
+        if base.get("total_ms") and cur["total_ms"] > base["total_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: total {base['total_ms']}ms -> {cur['total_ms']}ms")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("-o", "--output", help="结果另存为 JSON 文件")
+    parser.add_argument("--compare", help="基线结果 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,399 @@
+"""离线端到端基准：本地模拟 Supabase / mp.weixin.qq.com / Storage / LLM，无需外网。
+
+场景：
+- collect:         逐个公众号采集列表并入库（不抓正文）
+- collect_content: 采集时同步抓正文，含图片下载、转存 Storage 与 markdown 生成
+- backfill:        fetch_articles_without_content 补抓缺正文的文章（requests 模式）
+- events_fetch:    POST /api/v1/events/fetch 逐篇 LLM 抽取活动
+- list_api:        文章列表（offset / cursor）、文章详情、活动列表接口
+
+输出 JSON（各场景次数、错误数、耗时分位数与吞吐，以及各模拟服务的请求计数）。
+传 --compare 与基线结果对比，p95 变慢或吞吐下降超过 --max-regression 时退出码为 1，
+便于在无网络的 CI 机器上发现性能回退。
+
+用法：
+    python -m bench.offline --feeds 20 --articles-per-feed 10 --wx-latency-ms 50 -o result.json
+    python -m bench.offline --compare baseline.json --max-regression 0.25
+
+说明：
+- 在临时目录中运行（会话文件、任务队列库、缓存均写到该目录），结束后删除
+- 采集/补抓流程里的随机降频 sleep 在基准中关闭，只测量处理与 I/O 本身
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from bench.fakes import FakeLLM, FakeSupabase, FakeWeixin  # noqa: E402
+
+# supabase-py 会校验 key 形如 JWT
+BENCH_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class Recorder:
+    """记录单个场景的每次操作耗时与错误"""
+
+    def __init__(self, unit: str = "op"):
+        self.unit = unit
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.items = 0
+        self._start = 0.0
+        self._elapsed = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._elapsed = time.perf_counter() - self._start
+
+    def measure(self, fn: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return fn()
+        except Exception:
+            self.errors += 1
+            return None
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def ameasure(self, coro) -> Any:
+        start = time.perf_counter()
+        try:
+            return await coro
+        except Exception:
+            self.errors += 1
+            return None
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Any]:
+        values = self.latencies
+        ms = lambda v: round(v * 1000, 2)  # noqa: E731
+        return {
+            "unit": self.unit,
+            "count": len(values),
+            "errors": self.errors,
+            "items": self.items,
+            "duration_s": round(self._elapsed, 3),
+            "throughput_per_s": round(len(values) / self._elapsed, 2) if self._elapsed else 0,
+            "items_per_s": round(self.items / self._elapsed, 2) if self._elapsed else 0,
+            "mean_ms": ms(statistics.fmean(values)) if values else 0,
+            "p50_ms": ms(_percentile(values, 50)),
+            "p90_ms": ms(_percentile(values, 90)),
+            "p95_ms": ms(_percentile(values, 95)),
+            "p99_ms": ms(_percentile(values, 99)),
+            "max_ms": ms(max(values)) if values else 0,
+        }
+
+
+def _configure_env(workdir: Path, supabase: FakeSupabase, wx: FakeWeixin, llm: FakeLLM) -> None:
+    """在导入任何业务模块之前设置环境变量（各 settings 在导入时读取）"""
+    os.environ.update(
+        {
+            "SUPABASE_URL": supabase.url,
+            "SUPABASE_SERVICE_KEY": BENCH_KEY,
+            "SUPABASE_ANON_KEY": BENCH_KEY,
+            "WX_MP_BASE": wx.url,
+            "LLM_API_BASE": f"{llm.url}/v1/chat/completions",
+            "LLM_API_KEY": "bench",
+            "LLM_MODEL": "bench-model",
+            "QUEUE_DB": str(workdir / "task_queue.db"),
+            "CACHE_DIR": str(workdir / "cache"),
+            "LOG_FILE": str(workdir / "bench.log"),
+            "LOG_LEVEL": os.environ.get("BENCH_LOG_LEVEL", "ERROR"),
+            "ENABLE_JOB": "False",
+            "SCHEDULER_LEADER_ELECTION": "False",
+            "ARTICLE_COUNT_MODE": "exact",
+            # 模拟图片为随机字节，无法解码，不生成派生图
+            "IMAGE_VARIANT_WORKERS": "0",
+        }
+    )
+    (workdir / "data").mkdir(parents=True, exist_ok=True)
+    os.chdir(workdir)
+
+
+def _seed(supabase: FakeSupabase, wx: FakeWeixin, feeds: int, content_feeds: int) -> Dict[str, List[dict]]:
+    groups: Dict[str, List[dict]] = {"collect": [], "collect_content": []}
+    for i in range(feeds + content_feeds):
+        fakeid = wx.add_feed(f"MzBench{i:04d}==")
+        feed = {"id": f"MP_WXS_bench{i:04d}", "name": f"bench-{i:04d}", "faker_id": fakeid, "status": 1}
+        groups["collect" if i < feeds else "collect_content"].append(feed)
+    supabase.seed("feeds", groups["collect"] + groups["collect_content"])
+    supabase.seed("articles", [])
+    supabase.seed("events", [])
+    supabase.seed("article_images", [], primary_key=("article_id", "object_path"))
+    supabase.seed(
+        "config_managements",
+        [
+            {"config_key": "gather.model", "config_value": "app"},
+            {"config_key": "gather.content", "config_value": "false"},
+            {"config_key": "gather.content_mode", "config_value": "api"},
+            {"config_key": "interval", "config_value": "0"},
+        ],
+        primary_key=("config_key",),
+    )
+    return groups
+
+
+def _set_config(supabase: FakeSupabase, key: str, value: str) -> None:
+    with supabase.lock:
+        for row in supabase.rows("config_managements"):
+            if row["config_key"] == key:
+                row["config_value"] = value
+
+
+def _login() -> None:
+    from driver.session.store import Store
+
+    Store.save_session(
+        {
+            "cookies": [
+                {"name": "slave_sid", "value": "bench", "domain": ".qq.com", "path": "/"},
+                {"name": "slave_user", "value": "gh_bench", "domain": ".qq.com", "path": "/"},
+            ],
+            "token": FakeWeixin.TOKEN,
+        }
+    )
+
+
+def run_collect(feeds: List[dict], pages: int) -> Recorder:
+    from core.feeds.collector import collect_feed_articles
+    from jobs.article import UpdateArticle
+
+    rec = Recorder("feed")
+    with rec:
+        for feed in feeds:
+            result = rec.measure(
+                lambda: collect_feed_articles(feed, on_article=UpdateArticle, max_page=pages, interval=0)
+            )
+            if result:
+                rec.items += int(result.get("count") or 0)
+    return rec
+
+
+def run_backfill(max_rounds: int = 1000) -> Recorder:
+    import jobs.fetch_no_article as fetch_no_article
+    from core.articles import article_repo
+
+    fetch_no_article.sleep = lambda _s: None
+    missing = {"or": [{"content": {"is": None}}, {"content": {"eq": ""}}]}
+    rec = Recorder("batch")
+    with rec:
+        before = remaining = article_repo.sync_count_articles(missing)
+        for _ in range(max_rounds):
+            if not remaining:
+                break
+            rec.measure(fetch_no_article.fetch_articles_without_content)
+            left = article_repo.sync_count_articles(missing)
+            if left >= remaining:
+                # 一轮没有进展（正文抓取持续失败），停止以免空转
+                break
+            remaining = left
+        rec.items = before - remaining
+    return rec
+
+
+def _app():
+    from web import app
+    from core.integrations.supabase.auth import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: {"id": "bench", "email": "bench@local"}
+    return app
+
+
+async def run_events(llm: FakeLLM, rounds: int) -> Recorder:
+    import httpx
+    from core.common.base import API_BASE
+
+    rec = Recorder("request")
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        before = llm.hits["chat"]
+        with rec:
+            for _ in range(rounds):
+                resp = await rec.ameasure(
+                    client.post(f"{API_BASE}/events/fetch", params={"scope": "all", "limit": 200})
+                )
+                if resp is not None and resp.status_code != 200:
+                    rec.errors += 1
+        rec.items = llm.hits["chat"] - before
+    return rec
+
+
+async def run_list(requests: int, concurrency: int, page_size: int) -> Dict[str, Dict[str, Any]]:
+    import httpx
+    from core.articles import article_repo
+    from core.common.base import API_BASE
+
+    ids = [r["id"] for r in await article_repo.get_articles(limit=200, projection="id")]
+    transport = httpx.ASGITransport(app=_app())
+    results: Dict[str, Dict[str, Any]] = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def call(rec: Recorder, url: str, params: Optional[dict] = None):
+            resp = await rec.ameasure(client.get(url, params=params))
+            if resp is not None and resp.status_code != 200:
+                rec.errors += 1
+            return resp
+
+        async def burst(name: str, request: Callable[[int], tuple]) -> None:
+            """共 requests 次请求，每批 concurrency 个并发"""
+            rec = Recorder("request")
+            with rec:
+                for start in range(0, requests, concurrency):
+                    batch = range(start, min(start + concurrency, requests))
+                    await asyncio.gather(*(call(rec, *request(i)) for i in batch))
+            results[name] = rec.summary()
+
+        await burst(
+            "articles_offset",
+            lambda i: (f"{API_BASE}/articles", {"limit": page_size, "offset": (i * page_size) % 200}),
+        )
+        if ids:
+            await burst("article_detail", lambda i: (f"{API_BASE}/articles/{ids[i % len(ids)]}",))
+        await burst("events_list", lambda i: (f"{API_BASE}/events", {"limit": page_size}))
+
+        # cursor 翻页需按顺序请求：走到末页后从头开始
+        rec = Recorder("request")
+        with rec:
+            cursor = None
+            for _ in range(requests):
+                params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+                resp = await call(rec, f"{API_BASE}/articles", params)
+                ok = resp is not None and resp.status_code == 200
+                cursor = ((resp.json().get("data") or {}) if ok else {}).get("next_cursor")
+        results["articles_cursor"] = rec.summary()
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="wx-bench-"))
+    cwd = os.getcwd()
+    supabase = FakeSupabase(latency_ms=args.db_latency_ms).start()
+    wx = FakeWeixin(
+        latency_ms=args.wx_latency_ms,
+        articles_per_feed=args.articles_per_feed,
+        freq_control_rate=args.freq_control,
+        images_per_article=args.images_per_article,
+    ).start()
+    llm = FakeLLM(latency_ms=args.llm_latency_ms, event_rate=args.event_rate).start()
+    try:
+        _configure_env(workdir, supabase, wx, llm)
+        groups = _seed(supabase, wx, args.feeds, args.content_feeds)
+        _login()
+
+        scenarios: Dict[str, Any] = {}
+        selected = set(args.scenarios)
+        if "collect" in selected:
+            scenarios["collect"] = run_collect(groups["collect"], args.pages).summary()
+        if "collect_content" in selected and groups["collect_content"]:
+            _set_config(supabase, "gather.content", "true")
+            scenarios["collect_content"] = run_collect(groups["collect_content"], args.pages).summary()
+            _set_config(supabase, "gather.content", "false")
+        if "backfill" in selected:
+            scenarios["backfill"] = run_backfill().summary()
+        if "events_fetch" in selected:
+            scenarios["events_fetch"] = asyncio.run(run_events(llm, args.events_rounds)).summary()
+        if "list_api" in selected:
+            scenarios.update(asyncio.run(run_list(args.list_requests, args.concurrency, args.page_size)))
+        from core.integrations.wx.transport import wx_transport
+
+        return {
+            "bench": "offline",
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+            "scenarios": scenarios,
+            # 采集器共用连接池的请求数、新建连接数与复用率
+            "wx_http": wx_transport.get_info(),
+            "fakes": {
+                "supabase": dict(supabase.hits),
+                "weixin": dict(wx.hits),
+                "connections": {"supabase": supabase.connections, "weixin": wx.connections, "llm": llm.connections},
+                "llm": dict(llm.hits),
+                "rows": {t: len(r) for t, r in supabase.tables.items()},
+                "storage_objects": len(supabase.objects),
+            },
+        }
+    finally:
+        os.chdir(cwd)
+        for server in (supabase, wx, llm):
+            server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """返回回退项说明；场景 p95 变慢或吞吐下降超过 tolerance 视为回退"""
+    regressions = []
+    for name, cur in result["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        if base.get("p95_ms") and cur["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']}ms -> {cur['p95_ms']}ms")
+        if base.get("throughput_per_s") and cur["throughput_per_s"] < base["throughput_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {base['throughput_per_s']}/s -> {cur['throughput_per_s']}/s"
+            )
+        if cur["errors"] > base.get("errors", 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {cur['errors']}")
+    return regressions
+
+
+SCENARIOS = ["collect", "collect_content", "backfill", "events_fetch", "list_api"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--feeds", type=int, default=20, help="只采集列表的公众号数")
+    parser.add_argument("--content-feeds", type=int, default=5, help="采集时同步抓正文的公众号数")
+    parser.add_argument("--articles-per-feed", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=2, help="每个公众号采集页数（每页 5 篇）")
+    parser.add_argument("--images-per-article", type=int, default=3)
+    parser.add_argument("--wx-latency-ms", type=float, default=30)
+    parser.add_argument("--db-latency-ms", type=float, default=2)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--freq-control", type=float, default=0.0, help="列表接口返回 200013 的概率")
+    parser.add_argument("--event-rate", type=float, default=0.5, help="LLM 判定为活动的比例")
+    parser.add_argument("--events-rounds", type=int, default=1)
+    parser.add_argument("--list-requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("-o", "--output", help="结果另存为 JSON 文件")
+    parser.add_argument("--compare", help="基线结果 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,60 @@
+"""列投影前后的响应体积对比（只读，使用库中现有数据）。
+
+对每个读路径分别用 select * 与投影预设各查一次，统计 JSON 序列化后的字节数：
+- article_list:      文章列表（summary）
+- existing_ids:      采集去重 query_existing_article_ids（id）
+- duplicate_scan:    重复文章流式扫描一页（id,mp_id,title,publish_time）
+- events_fetch:      /events/fetch 取待分析文章（with_markdown）
+
+用法：
+    python -m bench.payload_bytes --limit 200
+"""
+
+import argparse
+import asyncio
+import json
+
+from core.articles import article_repo, article_columns
+from core.integrations.supabase.client import supabase_client
+
+
+async def _bytes(columns: str, limit: int, filters=None) -> tuple[int, int]:
+    rows = await supabase_client.select(
+        article_repo.ARTICLE_TABLE,
+        filters=filters,
+        columns=columns,
+        order=article_repo.PAGE_ORDER,
+        limit=limit,
+    )
+    return len(rows), len(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+
+
+async def main(limit: int) -> dict:
+    latest = await supabase_client.select(
+        article_repo.ARTICLE_TABLE, columns="id", order=article_repo.PAGE_ORDER, limit=limit
+    )
+    id_filter = {"id": {"in": [r["id"] for r in latest]}}
+    cases = {
+        "article_list": (article_columns("summary"), None),
+        "existing_ids": ("id", id_filter),
+        "duplicate_scan": ("id,mp_id,title,publish_time", None),
+        "events_fetch": (article_columns("with_markdown"), None),
+    }
+    result: dict = {"limit": limit}
+    for name, (columns, filters) in cases.items():
+        rows, before = await _bytes("*", limit, filters)
+        _, after = await _bytes(columns, limit, filters)
+        result[name] = {
+            "rows": rows,
+            "before_bytes": before,
+            "after_bytes": after,
+            "saved_pct": round((1 - after / before) * 100, 1) if before else 0,
+        }
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limit", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.limit)), ensure_ascii=False, indent=2))
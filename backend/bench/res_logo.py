@@ -0,0 +1,210 @@
+"""公众号图标代理（/static/res/logo）命中基准：模拟前端公众号列表同时加载大量头像。
+
+预先把图片写入临时缓存目录，再用 uvicorn 子进程启动只含资源路由的应用，
+并发请求全部命中缓存，对比：
+- route:    当前实现（小文件随索引查询一并读出，大文件由 FileResponse 按块发送）
+- buffered: 对照组，查索引后再单独读整张图，用 Response 返回
+
+--size-kb 超过 INLINE_MAX_BYTES（64KB）时 route 走 FileResponse。
+
+输出 JSON（各模式请求耗时分位数、吞吐，以及服务进程空闲/峰值 RSS）。
+
+用法：
+    python -m bench.res_logo --images 300 --size-kb 40 --requests 5000 --concurrency 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+URL_PREFIX = "http://mmbiz.qpic.cn/bench"
+
+
+def create_app():
+    """uvicorn --factory 入口：只挂载资源路由，另加一个整读文件的对照路由"""
+    from fastapi import APIRouter, FastAPI
+    from fastapi.responses import Response
+
+    from apis.res import router as res_router
+    from core.common.res.image_cache import image_cache
+
+    buffered = APIRouter(prefix="/static/buffered")
+
+    @buffered.get("/logo/{path:path}")
+    async def buffered_logo(path: str):
+        item = await image_cache.get(path, inline=False)
+
+        def read() -> bytes:
+            with open(item.path, "rb") as f:
+                return f.read()
+
+        content = await asyncio.to_thread(read)
+        return Response(content=content, headers=item.headers, media_type=item.content_type)
+
+    app = FastAPI()
+    resource_router = APIRouter(prefix="/static")
+    resource_router.include_router(res_router)
+    app.include_router(resource_router)
+    app.include_router(buffered)
+    return app
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _seed(images: int, size_kb: int) -> None:
+    # 需在设置 CACHE_DIR 之后导入
+    from core.common.res.image_cache import CachedImage, _etag, image_cache
+
+    async def seed():
+        for i in range(images):
+            content = os.urandom(size_kb * 1024)
+            item = CachedImage(etag=_etag(content), size=len(content), stored_at=time.time(), content_type="image/jpeg")
+            await image_cache.put(image_cache.key(f"{URL_PREFIX}/{i}/0"), item, content)
+
+    asyncio.run(seed())
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid: int):
+        super().__init__(daemon=True)
+        import psutil
+
+        self.proc = psutil.Process(pid)
+        self.peak = 0
+        self._done = threading.Event()
+
+    def rss(self) -> int:
+        return self.proc.memory_info().rss
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak = max(self.peak, self.rss())
+            time.sleep(0.01)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+async def _burst(base: str, route: str, images: int, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+
+        async def one(i: int) -> None:
+            nonlocal errors
+            start = time.perf_counter()
+            try:
+                resp = await client.get(f"/static/{route}/logo/{URL_PREFIX}/{i % images}/0")
+                if resp.status_code != 200:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for offset in range(0, requests, concurrency):
+            await asyncio.gather(*(one(i) for i in range(offset, min(offset + concurrency, requests))))
+        elapsed = time.perf_counter() - start
+    return {
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "rps": round(requests / elapsed, 1),
+    }
+
+
+def bench_mode(route: str, env: dict, args: argparse.Namespace) -> dict:
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "bench.res_logo:create_app", "--factory",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+            "--backlog", str(max(2048, args.concurrency * 2)),
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("基准服务启动失败")
+                time.sleep(0.1)
+        sampler = RssSampler(server.pid)
+        # 预热一轮，让每张图都经过一次索引查询与文件打开
+        asyncio.run(_burst(base, route, args.images, args.images, min(args.images, 100)))
+        idle = sampler.rss()
+        sampler.start()
+        result = asyncio.run(_burst(base, route, args.images, args.requests, args.concurrency))
+        sampler.stop()
+        result["rss_idle_mb"] = round(idle / 1024**2, 1)
+        result["rss_peak_mb"] = round(sampler.peak / 1024**2, 1)
+        return result
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main(args: argparse.Namespace) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="wx-bench-res-"))
+    os.environ["CACHE_DIR"] = str(workdir / "cache")
+    pythonpath = os.pathsep.join(p for p in (str(BACKEND_DIR), os.environ.get("PYTHONPATH", "")) if p)
+    env = {**os.environ, "PYTHONPATH": pythonpath}
+    try:
+        _seed(args.images, args.size_kb)
+        return {
+            "images": args.images,
+            "size_kb": args.size_kb,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "route": bench_mode("res", env, args),
+            "buffered": bench_mode("buffered", env, args),
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--size-kb", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(main(args), ensure_ascii=False, indent=2))
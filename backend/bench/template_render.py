@@ -0,0 +1,110 @@
+"""消息模板渲染基准：200 篇文章的汇总消息。
+
+分别使用 send_message / call_webhook 的默认模板，对比：
+- cold:   每次渲染前清空编译缓存（相当于每次都重新解析模板）
+- cached: 编译结果命中进程内 LRU，只做取值和拼接
+
+输出 JSON（编译耗时、各模式渲染耗时分位数、每秒渲染次数与消息字节数）。
+
+用法：
+    python -m bench.template_render --articles 200 --rounds 200
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.common.lax.template_parser import (  # noqa: E402
+    CompiledTemplate,
+    TemplateParser,
+    clear_template_cache,
+)
+from jobs.webhook import DEFAULT_SEND_TEMPLATE, DEFAULT_WEBHOOK_TEMPLATE  # noqa: E402
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _context(n: int) -> dict:
+    articles = [
+        {
+            "id": f"art-{i}",
+            "mp_id": "MP_WXS_BENCH",
+            "title": f"第 {i} 篇：周末城市活动汇总与报名方式",
+            "pic_url": f"https://mmbiz.qpic.cn/bench/{i}.jpg",
+            "url": f"https://mp.weixin.qq.com/s/bench{i:05d}",
+            "description": "活动时间、地点与报名方式见正文" * 3,
+            "publish_time": "2026-10-18 08:00:00",
+        }
+        for i in range(n)
+    ]
+    return {
+        "feed": {"id": "MP_WXS_BENCH", "mp_name": "基准公众号"},
+        "articles": articles,
+        "task": {"id": "task-bench", "name": "基准任务"},
+        "now": "2026-10-18 08:00:00",
+    }
+
+
+def _measure(fn: Callable[[], str], rounds: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "p50_ms": round(_percentile(timings, 50) * 1000, 3),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+        "renders_per_s": round(rounds / sum(timings), 1),
+    }
+
+
+def bench_template(template: str, context: dict, rounds: int) -> dict:
+    start = time.perf_counter()
+    CompiledTemplate(template)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    def cold() -> str:
+        clear_template_cache()
+        return TemplateParser(template).render(dict(context))
+
+    def cached() -> str:
+        return TemplateParser(template).render(dict(context))
+
+    output = cached()
+    return {
+        "compile_ms": round(compile_ms, 3),
+        "output_bytes": len(output.encode("utf-8")),
+        "cold": _measure(cold, rounds),
+        "cached": _measure(cached, rounds),
+    }
+
+
+def main(articles: int, rounds: int) -> dict:
+    context = _context(articles)
+    return {
+        "articles": articles,
+        "rounds": rounds,
+        "send_message": bench_template(DEFAULT_SEND_TEMPLATE, context, rounds),
+        "call_webhook": bench_template(DEFAULT_WEBHOOK_TEMPLATE, context, rounds),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(main(args.articles, args.rounds), ensure_ascii=False, indent=2))
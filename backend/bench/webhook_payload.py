@@ -0,0 +1,120 @@
+"""Webhook 负载构造基准：模板渲染 vs 结构化序列化（不发请求）。
+
+构造带正文的文章（默认 100 篇、每篇约 30KB HTML），使用引用 article.content 的模板：
+- template:   render_webhook_template，整段 JSON 字符串一次性生成
+- structured: iter_webhook_payload 逐块消费（模拟 chunked 发送，不拼接整体）
+
+输出 JSON（各模式耗时分位数、tracemalloc 峰值内存与负载字节数）。
+
+用法：
+    python -m bench.webhook_payload --articles 100 --rounds 10 --format html
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.message_tasks.model import MessageTask  # noqa: E402
+from jobs.webhook import (  # noqa: E402
+    DEFAULT_WEBHOOK_TEMPLATE,
+    MESSAGE_TYPE_WEBHOOK,
+    MessageWebHook,
+    iter_webhook_payload,
+    render_webhook_template,
+)
+
+CONTENT_TEMPLATE = DEFAULT_WEBHOOK_TEMPLATE.replace(
+    '"publish_time": "{{ article.publish_time }}"',
+    '"publish_time": "{{ article.publish_time }}",\n          "content": "{{ article.content }}"',
+)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _hook(n: int, content_kb: int) -> MessageWebHook:
+    paragraph = '<p style="margin:0">周末活动 "报名" 时间与地点见下文，<span>名额有限</span>。</p>\n'
+    content = paragraph * max(1, content_kb * 1024 // len(paragraph.encode("utf-8")))
+    articles = [
+        {
+            "id": f"art-{i}",
+            "mp_id": "MP_WXS_BENCH",
+            "title": f"第 {i} 篇：周末城市活动汇总",
+            "pic_url": f"https://mmbiz.qpic.cn/bench/{i}.jpg",
+            "url": f"https://mp.weixin.qq.com/s/bench{i:05d}",
+            "description": "活动摘要",
+            "publish_time": "2026-10-18 08:00:00",
+            "content": content,
+        }
+        for i in range(n)
+    ]
+    task = MessageTask(
+        id="task-bench",
+        message_type=MESSAGE_TYPE_WEBHOOK,
+        name="基准任务",
+        message_template=CONTENT_TEMPLATE,
+        web_hook_url="http://127.0.0.1/hook",
+        mps_id="",
+    )
+    return MessageWebHook(task=task, feed={"id": "MP_WXS_BENCH", "mp_name": "基准公众号"}, articles=articles)
+
+
+def _measure(fn: Callable[[], int], rounds: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        size = fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "payload_bytes": size,
+        "peak_mem_kb": round(peak / 1024, 1),
+        "p50_ms": round(_percentile(timings, 50) * 1000, 2),
+        "p95_ms": round(_percentile(timings, 95) * 1000, 2),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 2),
+    }
+
+
+def main(articles: int, content_kb: int, rounds: int, content_format: str) -> dict:
+    hook = _hook(articles, content_kb)
+
+    def template() -> int:
+        return len(render_webhook_template(hook, content_format).encode("utf-8"))
+
+    def structured() -> int:
+        return sum(len(chunk) for chunk in iter_webhook_payload(hook, content_format))
+
+    return {
+        "articles": articles,
+        "content_kb": content_kb,
+        "content_format": content_format,
+        "rounds": rounds,
+        "template": _measure(template, rounds),
+        "structured": _measure(structured, rounds),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--content-kb", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--format", default="html", choices=["html", "text", "markdown"])
+    args = parser.parse_args()
+    print(json.dumps(main(args.articles, args.content_kb, args.rounds, args.format), ensure_ascii=False, indent=2))
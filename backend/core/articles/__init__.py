@@ -1,10 +1,18 @@
 """文章领域模块。"""
 
 from core.articles.model import Article, ArticleBase
-from core.articles.repo import ArticleRepository
+from core.articles.repo import ArticleRepository, ArticleProjection, article_columns
 from core.integrations.supabase.client import supabase_client
+from core.common.app_settings import settings
 
 
-article_repo = ArticleRepository(supabase_client)
+article_repo = ArticleRepository(supabase_client, count_mode=settings.article_count_mode)
 
-__all__ = ["article_repo", "Article", "ArticleBase", "ArticleRepository"]
+__all__ = [
+    "article_repo",
+    "Article",
+    "ArticleBase",
+    "ArticleRepository",
+    "ArticleProjection",
+    "article_columns",
+]
@@ -1,5 +1,130 @@
+"""文章清理：孤儿文章（公众号已删除）与重复文章（同公众号同标题）。
+
+优先调用数据库函数做集合运算（anti-join / 窗口函数），只返回待删 id；
+函数未部署（PGRST202 / 42883）时退回 stream_articles 按 id 流式读取精简列在 Python 侧判定，
+其他错误直接抛出。删除统一分批，并删除不再被其他文章引用的 storage 对象
+（重复文章与保留的那篇常共用同一存储路径）。
+
+报告中 scanned 为后端实际处理的行数：数据库模式为函数返回的待删 id 数，流式模式为读取的文章数。
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
 from core.articles import article_repo
+from core.articles.retention import delete_articles_with_objects
 from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+from core.feeds import feed_repo
+from core.integrations.supabase.client import is_missing_function
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _new_deleted() -> Dict[str, int]:
+    return {"articles": 0, "objects": 0, "failed_objects": 0}
+
+
+def _add(deleted: Dict[str, int], result: Dict[str, int]) -> None:
+    for key in deleted:
+        deleted[key] += result[key]
+
+
+async def _delete_in_batches(ids: List[str], batch_size: int, deleted: Dict[str, int]) -> None:
+    for start in range(0, len(ids), batch_size):
+        _add(deleted, await delete_articles_with_objects(ids[start : start + batch_size]))
+
+
+async def _run_set_based(finder, batch_size: int, deleted: Dict[str, int]) -> Optional[int]:
+    """循环：数据库找一批 id -> 删除，直到找不到为止。
+
+    删除数累加到 deleted；返回数据库返回的 id 总数，函数未部署时返回 None（交由流式扫描）。
+    """
+    fetched = 0
+    while True:
+        try:
+            ids = await finder(batch_size)
+        except Exception as e:
+            if not is_missing_function(e):
+                raise
+            logger.warning(f"数据库清理函数未部署，改为流式扫描: {e}")
+            return None
+        if not ids:
+            return fetched
+        fetched += len(ids)
+        result = await delete_articles_with_objects(ids)
+        if result["articles"] == 0:
+            raise RuntimeError(f"文章删除失败 ids={ids[:5]}...")
+        _add(deleted, result)
+
+
+def _report(mode: str, scanned: int, deleted: Dict[str, int], t0: float) -> Dict[str, Any]:
+    return {
+        "mode": mode,
+        "scanned": scanned,
+        "deleted": deleted["articles"],
+        "storage_deleted": deleted["objects"],
+        "storage_failed": deleted["failed_objects"],
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+
+async def clean_orphan_articles(batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """清理 mp_id 为空或公众号已不存在的文章，返回运行报告"""
+    t0 = time.perf_counter()
+    deleted = _new_deleted()
+    scanned = await _run_set_based(article_repo.find_orphan_article_ids, batch_size, deleted)
+    if scanned is not None:
+        report = _report("sql", scanned, deleted, t0)
+    else:
+        feeds = await feed_repo.get_feeds(columns="id")
+        valid_ids = {f["id"] for f in feeds}
+        scanned = 0
+        orphan_ids: List[str] = []
+        async for r in article_repo.stream_articles(
+            projection="id,mp_id", page_size=batch_size, prefetch=True
+        ):
+            scanned += 1
+            if r.get("mp_id") not in valid_ids:
+                orphan_ids.append(r["id"])
+        await _delete_in_batches(orphan_ids, batch_size, deleted)
+        report = _report("stream", scanned, deleted, t0)
+    logger.info(f"清理孤儿文章: {report}")
+    return report
+
+
+async def clean_duplicate_articles_report(
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """清理同一 (mp_id, title) 的重复文章，保留最新一篇，返回运行报告"""
+    t0 = time.perf_counter()
+    deleted = _new_deleted()
+    scanned = await _run_set_based(article_repo.find_duplicate_article_ids, batch_size, deleted)
+    if scanned is not None:
+        report = _report("sql", scanned, deleted, t0)
+    else:
+        # key -> (publish_time, id)，只保留每组最新一篇
+        keep: Dict[tuple, tuple] = {}
+        duplicate_ids: List[str] = []
+        scanned = 0
+        async for r in article_repo.stream_articles(
+            projection="id,mp_id,title,publish_time", page_size=batch_size, prefetch=True
+        ):
+            scanned += 1
+            key = (r.get("mp_id"), r.get("title"))
+            rank = (r.get("publish_time") or 0, r["id"])
+            best = keep.get(key)
+            if best is None:
+                keep[key] = rank
+            elif rank > best:
+                duplicate_ids.append(best[1])
+                keep[key] = rank
+            else:
+                duplicate_ids.append(r["id"])
+        await _delete_in_batches(duplicate_ids, batch_size, deleted)
+        report = _report("stream", scanned, deleted, t0)
+    logger.info(f"清理重复文章: {report}")
+    return report
 
 
 def clean_duplicate_articles():
@@ -7,31 +132,8 @@ def clean_duplicate_articles():
     清理重复的文章
     """
     try:
-        # 获取所有文章
-        articles = article_repo.sync_get_articles(order_by="publish_time.desc")
-
-        # 如果没有文章，直接返回
-        if not articles:
-            return ("没有找到文章", 0)
-
-        # 用于存储已检查的文章标题和mp_id组合
-        seen_articles = set()
-        duplicates = []
-
-        # 检查重复文章
-        for article in articles:
-            article_key = (article["title"], article["mp_id"])
-            if article_key in seen_articles:
-                duplicates.append(article)
-            else:
-                seen_articles.add(article_key)
-
-        # 删除重复文章
-        for duplicate in duplicates:
-            logger.info(f"删除重复文章: {duplicate['title']}")
-            article_repo.sync_delete_article(duplicate["id"])
-
-        return (f"已清理 {len(duplicates)} 篇重复文章", len(duplicates))
+        report = run_sync(clean_duplicate_articles_report())
+        return (f"已清理 {report['deleted']} 篇重复文章", report["deleted"])
     except Exception as e:
         return (f"清理重复文章失败: {str(e)}", 0)
 
@@ -1,5 +1,6 @@
 from core.articles import article_repo
 from core.feeds import feed_repo
+from core.common.log import logger
 import json
 
 
@@ -19,16 +20,21 @@ class ArticleInfo:
 def laxArticle():
     info = ArticleInfo()
 
-    # 所有文章数量
-    info.all_count = article_repo.sync_count_articles()
-
-    # 获取没有内容的文章数量 (content为空字符串或null)
-    info.no_content_count = article_repo.sync_count_articles(
-        filters={"content": {"is": None}}
-    )
-
-    # 有内容的文章数量
-    info.has_content_count = info.all_count - info.no_content_count
+    # 优先读计数缓存表（每个公众号一行），不可用时退回 planned 估算
+    try:
+        counters = article_repo.sync_get_article_counters()
+        info.all_count = counters["total"]
+        info.has_content_count = counters["with_content"]
+    except Exception as e:
+        logger.warning(f"读取文章计数缓存失败，使用估算值: {e}")
+        info.all_count = article_repo.sync_count_articles(mode="planned")
+        no_content = article_repo.sync_count_articles(
+            filters={"content": {"is": None}}, mode="planned"
+        )
+        info.has_content_count = max(0, info.all_count - no_content)
+
+    # 没有内容的文章数量 (content为null)
+    info.no_content_count = max(0, info.all_count - info.has_content_count)
 
     # 兼容旧统计字段（articles 已不再使用 status）
     info.wrong_count = 0
@@ -1,15 +1,38 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Dict, Any
+from typing import AsyncIterator, Optional, List, Dict, Any, Literal, Set, Tuple, Union
 from core.common.utils.async_tools import run_sync
+from core.common.log import logger
+from core.integrations.supabase.keyset import keyset_condition, apply_cursor, decode_cursor
+from core.articles.search import EXCERPT_CHARS, build_tsquery, keyword_terms, with_search_fields
+
+# 列投影预设：列表/扫描只取元数据，避免拉取 content / content_md 大字段
+ArticleProjection = Literal["summary", "with_markdown", "full"]
+_SUMMARY_COLUMNS = "id,mp_id,title,url,publish_time,is_gathered,created_at,updated_at"
+ARTICLE_PROJECTIONS: Dict[str, str] = {
+    "summary": _SUMMARY_COLUMNS,
+    "with_markdown": f"{_SUMMARY_COLUMNS},content_md",
+    # 不含 search_title / search_body 等检索辅助列
+    "full": f"{_SUMMARY_COLUMNS},content,content_md",
+}
+
+
+def article_columns(projection: Union[ArticleProjection, str]) -> str:
+    """预设名转列清单；非预设名按原样作为列清单（如 "id"）。"""
+    return ARTICLE_PROJECTIONS.get(projection, projection)
 
 
 class ArticleRepository:
 
     ARTICLE_TABLE = "articles"
     ARTICLE_IMAGE_TABLE = "article_images"
+    ARTICLE_COUNT_TABLE = "article_counts"
+    # 游标分页的稳定排序：publish_time 相同时以 id 兜底
+    PAGE_ORDER = "publish_time.desc,id.desc"
 
-    def __init__(self, client: Any):
+    def __init__(self, client: Any, count_mode: str = "cached"):
         self.client = client
+        # cached 读取触发器维护的 article_counts；其余为 PostgREST 计数模式
+        self.count_mode = count_mode
 
     async def get_articles_base(
         self,
@@ -17,11 +40,13 @@ class ArticleRepository:
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order_by: str = "publish_time.desc",
+        projection: Union[ArticleProjection, str] = "full",
     ):
         """获取文章列表"""
         return await self.client.select(
             self.ARTICLE_TABLE,
             filters=filters,
+            columns=article_columns(projection),
             limit=limit,
             offset=offset,
             order=order_by,
@@ -33,30 +58,63 @@ class ArticleRepository:
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order_by: str = "publish_time.desc",
+        cursor: Optional[str] = None,
+        projection: Union[ArticleProjection, str] = "full",
     ):
-        """根据公众号ID获取文章列表"""
-        filters = {}
+        """根据公众号ID获取文章列表
+
+        传入 cursor 时走 (publish_time, id) keyset 分页，忽略 offset/order_by。
+        """
+        filters: Dict[str, Any] = {}
         if mp_id is not None:
             filters["mp_id"] = mp_id
 
+        if cursor:
+            return await self.client.select(
+                self.ARTICLE_TABLE,
+                filters=apply_cursor(filters, cursor, "publish_time", "id"),
+                columns=article_columns(projection),
+                limit=limit,
+                order=self.PAGE_ORDER,
+            )
+
         return await self.client.select(
             self.ARTICLE_TABLE,
             filters=filters or None,
+            columns=article_columns(projection),
             limit=limit,
             offset=offset,
             order=order_by,
         )
 
+    def stream_articles(
+        self,
+        filters: Optional[Dict] = None,
+        projection: Union[ArticleProjection, str] = "summary",
+        page_size: int = 500,
+        prefetch: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """按 id keyset 分页逐行遍历文章（见 SupabaseClient.stream）"""
+        return self.client.stream(
+            self.ARTICLE_TABLE,
+            filters=filters,
+            columns=article_columns(projection),
+            page_size=page_size,
+            prefetch=prefetch,
+        )
+
     async def get_articles_by_mp_ids(
         self,
         mp_ids: List[str],
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        projection: Union[ArticleProjection, str] = "full",
     ):
         """根据公众号ID列表获取文章"""
         return await self.client.select(
             self.ARTICLE_TABLE,
             filters={"mp_id": {"in": mp_ids}},
+            columns=article_columns(projection),
             limit=limit,
             offset=offset,
             order="publish_time.desc",
@@ -65,14 +123,53 @@ class ArticleRepository:
     async def get_articles_by_id(
         self,
         article_id: str,
+        projection: Union[ArticleProjection, str] = "full",
     ):
         """根据文章ID获取文章"""
         return await self.client.select(
-            self.ARTICLE_TABLE, filters={"id": article_id}, limit=1
+            self.ARTICLE_TABLE,
+            filters={"id": article_id},
+            columns=article_columns(projection),
+            limit=1,
+        )
+
+    async def get_adjacent_article(
+        self,
+        mp_id: Optional[str],
+        publish_time: int,
+        article_id: str,
+        newer: bool,
+    ):
+        """按 (publish_time, id) 取同一公众号紧邻的一篇文章。
+
+        - newer=True: 比当前更新的一篇（列表中的"下一篇"）
+        - newer=False: 比当前更旧的一篇（列表中的"上一篇"）
+        依赖 (mp_id, publish_time, id) 复合索引，单次查询只返回 1 行。
+        """
+        direction = "asc" if newer else "desc"
+        filters: Dict[str, Any] = {
+            "or": keyset_condition(
+                "publish_time", "id", publish_time, article_id, direction
+            )
+        }
+        if mp_id is not None:
+            filters["mp_id"] = mp_id
+
+        rows = await self.client.select(
+            self.ARTICLE_TABLE,
+            filters=filters,
+            columns=article_columns("full"),
+            order=f"publish_time.{direction},id.{direction}",
+            limit=1,
         )
+        return rows[0] if rows else None
 
     async def get_articles_by_time_range(
-        self, start_time: datetime, end_time: datetime, limit: Optional[int] = None
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        limit: Optional[int] = None,
+        projection: Union[ArticleProjection, str] = "full",
     ):
         filters = {
             "publish_time": {
@@ -81,22 +178,94 @@ class ArticleRepository:
             }
         }
         return await self.client.select(
-            self.ARTICLE_TABLE, filters=filters, order="publish_time.desc", limit=limit
+            self.ARTICLE_TABLE,
+            filters=filters,
+            columns=article_columns(projection),
+            order="publish_time.desc",
+            limit=limit,
         )
 
-    async def count_articles_base(self, filters: Optional[Dict] = None):
-        """统计文章数量"""
-        return await self.client.count(self.ARTICLE_TABLE, filters=filters)
+    async def count_articles_base(
+        self, filters: Optional[Dict] = None, mode: str = "exact"
+    ):
+        """统计文章数量（任意过滤条件，mode 见 SupabaseClient.count）"""
+        return await self.client.count(self.ARTICLE_TABLE, filters=filters, mode=mode)
+
+    async def get_article_counters(self, mp_id: Optional[str] = None) -> Dict[str, int]:
+        """读取计数缓存表，返回 {"total", "with_content"}；mp_id 为空时汇总全部公众号。"""
+        filters = {"mp_id": mp_id} if mp_id is not None else None
+        rows = await self.client.select(
+            self.ARTICLE_COUNT_TABLE,
+            filters=filters,
+            columns="total,with_content",
+        )
+        return {
+            "total": max(0, sum(int(r.get("total") or 0) for r in rows)),
+            "with_content": max(0, sum(int(r.get("with_content") or 0) for r in rows)),
+        }
+
+    async def count_articles(self, mp_id=None, mode: Optional[str] = None):
+        """统计文章数量
+
+        默认按 self.count_mode：cached 读计数缓存表（表不存在时回退 exact），
+        其余模式直接透传给 PostgREST。
+        """
+        mode = mode or self.count_mode
+        if mode == "cached":
+            try:
+                return (await self.get_article_counters(mp_id))["total"]
+            except Exception as e:
+                logger.warning(f"读取文章计数缓存失败，回退 exact 计数: {e}")
+                mode = "exact"
 
-    async def count_articles(self, mp_id=None):
-        """统计文章数量"""
         filters = {}
         if mp_id is not None:
             filters["mp_id"] = mp_id
-        return await self.client.count(self.ARTICLE_TABLE, filters=filters)
+        return await self.client.count(self.ARTICLE_TABLE, filters=filters, mode=mode)
+
+    async def search_articles(
+        self,
+        keyword: str,
+        mp_id: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """全文检索（search_vector GIN 索引），按相关度 (rank, id) 倒序。
+
+        cursor 为上一页最后一行的 encode_cursor(rank, id)；返回行含 rank 与正文片段 excerpt（首个命中词附近）。
+        """
+        tsquery = build_tsquery(keyword)
+        if not tsquery:
+            return []
+        after_rank, after_id = decode_cursor(cursor) if cursor else (None, None)
+        rows = await self.client.rpc(
+            "search_articles",
+            {
+                "q": tsquery,
+                "p_mp_id": mp_id,
+                "p_limit": limit,
+                "after_rank": after_rank,
+                "after_id": after_id,
+                "p_offset": 0 if cursor else offset,
+                "p_terms": keyword_terms(keyword),
+                "p_excerpt_chars": EXCERPT_CHARS,
+            },
+        )
+        return rows or []
 
-    async def search_articles(self, keyword: str, limit: int = 100):
-        """搜索文章"""
+    async def count_search_articles(self, keyword: str, mp_id: Optional[str] = None) -> int:
+        """全文检索命中数"""
+        tsquery = build_tsquery(keyword)
+        if not tsquery:
+            return 0
+        total = await self.client.rpc(
+            "search_articles_count", {"q": tsquery, "p_mp_id": mp_id}
+        )
+        return int(total or 0)
+
+    async def search_articles_like(self, keyword: str, limit: int = 100):
+        """旧版标题 LIKE 搜索（无法走索引，仅作对照基准保留）"""
         # 格式化搜索关键词
         words = keyword.replace("-", " ").replace("|", " ").split(" ")
         words = [word.strip() for word in words if word.strip()]
@@ -109,7 +278,11 @@ class ArticleRepository:
             filters["or"].append({"title": {"like": f"%{word}%"}})
 
         return await self.client.select(
-            self.ARTICLE_TABLE, filters=filters, limit=limit, order="publish_time.desc"
+            self.ARTICLE_TABLE,
+            filters=filters,
+            columns=article_columns("summary"),
+            limit=limit,
+            order="publish_time.desc",
         )
 
     # TODO: 统一文章列表查询接口, 支持 search + 过滤条件
@@ -131,11 +304,11 @@ class ArticleRepository:
     #     if search:
     #         # 搜索模式：沿用原先 search_articles 的语义
     #         if limit is not None and offset is not None:
-    #             raw = await self.search_articles(search, limit=limit + offset)
+    #             raw = await self.search_articles_like(search, limit=limit + offset)
     #             total = len(raw)
     #             articles = raw[offset : offset + limit]
     #         else:
-    #             raw = await self.search_articles(search)
+    #             raw = await self.search_articles_like(search)
     #             total = len(raw)
     #             articles = raw
     #         return articles, total
@@ -157,22 +330,80 @@ class ArticleRepository:
     #     total = await self.count_articles(mp_id=mp_id, status=status)
     #     return articles, total
 
-    async def clean_expired_articles(self, days: int = 15):
+    async def clean_expired_articles(self, days: int = 15, batch_size: int = 500):
+        """分批删除过期文章（仅数据库，不处理 storage 对象）"""
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
         cutoff_ts = int(cutoff_date.timestamp())
-        expired_articles = await self.client.select(
+        total = 0
+        while True:
+            ids = await self.get_expired_article_ids(cutoff_ts, batch_size)
+            if not ids:
+                return total
+            deleted = await self.delete_articles_by_ids(ids, before_ts=cutoff_ts)
+            if deleted == 0:
+                return total
+            total += deleted
+
+    async def get_expired_article_ids(self, cutoff_ts: int, limit: int) -> List[str]:
+        """按 publish_time 升序取一批过期文章 id（只取 id 列）"""
+        rows = await self.client.select(
             self.ARTICLE_TABLE,
             filters={"publish_time": {"lt": cutoff_ts}},
+            columns="id",
+            order="publish_time.asc,id.asc",
+            limit=limit,
         )
+        return [str(r["id"]) for r in rows if r.get("id")]
 
-        if not expired_articles:
+    async def get_image_objects_by_articles(
+        self, article_ids: List[str]
+    ) -> List[Dict[str, Any]]:
+        """批量取多篇文章的图片对象（article_id, bucket, object_path）"""
+        if not article_ids:
+            return []
+        return await self.client.select(
+            self.ARTICLE_IMAGE_TABLE,
+            filters={"article_id": {"in": article_ids}},
+            columns="article_id,bucket,object_path",
+        )
+
+    async def get_referenced_image_objects(
+        self, object_paths: List[str], chunk_size: int = 100
+    ) -> Set[Tuple[str, str]]:
+        """返回仍被 article_images 引用的 (bucket, object_path)（分批查询，避免 URL 过长）"""
+        referenced: Set[Tuple[str, str]] = set()
+        for start in range(0, len(object_paths), chunk_size):
+            rows = await self.client.select(
+                self.ARTICLE_IMAGE_TABLE,
+                filters={"object_path": {"in": object_paths[start : start + chunk_size]}},
+                columns="bucket,object_path",
+            )
+            referenced.update((str(r.get("bucket") or ""), str(r.get("object_path") or "")) for r in rows)
+        return referenced
+
+    async def delete_articles_by_ids(
+        self, article_ids: List[str], before_ts: Optional[int] = None
+    ) -> int:
+        """按 id 批量删除文章（article_images 级联删除），返回删除条数。
+
+        before_ts 用于保留策略，防止期间被重新写入（publish_time 已更新）的文章被误删。
+        """
+        if not article_ids:
             return 0
+        filters: Dict[str, Any] = {"id": {"in": article_ids}}
+        if before_ts is not None:
+            filters["publish_time"] = {"lt": before_ts}
+        return await self.client.delete_count(self.ARTICLE_TABLE, filters)
 
-        article_ids = [article["id"] for article in expired_articles]
-        deleted_articles = await self.client.delete(
-            self.ARTICLE_TABLE, {"id": {"in": article_ids}}
-        )
-        return len(deleted_articles)
+    async def find_orphan_article_ids(self, limit: int = 500) -> List[str]:
+        """数据库侧 anti-join 找出一批孤儿文章 id"""
+        rows = await self.client.rpc("find_orphan_article_ids", {"p_limit": limit})
+        return [str(r["id"]) for r in rows or [] if r.get("id")]
+
+    async def find_duplicate_article_ids(self, limit: int = 500) -> List[str]:
+        """数据库侧窗口函数找出一批重复文章 id（每组保留最新一篇）"""
+        rows = await self.client.rpc("find_duplicate_article_ids", {"p_limit": limit})
+        return [str(r["id"]) for r in rows or [] if r.get("id")]
 
     async def delete_article(self, article_id: str):
         """删除文章"""
@@ -216,6 +447,11 @@ class ArticleRepository:
                     "public_url": img.get("public_url") or "",
                     "origin_url": img.get("origin_url") or "",
                     "position": img.get("position") or idx,
+                    "variant": img.get("variant") or "",
+                    "source_path": img.get("source_path") or "",
+                    "width": img.get("width"),
+                    "bytes": img.get("bytes"),
+                    "content_type": img.get("content_type"),
                 }
             )
         if not rows:
@@ -230,7 +466,7 @@ class ArticleRepository:
         """创建文章（按 id 幂等写入：存在则更新，不存在则插入）"""
         rows = await self.client.upsert(
             self.ARTICLE_TABLE,
-            article_data,
+            with_search_fields(article_data),
             on_conflict="id",
         )
         return rows[0] if rows else {}
@@ -239,9 +475,29 @@ class ArticleRepository:
         """更新文章"""
         article_data["updated_at"] = datetime.now(timezone.utc).isoformat()
         return await self.client.update(
-            self.ARTICLE_TABLE, article_data, filters={"id": article_id}
+            self.ARTICLE_TABLE, with_search_fields(article_data), filters={"id": article_id}
         )
 
+    async def backfill_search_fields(self, batch_size: int = 200) -> int:
+        """为历史文章补齐预分词字段（流式遍历 search_title 为空的文章），返回处理条数。"""
+        done = 0
+        async for row in self.stream_articles(
+            filters={"search_title": {"is": None}},
+            projection="id,title,content_md",
+            page_size=batch_size,
+            prefetch=True,
+        ):
+            data = with_search_fields(
+                {"title": row.get("title"), "content_md": row.get("content_md")}
+            )
+            data.pop("title", None)
+            data.pop("content_md", None)
+            await self.client.update(self.ARTICLE_TABLE, data, filters={"id": row["id"]})
+            done += 1
+            if done % batch_size == 0:
+                logger.info(f"文章检索字段回填进度: {done}")
+        return done
+
     #! 同步接口封装，用于jobs
 
     def sync_create_article(self, article_data: Dict):
@@ -252,9 +508,13 @@ class ArticleRepository:
         """同步更新文章（用于兼容同步代码）"""
         return run_sync(self.update_article(article_id, article_data))
 
-    def sync_count_articles(self, filters: Optional[Dict] = None):
+    def sync_count_articles(self, filters: Optional[Dict] = None, mode: str = "exact"):
         """同步统计文章数量（用于兼容同步代码）"""
-        return run_sync(self.count_articles_base(filters=filters))
+        return run_sync(self.count_articles_base(filters=filters, mode=mode))
+
+    def sync_get_article_counters(self, mp_id: Optional[str] = None):
+        """同步读取文章计数缓存（用于兼容同步代码）"""
+        return run_sync(self.get_article_counters(mp_id))
 
     def sync_get_articles(
         self,
@@ -262,11 +522,16 @@ class ArticleRepository:
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order_by: str = "publish_time.desc",
+        projection: Union[ArticleProjection, str] = "full",
     ):
         """同步获取文章列表（用于兼容同步代码）"""
         return run_sync(
             self.get_articles_base(
-                filters=filters, limit=limit, offset=offset, order_by=order_by
+                filters=filters,
+                limit=limit,
+                offset=offset,
+                order_by=order_by,
+                projection=projection,
             )
         )
 
@@ -277,3 +542,7 @@ class ArticleRepository:
     def sync_replace_article_images(self, article_id: str, images: List[Dict[str, Any]]):
         """同步替换文章图片映射（用于兼容同步代码）。"""
         return run_sync(self.replace_article_images(article_id, images))
+
+    def sync_get_article_images(self, article_id: str):
+        """同步获取文章图片映射（用于兼容同步代码）。"""
+        return run_sync(self.get_article_images(article_id))
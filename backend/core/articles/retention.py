@@ -0,0 +1,225 @@
+"""文章保留策略：按 publish_time 分批清理过期文章及其 storage 图片。
+
+每批流程：
+1. 按 (publish_time, id) 升序取 batch_size 个过期文章 id（只取 id 列）
+2. 从 article_images 取这批文章的对象路径（不再解析正文）
+3. 按 id + 截止时间删除文章，article_images 级联删除
+4. 调 storage 批量删除接口删除不再被任何 article_images 引用的对象（共用路径、未删除的文章保留其对象）
+
+先删行再删对象，不会出现文章仍在而图片已删；删对象失败或中断只留下无引用的对象。
+中断后用同一截止时间重跑即可续上；days 变化时按新的截止时间重新开始。
+进度写入 data/retention_job.json；跨进程由文件锁保证同一时间只有一个任务运行。
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from core.articles import article_repo
+from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+from core.integrations.supabase.storage import supabase_storage_articles
+from driver.session.lock import LockManager
+
+DEFAULT_RETENTION_DAYS = 15
+DEFAULT_BATCH_SIZE = 500
+STATE_FILE = "data/retention_job.json"
+LOCK_FILE = "data/.retention.lock"
+# 单个任务的最长持有时间，超时视为进程异常退出
+LOCK_TTL_SECONDS = 2 * 60 * 60
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RetentionJob:
+    """可续跑的过期文章清理任务（后台线程执行）"""
+
+    def __init__(
+        self,
+        repo: Any = article_repo,
+        storage: Any = supabase_storage_articles,
+        state_file: str = STATE_FILE,
+        lock_file: str = LOCK_FILE,
+    ):
+        self.repo = repo
+        self.storage = storage
+        self.state_file = state_file
+        self.lock = LockManager(lock_file, ttl_seconds=LOCK_TTL_SECONDS)
+        self._mutex = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    #! 状态持久化
+
+    def status(self) -> Dict[str, Any]:
+        """读取任务进度；从未运行过时返回 {"status": "idle"}"""
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"status": "idle"}
+        except Exception as e:
+            logger.warning(f"读取保留任务状态失败: {e}")
+            return {"status": "idle"}
+
+    def _save(self, state: Dict[str, Any]) -> None:
+        state["updated_at"] = _now_iso()
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp = f"{self.state_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, self.state_file)
+
+    def _running_here(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    #! 任务控制
+
+    def start(
+        self,
+        days: int = DEFAULT_RETENTION_DAYS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        resume: bool = False,
+    ) -> Dict[str, Any]:
+        """启动清理；上次任务未完成（进程重启/失败）且 days 相同（或 resume=True）时沿用其截止时间与进度续跑"""
+        with self._mutex:
+            state = self.status()
+            if self._running_here() or not self.lock.try_acquire():
+                return state
+
+            unfinished = state.get("status") in ("running", "failed") and state.get("cutoff_ts")
+            if unfinished and (resume or state.get("days") == days):
+                logger.info(f"续跑过期文章清理任务 cutoff_ts={state['cutoff_ts']}")
+            else:
+                if unfinished:
+                    logger.warning(
+                        f"上次未完成的过期文章清理任务 days={state.get('days')} 与本次 days={days} 不同，"
+                        "按新的截止时间重新开始"
+                    )
+                cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+                state = {
+                    "days": days,
+                    "cutoff_ts": int(cutoff.timestamp()),
+                    "batch_size": batch_size,
+                    "batches": 0,
+                    "deleted_articles": 0,
+                    "deleted_objects": 0,
+                    "failed_objects": 0,
+                    "started_at": _now_iso(),
+                    "finished_at": None,
+                }
+            state["status"] = "running"
+            state["last_error"] = None
+            try:
+                self._save(state)
+                # 锁在 start 中取得，由执行线程结束时释放
+                self._thread = threading.Thread(
+                    target=self._run, args=(state,), daemon=True, name="article-retention"
+                )
+                self._thread.start()
+            except Exception:
+                self.lock.release()
+                raise
+            return state
+
+    def resume_interrupted(self) -> None:
+        """服务启动时调用：上次进程退出时仍在运行的任务自动续跑"""
+        state = self.status()
+        if state.get("status") == "running":
+            self.start(
+                days=int(state.get("days") or DEFAULT_RETENTION_DAYS),
+                batch_size=int(state.get("batch_size") or DEFAULT_BATCH_SIZE),
+                resume=True,
+            )
+
+    def _run(self, state: Dict[str, Any]) -> None:
+        try:
+            cutoff_ts = int(state["cutoff_ts"])
+            batch_size = int(state.get("batch_size") or DEFAULT_BATCH_SIZE)
+            while True:
+                t0 = time.perf_counter()
+                result = run_sync(self.purge_batch(cutoff_ts, batch_size))
+                if result["articles"] == 0:
+                    break
+                state["batches"] += 1
+                state["deleted_articles"] += result["articles"]
+                state["deleted_objects"] += result["objects"]
+                state["failed_objects"] += result["failed_objects"]
+                self._save(state)
+                logger.info(
+                    f"过期文章清理进度: batch={state['batches']} "
+                    f"articles={state['deleted_articles']} objects={state['deleted_objects']} "
+                    f"({time.perf_counter() - t0:.2f}s)"
+                )
+            state["status"] = "done"
+            state["finished_at"] = _now_iso()
+            self._save(state)
+            logger.info(f"过期文章清理完成: {state['deleted_articles']} 篇")
+        except Exception as e:
+            logger.error(f"过期文章清理失败: {e}")
+            state["status"] = "failed"
+            state["last_error"] = str(e)
+            self._save(state)
+        finally:
+            self.lock.release()
+
+    async def purge_batch(self, cutoff_ts: int, batch_size: int) -> Dict[str, int]:
+        """清理一批，返回 {"articles", "objects", "failed_objects"}"""
+        ids = await self.repo.get_expired_article_ids(cutoff_ts, batch_size)
+        if not ids:
+            return {"articles": 0, "objects": 0, "failed_objects": 0}
+        result = await delete_articles_with_objects(
+            ids, before_ts=cutoff_ts, repo=self.repo, storage=self.storage
+        )
+        if result["articles"] == 0:
+            # 行存在却删不掉（权限/约束），避免死循环
+            raise RuntimeError(f"过期文章删除失败 ids={ids[:5]}...")
+        return result
+
+
+async def delete_articles_with_objects(
+    ids: List[str],
+    before_ts: Optional[int] = None,
+    repo: Any = article_repo,
+    storage: Any = supabase_storage_articles,
+) -> Dict[str, int]:
+    """按 id 删除一批文章：先删行（article_images 级联删除），再批量删不再被引用的 storage 对象。
+
+    存储路径可能被多篇文章共用（同标题文章生成相同路径、已有对象直接复用），
+    删行后仍有 article_images 引用的对象（含期间被重新写入而未删除的文章）予以保留。
+    """
+    objects = await repo.get_image_objects_by_articles(ids)
+    deleted_articles = await repo.delete_articles_by_ids(ids, before_ts=before_ts)
+    if deleted_articles == 0:
+        return {"articles": 0, "objects": 0, "failed_objects": 0}
+
+    candidates = {
+        (row.get("bucket") or storage.bucket, str(row.get("object_path") or "").strip())
+        for row in objects
+    }
+    candidates = {(bucket, path) for bucket, path in candidates if path}
+    referenced = await repo.get_referenced_image_objects(sorted({path for _, path in candidates}))
+    by_bucket: Dict[str, List[str]] = defaultdict(list)
+    for bucket, path in sorted(candidates):
+        if (bucket, path) not in referenced:
+            by_bucket[bucket].append(path)
+
+    deleted_objects = 0
+    failed_objects = 0
+    for bucket, paths in by_bucket.items():
+        deleted, failed = await storage.delete_objects(paths, bucket=bucket)
+        deleted_objects += len(deleted)
+        failed_objects += len(failed)
+    return {
+        "articles": deleted_articles,
+        "objects": deleted_objects,
+        "failed_objects": failed_objects,
+    }
+
+
+retention_job = RetentionJob()
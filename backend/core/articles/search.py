@@ -0,0 +1,159 @@
+"""文章全文检索：入库时分词、查询串构造与结果高亮。
+
+PostgreSQL 内置解析器不会切分中文，这里在入库时把标题/正文预先切成
+"中文二元组 + 英文/数字单词" 的空格分隔串，写入 search_title / search_body，
+由生成列 search_vector（'simple' 配置）建 GIN 索引。查询时用同样规则切分关键词，
+相邻二元组以 <-> 连接，等价于短语匹配。
+"""
+
+import html
+import re
+from typing import Any, Dict, List, Optional
+
+# 正文只索引前 N 个字符，避免超长文章撑大 tsvector（上限 1MB）
+MAX_BODY_CHARS = 30000
+# 高亮摘要长度
+SNIPPET_CHARS = 120
+# 检索 RPC 返回的正文片段长度（首个命中词前后），摘要从中截取
+EXCERPT_CHARS = 600
+
+_CJK = "㐀-䶿一-鿿豈-﫿"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[0-9a-zA-Z]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+# markdown 图片/链接/标记，高亮前剔除
+_MD_IMAGE_RE = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+_MD_MARK_RE = re.compile(r"[#>*_`|~-]+")
+_SPACE_RE = re.compile(r"\s+")
+# 片段两端被截断的 markdown 图片/链接残片
+_MD_CUT_HEAD_RE = re.compile(r"^[^\s\[\]()]*\)")
+_MD_CUT_TAIL_RE = re.compile(r"!?\[[^\]]*(\]\([^)]*)?$")
+
+
+def _bigrams(run: str) -> List[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """切分为检索 token：中文按重叠二元组，英文/数字整词小写。"""
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(text or ""):
+        run = match.group(0)
+        if _CJK_RE.match(run):
+            tokens.extend(_bigrams(run))
+        else:
+            tokens.append(run.lower())
+    return tokens
+
+
+def segment(text: str, max_chars: Optional[int] = None) -> str:
+    """入库用：返回空格分隔的 token 串。"""
+    value = str(text or "")
+    if max_chars is not None:
+        value = value[:max_chars]
+    return " ".join(tokenize(value))
+
+
+def with_search_fields(article_data: Dict[str, Any]) -> Dict[str, Any]:
+    """按本次写入的 title / content_md 补充预分词字段（未写入的字段不动）。"""
+    data = dict(article_data)
+    if "title" in data:
+        data["search_title"] = segment(data.get("title") or "")
+    if "content_md" in data:
+        data["search_body"] = segment(data.get("content_md") or "", MAX_BODY_CHARS)
+    return data
+
+
+def _split_keywords(keyword: str) -> List[List[str]]:
+    """"a b|c" -> [["a", "b"], ["c"]]：空格为 AND，| 为 OR。"""
+    groups: List[List[str]] = []
+    for part in str(keyword or "").split("|"):
+        words = [w for w in part.replace("-", " ").split() if w.strip()]
+        if words:
+            groups.append(words)
+    return groups
+
+
+def _word_query(word: str) -> str:
+    parts: List[str] = []
+    for match in _TOKEN_RE.finditer(word):
+        run = match.group(0)
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                # 单字只能前缀匹配以它开头的二元组
+                parts.append(f"{run}:*")
+            else:
+                parts.append("(" + " <-> ".join(_bigrams(run)) + ")")
+        else:
+            parts.append(run.lower())
+    if not parts:
+        return ""
+    return parts[0] if len(parts) == 1 else "(" + " <-> ".join(parts) + ")"
+
+
+def build_tsquery(keyword: str) -> str:
+    """构造 to_tsquery('simple', ...) 的查询串；无有效词时返回空串。
+
+    token 仅由中文/字母/数字组成，无需额外转义。
+    """
+    ors: List[str] = []
+    for words in _split_keywords(keyword):
+        ands = [q for q in (_word_query(w) for w in words) if q]
+        if ands:
+            ors.append("(" + " & ".join(ands) + ")")
+    return " | ".join(ors)
+
+
+def keyword_terms(keyword: str) -> List[str]:
+    """高亮用的原始词（去重，长词优先）。"""
+    terms = {w for words in _split_keywords(keyword) for w in words}
+    return sorted(terms, key=len, reverse=True)
+
+
+def _plain_markdown(text: str) -> str:
+    text = _MD_IMAGE_RE.sub(" ", text or "")
+    text = _MD_LINK_RE.sub(r"\1", text)
+    text = _MD_MARK_RE.sub(" ", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def highlight(
+    text: str,
+    terms: List[str],
+    snippet_chars: Optional[int] = None,
+    tag: str = "mark",
+) -> str:
+    """HTML 转义后用 <mark> 包裹命中词；指定 snippet_chars 时截取首个命中附近的片段。"""
+    value = str(text or "")
+    if not terms:
+        return html.escape(value[:snippet_chars] if snippet_chars else value)
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+
+    if snippet_chars:
+        hit = pattern.search(value)
+        start = max(0, (hit.start() if hit else 0) - snippet_chars // 4)
+        end = start + snippet_chars
+        value = ("…" if start > 0 else "") + value[start:end] + (
+            "…" if end < len(value) else ""
+        )
+
+    out: List[str] = []
+    pos = 0
+    for m in pattern.finditer(value):
+        out.append(html.escape(value[pos : m.start()]))
+        out.append(f"<{tag}>{html.escape(m.group(0))}</{tag}>")
+        pos = m.end()
+    out.append(html.escape(value[pos:]))
+    return "".join(out)
+
+
+def highlight_row(row: Dict[str, Any], terms: List[str]) -> Dict[str, Any]:
+    """为检索结果附加 title_highlight / snippet（由 RPC 返回的正文片段 excerpt 生成）。"""
+    data = dict(row)
+    excerpt = data.pop("excerpt", None) or ""
+    excerpt = _MD_CUT_TAIL_RE.sub("", _MD_CUT_HEAD_RE.sub("", excerpt))
+    data["title_highlight"] = highlight(data.get("title") or "", terms)
+    data["snippet"] = highlight(_plain_markdown(excerpt), terms, SNIPPET_CHARS)
+    return data
@@ -35,15 +35,34 @@ class AppSettings:
     log_level: str
     log_file: str
     cache_dir: str
+    image_cache_disk_bytes: int
+    image_cache_ttl: int
+    image_variant_workers: int
+    image_variant_widths: str
+    image_variant_formats: str
     local_avatar: bool
     avatar_max_bytes: int
     safe_lic_key: str
     webhook_content_format: str
+    webhook_payload_mode: str
+    article_count_mode: str
+    queue_db: str
+    queue_concurrency: str
+    queue_timeouts: str
+    queue_visibility_timeout: int
+    scheduler_leader_election: bool
+    scheduler_lease_ttl: int
+    metrics_token: str
     user_agent: str
+    wx_mp_base: str
+    wx_http_pool_size: int
+    wx_http_retries: int
     notice_dingding: str
     notice_wechat: str
     notice_feishu: str
     notice_custom: str
+    notice_timeout: int
+    notice_max_attempts: int
 
 
 def load_app_settings() -> AppSettings:
@@ -61,18 +80,37 @@ def load_app_settings() -> AppSettings:
         log_level=os.getenv("LOG_LEVEL", "INFO").upper(),
         log_file=os.getenv("LOG_FILE", "./data/logs/wx-harvester.log"),
         cache_dir=os.getenv("CACHE_DIR", "data/cache"),
+        image_cache_disk_bytes=max(0, _as_int(os.getenv("IMAGE_CACHE_DISK_BYTES"), 512 * 1024 * 1024)),
+        image_cache_ttl=max(60, _as_int(os.getenv("IMAGE_CACHE_TTL"), 3600)),
+        image_variant_workers=max(0, _as_int(os.getenv("IMAGE_VARIANT_WORKERS"), max(1, (os.cpu_count() or 2) // 2))),
+        image_variant_widths=os.getenv("IMAGE_VARIANT_WIDTHS", "360,720,1080"),
+        image_variant_formats=os.getenv("IMAGE_VARIANT_FORMATS", "avif,webp").lower(),
         local_avatar=_as_bool(os.getenv("LOCAL_AVATAR"), False),
         avatar_max_bytes=_as_int(os.getenv("AVATAR_MAX_BYTES"), 5 * 1024 * 1024),
         safe_lic_key=os.getenv("SAFE_LIC_KEY", "PHOENINE-SECURE-LIC-KEY-1234567890"),
         webhook_content_format=os.getenv("WEBHOOK_CONTENT_FORMAT", "html"),
+        webhook_payload_mode=os.getenv("WEBHOOK_PAYLOAD_MODE", "template").lower(),
+        article_count_mode=os.getenv("ARTICLE_COUNT_MODE", "cached").lower(),
+        queue_db=os.getenv("QUEUE_DB", "data/task_queue.db"),
+        queue_concurrency=os.getenv("QUEUE_CONCURRENCY", ""),
+        queue_timeouts=os.getenv("QUEUE_TIMEOUTS", ""),
+        queue_visibility_timeout=max(30, _as_int(os.getenv("QUEUE_VISIBILITY_TIMEOUT"), 600)),
+        scheduler_leader_election=_as_bool(os.getenv("SCHEDULER_LEADER_ELECTION"), False),
+        scheduler_lease_ttl=max(3, _as_int(os.getenv("SCHEDULER_LEASE_TTL"), 15)),
+        metrics_token=os.getenv("METRICS_TOKEN", ""),
         user_agent=os.getenv(
             "USER_AGENT",
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36/WeRss",
         ),
+        wx_mp_base=os.getenv("WX_MP_BASE", "https://mp.weixin.qq.com").rstrip("/"),
+        wx_http_pool_size=max(1, _as_int(os.getenv("WX_HTTP_POOL_SIZE"), 16)),
+        wx_http_retries=max(0, _as_int(os.getenv("WX_HTTP_RETRIES"), 2)),
         notice_dingding=os.getenv("DINGDING_WEBHOOK", ""),
         notice_wechat=os.getenv("WECHAT_WEBHOOK", ""),
         notice_feishu=os.getenv("FEISHU_WEBHOOK", ""),
         notice_custom=os.getenv("CUSTOM_WEBHOOK", ""),
+        notice_timeout=max(1, _as_int(os.getenv("NOTICE_TIMEOUT"), 10)),
+        notice_max_attempts=max(1, _as_int(os.getenv("NOTICE_MAX_ATTEMPTS"), 6)),
     )
 
 
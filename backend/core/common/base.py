@@ -1,20 +1,38 @@
-import requests
+import threading
+import time
+
 from core.common.log import logger
 from core.common.version import *
 
-try:
-    response = requests.get(
-        "https://api.github.com/repos/rachelos/we-mp-rss/releases/latest"
-    )
-    response.raise_for_status()  # 检查请求是否成功
-    data = response.json()
-    LATEST_VERSION = data.get("tag_name", "").replace("v", "")
-except requests.RequestException as e:
-    logger.info(f"Failed to fetch latest version: {e}")
-    LATEST_VERSION = ""
-except ValueError as e:
-    logger.info(f"Failed to parse JSON response: {e}")
-    LATEST_VERSION = ""
+LATEST_RELEASE_URL = "https://api.github.com/repos/rachelos/we-mp-rss/releases/latest"
+# 最新版本号的缓存时间（秒），查询失败时同样缓存，避免每次请求都访问 GitHub
+LATEST_VERSION_TTL = 3600
+
+_latest_lock = threading.Lock()
+_latest: tuple[float, str] | None = None
+
+
+def get_latest_version() -> str:
+    """查询 GitHub 最新发布版本号（首次调用时请求，结果缓存 LATEST_VERSION_TTL 秒），失败返回空字符串"""
+    global _latest
+    with _latest_lock:
+        if _latest is not None and time.monotonic() - _latest[0] < LATEST_VERSION_TTL:
+            return _latest[1]
+        import requests
+
+        try:
+            response = requests.get(LATEST_RELEASE_URL, timeout=5)
+            response.raise_for_status()  # 检查请求是否成功
+            version = response.json().get("tag_name", "").replace("v", "")
+        except requests.RequestException as e:
+            logger.info(f"Failed to fetch latest version: {e}")
+            version = ""
+        except ValueError as e:
+            logger.info(f"Failed to parse JSON response: {e}")
+            version = ""
+        _latest = (time.monotonic(), version)
+        return version
+
 
 # API接口前缀
 API_BASE = "/api/v1/wx"
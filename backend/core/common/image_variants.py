@@ -0,0 +1,186 @@
+"""文章图片派生图：按若干宽度生成 WebP / AVIF，供 <picture> 的 srcset 使用。
+
+编码是 CPU 密集操作，放在进程池（IMAGE_VARIANT_WORKERS 个进程）中执行，
+采集线程提交后等待结果，CPU 占用受进程数限制。
+未安装 Pillow 或 Pillow 不支持某格式时跳过对应格式；没有可用格式时不生成派生图。
+"""
+
+import io
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.common.app_settings import settings
+from core.common.log import logger
+from core.common.metrics import counter, histogram
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+# 各格式编码参数；AVIF 使用较快的 speed，避免单张图占用进程过久
+SAVE_OPTIONS: Dict[str, dict] = {
+    "avif": {"quality": 55, "speed": 8},
+    "webp": {"quality": 78, "method": 4},
+}
+# <source> 按顺序匹配，压缩率高的格式在前
+FORMAT_ORDER = ("avif", "webp")
+# <picture> 中 source 的 sizes：窄屏占满视口，宽屏按正文最大宽度
+SIZES = "(max-width: 1080px) 100vw, 1080px"
+# 小于该字节数的原图（图标、分割线等）不生成派生图
+MIN_SOURCE_BYTES = 16 * 1024
+# 单张图片编码超时（秒）
+ENCODE_TIMEOUT = 120
+
+VARIANT_SECONDS = histogram("image_variant_encode_seconds", "单张图片生成全部派生图耗时", ["outcome"])
+VARIANTS = counter("image_variants_total", "生成的派生图数量", ["format"])
+
+
+@dataclass
+class Variant:
+    format: str
+    width: int
+    data: bytes
+
+    @property
+    def content_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+    @property
+    def name(self) -> str:
+        return f"{self.format}-{self.width}"
+
+
+def _parse_list(value: str) -> List[str]:
+    return [item.strip().lower() for item in (value or "").split(",") if item.strip()]
+
+
+def encode_variants(data: bytes, widths: Sequence[int], formats: Sequence[str]) -> List[Tuple[str, int, bytes]]:
+    """在子进程中执行：解码一次，按宽度从大到小逐级缩放并编码各格式。
+
+    不放大：小于原图宽度的目标宽度各生成一份；原图不超过最大目标宽度时再按原尺寸转码一份。
+    动图跳过。
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        if getattr(source, "is_animated", False):
+            return []
+        img = ImageOps.exif_transpose(source)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+    src_width, src_height = img.size
+    targets = {w for w in widths if w < src_width}
+    if src_width <= max(widths):
+        targets.add(src_width)
+
+    results: List[Tuple[str, int, bytes]] = []
+    current = img
+    for width in sorted(targets, reverse=True):
+        if width != current.width:
+            height = max(1, round(src_height * width / src_width))
+            current = current.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            buf = io.BytesIO()
+            current.save(buf, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+            results.append((fmt, width, buf.getvalue()))
+    return results
+
+
+class VariantEncoder:
+    """派生图编码进程池（首次使用时创建，spawn 方式启动，避免 fork 多线程进程）"""
+
+    def __init__(self, workers: int, widths: Sequence[int], formats: Sequence[str]):
+        self.workers = workers
+        self.widths = sorted({int(w) for w in widths if int(w) > 0})
+        self.requested_formats = [f for f in formats if f in MIME_TYPES]
+        self._formats: Optional[List[str]] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def formats(self) -> List[str]:
+        """当前环境 Pillow 支持的格式（按 FORMAT_ORDER 排序）"""
+        if self._formats is None:
+            try:
+                from PIL import features
+
+                supported = [f for f in FORMAT_ORDER if f in self.requested_formats and features.check(f)]
+            except ImportError:
+                supported = []
+                logger.warning("未安装 Pillow，不生成图片派生图")
+            self._formats = supported
+        return self._formats
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0 and bool(self.widths) and bool(self.formats)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def generate(self, data: bytes) -> List[Variant]:
+        """生成派生图；失败时返回空列表（保留原图即可）。只保留比原图小的结果"""
+        if not self.enabled or len(data) < MIN_SOURCE_BYTES:
+            return []
+        start = time.perf_counter()
+        try:
+            future = self._executor().submit(encode_variants, data, self.widths, self.formats)
+            raw = future.result(timeout=ENCODE_TIMEOUT)
+        except BrokenProcessPool as e:
+            VARIANT_SECONDS.observe(time.perf_counter() - start, outcome="error")
+            logger.warning(f"派生图进程池异常，重建后继续: {e}")
+            self.shutdown()
+            return []
+        except Exception as e:
+            VARIANT_SECONDS.observe(time.perf_counter() - start, outcome="error")
+            logger.warning(f"生成图片派生图失败: {e}")
+            return []
+        VARIANT_SECONDS.observe(time.perf_counter() - start, outcome="ok")
+        variants = [Variant(fmt, width, body) for fmt, width, body in raw if len(body) < len(data)]
+        for variant in variants:
+            VARIANTS.inc(format=variant.format)
+        return variants
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def build_srcset(candidates: Sequence[Tuple[str, int]]) -> str:
+    """[(url, 宽度)] -> "url 360w, url 720w" """
+    return ", ".join(f"{url} {width}w" for url, width in sorted(candidates, key=lambda c: c[1]))
+
+
+def view_bytes(original: int, variants: Sequence[Tuple[str, int, int]], view_width: int) -> int:
+    """估算以 view_width 像素显示时实际下载的字节数。
+
+    variants 为 [(格式, 宽度, 字节数)]：取优先格式中不小于 view_width 的最小宽度（没有则取最大宽度），
+    与浏览器按 srcset 选图的方式一致；没有派生图时为原图大小。
+    """
+    for fmt in FORMAT_ORDER:
+        sized = sorted((w, b) for f, w, b in variants if f == fmt)
+        if not sized:
+            continue
+        for width, size in sized:
+            if width >= view_width:
+                return size
+        return sized[-1][1]
+    return original
+
+
+def _load_encoder() -> VariantEncoder:
+    widths = [int(w) for w in _parse_list(settings.image_variant_widths) if w.isdigit()]
+    return VariantEncoder(settings.image_variant_workers, widths, _parse_list(settings.image_variant_formats))
+
+
+variant_encoder = _load_encoder()
@@ -1,6 +1,12 @@
 import re
-from typing import Any, Dict, List, Union
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from core.common.log import logger
+from core.common.metrics import cache_hit, cache_miss
+
+__all__ = ["TemplateParser", "CompiledTemplate", "get_template", "clear_template_cache"]
 
 
 # """
@@ -10,9 +16,386 @@ from core.common.log import logger
 # 1. 简单变量替换: {{ variable }}
 # 2. 条件判断: {% if condition %}...{% endif %}
 # 3. 循环结构: {% for item in items %}...{% endfor %}
+# 4. 表达式: {{= len(articles) }}
+#
+# 模板文本首次使用时编译为节点树（表达式预编译为 code object），
+# 按模板文本缓存在进程内 LRU 中，之后的渲染只做取值和拼接。
 # """
 # TODO 考虑使用Jinja2直接替换
 
+TEMPLATE_CACHE_SIZE = 64
+
+_TOKEN_RE = re.compile(
+    r"(\{\%.*?\%\})|"  # control blocks {% ... %}
+    r"(\{\{.*?\}\})"  # variables {{ ... }}
+)
+# 属性路径 a.b.c（按 _lookup 逐级取值，支持 dict 与对象）
+_PATH_RE = re.compile(r"^[A-Za-z_]\w*(\.[A-Za-z_]\w*)+$")
+
+_SAFE_GLOBALS: Dict[str, Any] = {
+    "None": None,
+    "True": True,
+    "False": False,
+    "bool": bool,
+    "int": int,
+    "float": float,
+    "str": str,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "len": len,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "abs": abs,
+    "round": round,
+}
+
+_FORBIDDEN = (
+    "import",
+    "open",
+    "exec",
+    "eval",
+    "system",
+    "subprocess",
+    "__import__",
+    "getattr",
+    "setattr",
+    "delattr",
+    "compile",
+    "globals",
+    "locals",
+    "vars",
+    "dir",
+    "help",
+    "reload",
+    "input",
+    "file",
+    "execfile",
+    "exit",
+    "quit",
+)
+
+# 节点：node(context, env, out)，env 为 eval 用的全局命名空间（安全内置 + 自定义函数）
+Node = Callable[[Dict[str, Any], Dict[str, Any], List[str]], None]
+# 条件：cond(context, env) -> (结果, 需要写回上下文的变量)
+Condition = Callable[[Dict[str, Any], Dict[str, Any]], Tuple[bool, Optional[Dict[str, Any]]]]
+
+
+def _is_safe_expression(expr: str) -> bool:
+    """检查表达式是否包含危险操作"""
+    expr_lower = expr.lower()
+    return not any(keyword in expr_lower for keyword in _FORBIDDEN)
+
+
+def _render_nodes(nodes: List[Node], context: Dict[str, Any], env: Dict[str, Any], out: List[str]) -> None:
+    for node in nodes:
+        node(context, env, out)
+
+
+def _lookup(current: Any, names: List[str], default: Any) -> Any:
+    """按 a.b.c 逐级取值（dict 取键，其他取属性），遇到 None 即返回 None"""
+    for name in names:
+        if isinstance(current, dict):
+            current = current.get(name, default)
+        else:
+            current = getattr(current, name, default)
+        if current is None:
+            return None
+    return current
+
+
+def _text_node(text: str) -> Node:
+    def node(context, env, out):
+        out.append(text)
+
+    return node
+
+
+def _var_node(expr: str) -> Node:
+    """{{ var }} / {{ a.b }} / {{= 表达式 }}"""
+    if expr.startswith("="):
+        # 与 eval(str) 一致，忽略表达式前导空白
+        source = expr[1:].lstrip(" \t")
+        if not _is_safe_expression(source):
+            return _text_node("[Error: Potentially dangerous expression detected]")
+        try:
+            code = compile(source, "<string>", "eval")
+        except SyntaxError as e:
+            return _text_node(f"[Error: {e}]")
+
+        def node(context, env, out):
+            try:
+                out.append(str(eval(code, env, context)))
+            except Exception as e:
+                out.append(f"[Error: {e}]")
+
+        return node
+
+    if "." in expr:
+        head, *names = expr.split(".")
+
+        def node(context, env, out):
+            value = _lookup(context.get(head, {}), names, "")
+            out.append("" if value is None else str(value))
+
+        return node
+
+    def node(context, env, out):
+        out.append(str(context.get(expr, "")))
+
+    return node
+
+
+def _compile_condition(condition: str) -> Condition:
+    """按原解析顺序预先选定条件的求值方式"""
+
+    def false(context, env):
+        return False, None
+
+    if not _is_safe_expression(condition):
+        return false
+
+    # 循环变量：loop.first / loop.last / loop.index / loop.index0，支持 not
+    if "loop." in condition:
+        negate = "not " in condition
+        attr = condition.split("loop.")[-1].strip()
+        if negate:
+            attr = attr.replace("not ", "").strip()
+
+        def loop_cond(context, env):
+            try:
+                info = context.get("loop", {})
+                if attr in ("last", "first"):
+                    result = info.get(attr, False)
+                elif attr in ("index", "index0"):
+                    result = bool(info.get(attr, 0))
+                else:
+                    result = False
+            except Exception:
+                return False, None
+            return (not result if negate else result), None
+
+        return loop_cond
+
+    # 多行代码块：执行后取 __result__，新变量写回上下文
+    if "\n" in condition.strip():
+        try:
+            code = compile(condition, "<string>", "exec")
+        except SyntaxError:
+            return false
+
+        def exec_cond(context, env):
+            local_vars = context.copy()
+            try:
+                exec(code, env, local_vars)
+            except Exception:
+                return False, None
+            result = bool(local_vars.get("__result__", False))
+            updated = {k: v for k, v in local_vars.items() if not k.startswith("__") and k not in env}
+            logger.debug(f"模板代码块求值: {result}, 变量: {list(updated)}")
+            return result, updated
+
+        return exec_cond
+
+    def eval_cond(source: str) -> Condition:
+        try:
+            code = compile(source, "<string>", "eval")
+        except SyntaxError:
+            return false
+
+        def cond(context, env):
+            try:
+                return bool(eval(code, env, context)), None
+            except Exception:
+                return False, None
+
+        return cond
+
+    if condition.startswith("="):
+        return eval_cond(condition[1:].lstrip(" \t"))
+
+    # 属性路径：user.is_admin，None 或空集合为假
+    if "." in condition:
+        head, *names = condition.split(".")
+
+        def path_cond(context, env):
+            try:
+                value = _lookup(context.get(head, {}), names, None)
+            except Exception:
+                return False, None
+            if isinstance(value, (list, dict, set)):
+                return len(value) > 0, None
+            return bool(value), None
+
+        return path_cond
+
+    # 上下文变量优先，否则作为表达式求值
+    fallback = eval_cond(condition)
+
+    def name_cond(context, env):
+        if condition in context:
+            value = context[condition]
+            try:
+                if isinstance(value, (list, dict, set)):
+                    return len(value) > 0, None
+                return bool(value), None
+            except Exception:
+                return False, None
+        return fallback(context, env)
+
+    return name_cond
+
+
+def _if_node(cond: Condition, body: List[Node], orelse: List[Node]) -> Node:
+    def node(context, env, out):
+        result, updated = cond(context, env)
+        if updated:
+            for k, v in updated.items():
+                if k not in context or context[k] != v:
+                    context[k] = v
+        _render_nodes(body if result else orelse, context, env, out)
+
+    return node
+
+
+def _for_node(loop_var: str, iterable: str, body: List[Node]) -> Node:
+    code = None
+    path = iterable.split(".") if _PATH_RE.match(iterable) else None
+    if path is None and _is_safe_expression(iterable):
+        try:
+            code = compile(iterable, "<string>", "eval")
+        except SyntaxError:
+            pass
+
+    def node(context, env, out):
+        if iterable in context:
+            items = context[iterable]
+        elif path is not None:
+            try:
+                items = _lookup(context.get(path[0], {}), path[1:], None)
+            except Exception:
+                items = []
+        elif code is None:
+            items = []
+        else:
+            try:
+                items = eval(code, env, context)
+            except Exception:
+                items = []
+        try:
+            items = list(items) if items is not None else []
+        except TypeError:
+            items = []
+
+        total = len(items)
+        parent = context.get("loop")
+        rendered = []
+        for idx, item in enumerate(items):
+            loop_context = context.copy()
+            loop_context[loop_var] = item
+            loop_context["loop"] = {
+                "index": idx + 1,
+                "index0": idx,
+                "first": idx == 0,
+                "last": idx == total - 1,
+                "length": total,
+                "parentloop": parent,
+            }
+            buf: List[str] = []
+            _render_nodes(body, loop_context, env, buf)
+            rendered.append("".join(buf))
+        # 每次迭代的输出之间以换行连接（保持原有输出格式）
+        if rendered:
+            out.append("\n".join(rendered))
+
+    return node
+
+
+def _parse(tokens: List[str], pos: int, stops: Tuple[str, ...]) -> Tuple[List[Node], int, Optional[str]]:
+    """从 pos 解析到 stops 中的任一结束标签，返回 (节点, 结束标签后的位置, 结束标签)"""
+    nodes: List[Node] = []
+    while pos < len(tokens):
+        token = tokens[pos]
+        pos += 1
+        if token.startswith("{{") and token.endswith("}}"):
+            nodes.append(_var_node(token[2:-2].strip()))
+            continue
+        if not (token.startswith("{%") and token.endswith("%}")):
+            nodes.append(_text_node(token))
+            continue
+
+        block = token[2:-2].strip()
+        if block in stops:
+            return nodes, pos, block
+
+        if block.startswith("if "):
+            body, end, tag = _parse(tokens, pos, ("else", "endif"))
+            orelse: List[Node] = []
+            if tag == "else":
+                orelse, end, tag = _parse(tokens, end, ("endif",))
+            if tag is None:
+                # 缺少 endif：忽略 if 标签，内容照常输出
+                nodes.extend(body + orelse)
+            else:
+                nodes.append(_if_node(_compile_condition(block[3:].strip()), body, orelse))
+            pos = end
+        elif block.startswith("for ") and " in " in block:
+            loop_var, iterable = block[4:].split(" in ", 1)
+            body, pos, _ = _parse(tokens, pos, ("endfor",))
+            nodes.append(_for_node(loop_var.strip(), iterable.strip(), body))
+        # 其余标签（孤立的 else/endif/endfor、未知标签）忽略
+    return nodes, pos, None
+
+
+class CompiledTemplate:
+    """编译后的模板，与自定义函数无关，可在线程间共享"""
+
+    __slots__ = ("source", "nodes")
+
+    def __init__(self, source: str):
+        self.source = source
+        tokens = [t for t in _TOKEN_RE.split(source) if t]
+        self.nodes, _, _ = _parse(tokens, 0, ())
+
+    def render(self, context: Dict[str, Any], functions: Optional[Dict[str, Any]] = None) -> str:
+        for key in context.keys():
+            if not isinstance(key, str) or not key.isidentifier():
+                raise ValueError(f"Invalid context key: {key}. Keys must be valid Python identifiers")
+        env = {**_SAFE_GLOBALS, **functions} if functions else dict(_SAFE_GLOBALS)
+        out: List[str] = []
+        _render_nodes(self.nodes, context, env, out)
+        return "".join(out)
+
+
+_cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_template(source: str) -> CompiledTemplate:
+    """按模板文本取编译结果，进程内 LRU 缓存（最多 TEMPLATE_CACHE_SIZE 个）"""
+    with _cache_lock:
+        compiled = _cache.get(source)
+        if compiled is not None:
+            _cache.move_to_end(source)
+    if compiled is not None:
+        cache_hit("template")
+        return compiled
+
+    cache_miss("template")
+    compiled = CompiledTemplate(source)
+    with _cache_lock:
+        _cache[source] = compiled
+        _cache.move_to_end(source)
+        while len(_cache) > TEMPLATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clear_template_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
 
 class TemplateParser:
     """A lightweight template engine supporting variables, conditions and loops."""
@@ -20,7 +403,7 @@ class TemplateParser:
     def __init__(self, template: str):
         """使用模板字符串初始化模板解析器"""
         self.template = template
-        self.compiled = None
+        self.compiled: Optional[CompiledTemplate] = None
         self.custom_functions = {}
 
     def register_function(self, name: str, func: callable) -> None:
@@ -32,559 +415,14 @@ class TemplateParser:
         self.custom_functions.update(functions)
 
     def compile_template(self) -> None:
-        """将模板编译为中间表示形式"""
-        # Split template into static parts and control blocks
-        pattern = re.compile(
-            r"(\{\%.*?\%\})|"  # control blocks {% ... %}
-            r"(\{\{.*?\}\})"  # variables {{ ... }}
-        )
-        self.compiled = pattern.split(self.template)
+        """编译模板（同一模板文本在进程内只编译一次）"""
+        self.compiled = get_template(self.template)
 
     def render(self, context: Dict[str, Any]) -> str:
         """使用给定上下文渲染模板"""
-        # Security check: validate context keys
-        for key in context.keys():
-            if not isinstance(key, str) or not key.isidentifier():
-                raise ValueError(
-                    f"Invalid context key: {key}. Keys must be valid Python identifiers"
-                )
-
         if self.compiled is None:
             self.compile_template()
-
-        output = []
-        i = 0
-        while i < len(self.compiled):
-            part = self.compiled[i]
-
-            if part is None:
-                i += 1
-                continue
-
-            # Handle static text (preserve original formatting)
-            if not (part.startswith("{{") or part.startswith("{%")):
-                output.append(part)
-                i += 1
-                continue
-
-            # Handle variables {{ var }} and nested {{ var.attr }} and eval expressions
-            if part.startswith("{{") and part.endswith("}}"):
-                # print(f"\nProcessing variable part: {part}")
-                var_expr = part[2:-2].strip()
-                # print(f"Extracted expression: {var_expr}")
-
-                # Check if this is an eval expression (starts with =)
-                if var_expr.startswith("="):
-                    try:
-                        # Evaluate the expression (after =)
-                        expr = var_expr[1:]
-                        if not self._is_safe_expression(expr):
-                            raise ValueError(
-                                "Potentially dangerous expression detected"
-                            )
-
-                        # Create safe evaluation environment
-                        safe_globals = self._get_safe_globals()
-                        eval_globals = {**safe_globals, **self.custom_functions}
-
-                        result = eval(expr, eval_globals, context)
-                        output.append(str(result))
-                    except Exception as e:
-                        output.append(f"[Error: {str(e)}]")
-                elif "." in var_expr:
-                    # print(f"DEBUG - Processing nested variable: {var_expr}")  # Debug
-                    # Handle nested attribute access
-                    parts = var_expr.split(".")
-                    current = context.get(parts[0], {})
-                    for part_name in parts[1:]:
-                        if isinstance(current, dict):
-                            current = current.get(part_name, "")
-                        else:
-                            current = getattr(current, part_name, "")
-                        if current is None:
-                            current = ""
-                            break
-                    output.append(str(current))
-                else:
-                    # Simple variable access
-                    output.append(str(context.get(var_expr, "")))
-                i += 1
-
-            # Handle control blocks {% ... %}
-            elif part.startswith("{%") and part.endswith("%}"):
-                block = part[2:-2].strip()
-
-                # Handle if condition
-                if block.startswith("if "):
-                    condition = block[3:].strip()
-                    result, updated_context = self._evaluate_condition(
-                        condition, context
-                    )
-                    # Merge all variables except special ones and functions
-                    for k, v in updated_context.items():
-                        if not k.startswith("__") and k not in self.custom_functions:
-                            # Only update context if the key doesn't exist or was modified
-                            if k not in context or context[k] != v:
-                                context[k] = v
-                    # Ensure final_price is available in context if it was calculated
-                    if "final_price" in updated_context:
-                        context["final_price"] = updated_context["final_price"]
-
-                    # Find matching endif using helper method
-                    endif_idx = self._skip_control_block(i, "if", "endif")
-                    if endif_idx == len(self.compiled):
-                        i += 1
-                        continue
-
-                    # Find else if exists
-                    else_idx = -1
-                    for j in range(i + 1, endif_idx):
-                        part = self.compiled[j]
-                        if isinstance(part, str) and part.strip() in (
-                            "{% else %}",
-                            "else",
-                        ):
-                            else_idx = j
-                            break
-
-                    # Process the appropriate block
-                    if result:
-                        # Process if block (from current position to else or endif)
-                        end_idx = else_idx if else_idx != -1 else endif_idx
-                        if_content = self.compiled[i + 1 : end_idx]
-
-                        if_parser = TemplateParser("")
-                        if_parser.compiled = if_content
-                        rendered = if_parser.render(context)
-                        output.append(rendered)
-                    elif else_idx != -1:
-                        # Process else block
-                        else_content = self.compiled[else_idx + 1 : endif_idx]
-
-                        else_parser = TemplateParser("")
-                        else_parser.compiled = else_content
-                        rendered = else_parser.render(context)
-                        output.append(rendered)
-
-                    # Skip to after endif
-                    i = endif_idx + 1
-                    continue
-
-                # Handle for loop
-                elif block.startswith("for ") and " in " in block:
-                    loop_var, iterable = self._parse_for_block(block)
-                    items = self._get_iterable(iterable, context)
-
-                    # Collect loop content
-                    loop_content = []
-                    j = i + 1
-                    endfor_idx = j
-                    while j < len(self.compiled):
-                        inner_part = self.compiled[j]
-                        if isinstance(inner_part, str) and inner_part.startswith(
-                            "{% endfor %}"
-                        ):
-                            endfor_idx = j
-                            break
-                        loop_content.append(str(inner_part) if inner_part else "")
-                        j += 1
-
-                    # Render loop with preserved formatting and indentation
-                    loop_output = []
-                    total_items = len(items)
-
-                    # Get the indentation level from the template
-                    for_line = self.compiled[i]
-                    indent = ""
-                    if isinstance(for_line, str):
-                        indent_match = re.match(r"^(\s*)", for_line)
-                        if indent_match:
-                            indent = indent_match.group(1)
-
-                    for item_idx, item in enumerate(items):
-                        loop_context = context.copy()
-                        loop_context[loop_var] = item
-
-                        # Add loop variable with iteration info
-                        loop_context["loop"] = {
-                            "index": item_idx + 1,
-                            "index0": item_idx,
-                            "first": item_idx == 0,
-                            "last": item_idx == total_items - 1,
-                            "length": total_items,
-                            "parentloop": context.get(
-                                "loop"
-                            ),  # Save parent loop context
-                        }
-
-                        # Render loop content with current item
-                        item_output = []
-                        j = 0
-                        while j < len(loop_content):
-                            part = loop_content[j]
-                            if part is None:
-                                j += 1
-                                continue
-
-                            # Handle if conditions inside for loop
-                            if (
-                                isinstance(part, str)
-                                and part.startswith("{% if ")
-                                and part.endswith("%}")
-                            ):
-                                condition = part[6:-2].strip()
-                                result, _ = self._evaluate_condition(
-                                    condition, loop_context
-                                )
-
-                                # Find matching endif
-                                endif_idx = j + 1
-                                nested_depth = 1
-                                while endif_idx < len(loop_content):
-                                    inner_part = loop_content[endif_idx]
-                                    if (
-                                        isinstance(inner_part, str)
-                                        and inner_part.startswith("{% if ")
-                                        and inner_part.endswith("%}")
-                                    ):
-                                        nested_depth += 1
-                                    elif isinstance(
-                                        inner_part, str
-                                    ) and inner_part.startswith("{% endif %}"):
-                                        nested_depth -= 1
-                                        if nested_depth == 0:
-                                            break
-                                    endif_idx += 1
-
-                                # Process if block if condition is true
-                                if result:
-                                    if_content = loop_content[j + 1 : endif_idx]
-                                    rendered = self._render_parts(
-                                        if_content, loop_context
-                                    )
-                                    item_output.append(rendered)
-
-                                # Skip to after endif
-                                j = endif_idx + 1
-
-                            # Handle variable references
-                            elif (
-                                isinstance(part, str)
-                                and part.startswith("{{")
-                                and part.endswith("}}")
-                            ):
-                                var_expr = part[2:-2].strip()
-                                # print(f"DEBUG - Evaluating variable: {var_expr}")  # Debug
-
-                                if var_expr.startswith("="):
-                                    # Handle eval expressions
-                                    try:
-                                        expr = var_expr[1:]
-                                        if not self._is_safe_expression(expr):
-                                            raise ValueError(
-                                                "Potentially dangerous expression detected"
-                                            )
-
-                                        safe_globals = self._get_safe_globals()
-                                        eval_globals = {
-                                            **safe_globals,
-                                            **self.custom_functions,
-                                        }
-
-                                        result = eval(expr, eval_globals, loop_context)
-                                        value = str(result)
-                                    except Exception as e:
-                                        value = f"[Error: {str(e)}]"
-                                elif "." in var_expr:
-                                    # Handle nested attributes
-                                    parts = var_expr.split(".")
-                                    current = loop_context.get(parts[0], {})
-                                    for part_name in parts[1:]:
-                                        if isinstance(current, dict):
-                                            current = current.get(part_name, "")
-                                        else:
-                                            current = getattr(current, part_name, "")
-                                        if current is None:
-                                            current = ""
-                                            break
-                                    value = str(current)
-                                else:
-                                    # Handle simple variable
-                                    value = str(loop_context.get(var_expr, ""))
-
-                                # print(f"DEBUG - Variable value: {value}")  # Debug
-                                item_output.append(value)
-                                j += 1
-
-                            else:
-                                # Handle literal text (preserve whitespace and newlines)
-                                item_output.append(str(part))
-                                j += 1
-
-                        rendered_item = "".join(item_output)
-                        # print(f"DEBUG - Rendered item {item_idx}:\n{repr(rendered_item)}")  # Debug
-                        loop_output.append(rendered_item)
-
-                    if loop_output:
-                        # Join all loop items with newlines and add to output
-                        loop_result = "\n".join(loop_output)
-                        output.append(loop_result)
-                    else:
-                        # print("DEBUG - No loop output generated")
-                        pass
-
-                    # Skip to end of loop
-                    i = endfor_idx + 1
-
-                # Handle endif/endfor
-                elif block in ("endif", "endfor"):
-                    i += 1
-
-                else:
-                    i += 1
-
-            # Static text
-            else:
-                output.append(str(part) if part else "")
-                i += 1
-
-        # Clean up the output by removing excessive newlines
-        result = "".join(output)
-        return self._clean_output(result)
-
-    def _get_safe_globals(self) -> Dict[str, Any]:
-        """Return a dictionary of safe builtins for eval/exec."""
-        safe_builtins = {
-            "None": None,
-            "True": True,
-            "False": False,
-            "bool": bool,
-            "int": int,
-            "float": float,
-            "str": str,
-            "list": list,
-            "dict": dict,
-            "tuple": tuple,
-            "len": len,
-            "sum": sum,
-            "min": min,
-            "max": max,
-            "abs": abs,
-            "round": round,
-        }
-        return safe_builtins
-
-    def _is_safe_expression(self, expr: str) -> bool:
-        """Check if an expression contains potentially dangerous operations."""
-        forbidden = [
-            "import",
-            "open",
-            "exec",
-            "eval",
-            "system",
-            "subprocess",
-            "__import__",
-            "getattr",
-            "setattr",
-            "delattr",
-            "compile",
-            "globals",
-            "locals",
-            "vars",
-            "dir",
-            "help",
-            "reload",
-            "input",
-            "file",
-            "execfile",
-            "reload",
-            "exit",
-            "quit",
-        ]
-        expr_lower = expr.lower()
-        return not any(keyword in expr_lower for keyword in forbidden)
-
-    def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> tuple:
-        """
-        Evaluate a condition expression or code block in the given context.
-        Returns (result, updated_context) where updated_context contains any new variables
-        created during evaluation.
-        """
-        try:
-            if not self._is_safe_expression(condition):
-                raise ValueError(f"Potentially dangerous expression: {condition}")
-
-            # Special handling for loop variables
-            if "loop." in condition:
-                # Handle not conditions
-                has_not = "not " in condition
-                loop_var = condition.split("loop.")[-1].strip()
-                if has_not:
-                    loop_var = loop_var.replace("not ", "").strip()
-
-                loop_info = context.get("loop", {})
-                result = False
-
-                if loop_var == "last":
-                    result = loop_info.get("last", False)
-                elif loop_var == "first":
-                    result = loop_info.get("first", False)
-                elif loop_var == "index":
-                    result = bool(loop_info.get("index", 0))
-                elif loop_var == "index0":
-                    result = bool(loop_info.get("index0", 0))
-
-                # Invert result if 'not' was present
-                return (not result if has_not else result), context
-
-            # Create safe evaluation environment
-            safe_globals = self._get_safe_globals()
-            eval_globals = {**safe_globals, **self.custom_functions}
-
-            # Make a copy of context to avoid modifying the original
-            local_vars = context.copy()
-
-            # Handle multi-line code blocks
-            if "\n" in condition.strip():
-                # Compile and execute the code block in restricted environment
-                code = compile(condition, "<string>", "exec")
-                exec(code, eval_globals, local_vars)
-                # The last expression's value should be in __result__
-                result = bool(local_vars.get("__result__", False))
-                # Return result and updated context (excluding special vars)
-                updated_context = {
-                    k: v
-                    for k, v in local_vars.items()
-                    if not k.startswith("__") and k not in self.custom_functions
-                }
-
-                # Debug output
-                logger.info(f"DEBUG - Condition evaluation result: {result}")
-                logger.info(f"DEBUG - Local vars after execution: {local_vars.keys()}")
-                logger.info(f"DEBUG - Updated context to return: {updated_context.keys()}")
-
-                # Ensure all calculated variables are included
-                for k, v in local_vars.items():
-                    if (
-                        not k.startswith("__")
-                        and k not in self.custom_functions
-                        and k not in updated_context
-                    ):
-                        updated_context[k] = v
-
-                return result, updated_context
-
-            # Handle function calls with = prefix
-            if condition.startswith("="):
-                result = bool(eval(condition[1:], eval_globals, local_vars))
-                return result, local_vars
-
-            # Handle nested attribute access (e.g. user.is_admin)
-            if "." in condition:
-                parts = condition.split(".")
-                current = local_vars.get(parts[0], {})
-                for part in parts[1:]:
-                    if isinstance(current, dict):
-                        current = current.get(part, None)
-                    else:
-                        current = getattr(current, part, None)
-                    if current is None:
-                        return False, local_vars
-                # Handle empty collections
-                if isinstance(current, (list, dict, set)) and not current:
-                    return False, local_vars
-                return bool(current), local_vars
-
-            # Handle direct variable reference
-            if condition in local_vars:
-                value = local_vars[condition]
-                if isinstance(value, (list, dict, set)):
-                    return len(value) > 0, local_vars
-                return bool(value), local_vars
-
-            # Evaluate other expressions
-            result = bool(eval(condition, eval_globals, local_vars))
-            return result, local_vars
-
-        except Exception:
-            return False, context
-
-    def _skip_control_block(self, start_idx: int, start_tag: str, end_tag: str) -> int:
-        """Skip a control block until matching end tag is found."""
-        if start_idx >= len(self.compiled):
-            return len(self.compiled)
-
-        depth = 1
-        i = start_idx + 1
-        # print(f"DEBUG - Searching for {end_tag} starting from {start_idx}")
-
-        while i < len(self.compiled):
-            part = self.compiled[i]
-            if isinstance(part, str) and part.startswith("{%") and part.endswith("%}"):
-                block = part[2:-2].strip()
-                # print(f"DEBUG - Token {i}: {block} (depth={depth})")
-
-                # Handle nested blocks
-                if block.startswith("if ") or block.startswith("for "):
-                    depth += 1
-                    # print(f"DEBUG - Found nested block, depth increased to {depth}")
-                elif block == end_tag:
-                    depth -= 1
-                    # print(f"DEBUG - Found {end_tag}, depth decreased to {depth}")
-                    if depth == 0:
-                        # print(f"DEBUG - Found matching {end_tag} at {i}")
-                        return i
-                elif block == "else" and depth == 1:
-                    # print(f"DEBUG - Found else at {i}")
-                    # Don't decrease depth for else blocks
-                    pass
-                elif block in ["endif", "endfor"] and depth > 1:
-                    depth -= 1
-                    # print(f"DEBUG - Found closing tag in nested block, depth decreased to {depth}")
-
-            i += 1
-
-        # print(f"DEBUG - Error: Reached end without finding matching {end_tag} (current depth: {depth})")
-        # print(f"DEBUG - Last processed block: {self.compiled[i-1] if i > 0 else 'None'}")
-        return len(self.compiled)
-
-    def _clean_output(self, output: str) -> str:
-        """Clean up the final output while preserving essential formatting."""
-        lines = output.split("\n")
-        cleaned = []
-
-        for line in lines:
-            # Preserve all lines including empty ones that are part of the template structure
-            cleaned.append(line)
-
-        # Join lines while preserving original newlines and indentation
-        return "\n".join(cleaned)
-
-    def _parse_for_block(self, block: str) -> tuple:
-        """Parse a for block into loop variable and iterable parts."""
-        parts = block[4:].split(" in ", 1)
-        return parts[0].strip(), parts[1].strip()
-
-    def _get_iterable(self, iterable: str, context: Dict[str, Any]) -> List[Any]:
-        """Get an iterable from context or evaluate expression."""
-        if iterable in context:
-            return context[iterable]
-        try:
-            if not self._is_safe_expression(iterable):
-                raise ValueError("Potentially dangerous expression detected")
-
-            safe_globals = self._get_safe_globals()
-            return eval(iterable, safe_globals, context)
-        except Exception:
-            return []
-
-    def _render_parts(
-        self, parts: List[Union[str, None]], context: Dict[str, Any]
-    ) -> str:
-        """Render a list of template parts with the given context."""
-        temp_parser = TemplateParser("")
-        temp_parser.compiled = parts
-        return temp_parser.render(context)
+        return self.compiled.render(context, self.custom_functions)
 
 
 # Example usage
@@ -2,12 +2,10 @@ from core.common.runtime_settings import runtime_settings
 from core.common.log import logger
 import os
 import uuid
-import requests
 from urllib.parse import urlparse
 
 files_dir = "data/files"
 avatar_dir = f"{files_dir}/avatars"
-os.makedirs(avatar_dir, exist_ok=True)
 
 
 def save_avatar_locally(avatar_url):
@@ -28,6 +26,8 @@ def save_avatar_locally(avatar_url):
     file_path = os.path.join(save_dir, file_name)
 
     # 下载并保存文件
+    import requests
+
     try:
         response = requests.get(avatar_url)
         response.raise_for_status()
@@ -0,0 +1,337 @@
+"""/static/res/logo 反向代理的图片缓存。
+
+- 进程内共用一个带连接池的 httpx.AsyncClient
+- 同一 URL 的并发未命中只回源一次（single-flight）
+- 图片按 URL 哈希存为缓存目录下的文件；大文件与 Range 请求命中时由 FileResponse 按块
+  （服务器支持 zerocopy 扩展时走 sendfile）发送，不把整张图读进内存；
+  小文件（不超过 INLINE_MAX_BYTES，绝大多数公众号头像）在查索引的同一次线程池调用中读出，
+  省去 FileResponse 打开/读取/关闭文件的多次线程切换
+- 内容类型、大小、ETag、写入/访问时间存于缓存目录下的 SQLite 索引（image_cache.db），
+  多个 worker 进程共用；总大小超过上限时按最近访问时间淘汰
+- 文件与索引读写放到线程池，不阻塞事件循环
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import httpx
+
+from core.common.app_settings import settings
+from core.common.log import logger
+from core.common.metrics import cache_hit, cache_miss, counter, gauge
+
+# 单张图片大小上限，超过则只转发不缓存
+MAX_ITEM_BYTES = 8 * 1024 * 1024
+# 命中时直接读入内存返回的文件大小上限，更大的文件走 FileResponse
+INLINE_MAX_BYTES = 64 * 1024
+# 命中时访问时间的最小刷新间隔（秒），避免每次命中都写索引
+TOUCH_INTERVAL = 60
+# 残留临时文件（写入中途进程退出）的清理时限（秒）
+STALE_TMP_SECONDS = 3600
+INDEX_FILE = "image_cache.db"
+
+IMAGE_CACHE_FETCHES = counter("image_cache_fetch_total", "图片缓存回源次数", ["outcome"])
+IMAGE_CACHE_BYTES = gauge("image_cache_bytes", "图片缓存占用字节数")
+
+_SCHEMA = """
+create table if not exists images (
+    key text primary key,
+    content_type text,
+    last_modified text,
+    size integer not null,
+    etag text not null,
+    stored_at real not null,
+    accessed_at real not null
+);
+create index if not exists idx_images_accessed on images (accessed_at);
+"""
+
+
+@dataclass
+class CachedImage:
+    """缓存条目；path 为空表示未落盘（非 200 或过大），content 不为空时直接返回内容"""
+
+    etag: str
+    size: int
+    stored_at: float
+    content_type: Optional[str] = None
+    last_modified: Optional[str] = None
+    path: Optional[str] = None
+    stat: Optional[os.stat_result] = None
+    content: Optional[bytes] = None
+    status_code: int = 200
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified:
+            headers["Last-Modified"] = self.last_modified
+        return headers
+
+
+def _etag(content: bytes) -> str:
+    return '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+
+
+class ImageIndex:
+    """图片缓存索引（SQLite），方法均为同步调用，由 ImageCache 放到线程池执行"""
+
+    def __init__(self, cache_dir: str, limit_bytes: int):
+        self.cache_dir = cache_dir
+        self.db_path = os.path.join(cache_dir, INDEX_FILE)
+        self.limit_bytes = limit_bytes
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def lookup(self, key: str, inline: bool = True) -> Optional[CachedImage]:
+        """查索引并 stat 文件（小文件直接读出内容）；文件已被其他进程淘汰时视为未命中"""
+        conn = self._conn()
+        row = conn.execute("select * from images where key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        path = self.path(key)
+        stat, content = None, None
+        try:
+            if inline and row["size"] <= INLINE_MAX_BYTES:
+                with open(path, "rb") as f:
+                    content = f.read()
+            else:
+                stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        now = time.time()
+        if now - row["accessed_at"] > TOUCH_INTERVAL:
+            conn.execute("update images set accessed_at = ? where key = ?", (now, key))
+        return CachedImage(
+            etag=row["etag"],
+            size=row["size"],
+            stored_at=row["stored_at"],
+            content_type=row["content_type"],
+            last_modified=row["last_modified"],
+            path=path,
+            stat=stat,
+            content=content,
+        )
+
+    def store(self, key: str, item: CachedImage, content: bytes) -> List[str]:
+        """写入文件并登记索引，返回被淘汰的 key。
+
+        先写临时文件、登记索引，再替换正式文件，保证 cleanup 不会删掉刚写入的文件。
+        """
+        path = self.path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        conn = self._conn()
+        try:
+            conn.execute(
+                "insert or replace into images "
+                "(key, content_type, last_modified, size, etag, stored_at, accessed_at) "
+                "values (?, ?, ?, ?, ?, ?, ?)",
+                (key, item.content_type, item.last_modified, item.size, item.etag, item.stored_at, item.stored_at),
+            )
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        item.path = path
+        item.stat = os.stat(path)
+        return self.evict()
+
+    def evict(self) -> List[str]:
+        """总大小超过上限时按访问时间从旧到新删除"""
+        conn = self._conn()
+        total = conn.execute("select coalesce(sum(size), 0) from images").fetchone()[0]
+        if total <= self.limit_bytes:
+            return []
+        victims: List[str] = []
+        conn.execute("begin immediate")
+        try:
+            for row in conn.execute("select key, size from images order by accessed_at").fetchall():
+                if total <= self.limit_bytes:
+                    break
+                victims.append(row["key"])
+                total -= row["size"]
+            conn.executemany("delete from images where key = ?", [(k,) for k in victims])
+            conn.execute("commit")
+        except BaseException:
+            conn.execute("rollback")
+            raise
+        for key in victims:
+            self._remove(self.path(key))
+        return victims
+
+    def cleanup(self) -> int:
+        """删除索引外的缓存文件（含旧版本的 .headers 文件与残留临时文件）及无文件的索引记录"""
+        conn = self._conn()
+        keys = {row["key"] for row in conn.execute("select key from images")}
+        present: Set[str] = set()
+        removed = 0
+        now = time.time()
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith(".tmp"):
+                    try:
+                        stale = now - entry.stat().st_mtime > STALE_TMP_SECONDS
+                    except OSError:
+                        continue
+                    if stale:
+                        removed += self._remove(entry.path)
+                elif name.endswith(".headers") and len(name) == 72:
+                    removed += self._remove(entry.path)
+                elif len(name) == 64:
+                    if name in keys:
+                        present.add(name)
+                    else:
+                        removed += self._remove(entry.path)
+        missing = keys - present
+        if missing:
+            conn.executemany("delete from images where key = ?", [(k,) for k in missing])
+        return removed
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            os.remove(path)
+            return 1
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logger.warning(f"删除图片缓存失败 {path}: {e}")
+            return 0
+
+    def stats(self) -> Dict[str, int]:
+        row = self._conn().execute("select count(*), coalesce(sum(size), 0) from images").fetchone()
+        return {"items": row[0], "bytes": row[1], "limit": self.limit_bytes}
+
+
+class ImageCache:
+    def __init__(self, cache_dir: str, disk_bytes: int, ttl: int, timeout: float = 15.0):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.index = ImageIndex(cache_dir, disk_bytes)
+        self._ready: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        IMAGE_CACHE_BYTES.set_function(lambda: [({}, self.index.stats()["bytes"])])
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(f"GET_{url}".encode("utf-8")).hexdigest()
+
+    def _client_for_loop(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                # 不跟随重定向：ALLOWED_HOSTS 只校验了请求地址，跳转目标可能是任意主机
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _ensure_ready(self) -> None:
+        # 每个进程首次使用时清理一次残留文件
+        if self._ready is None:
+            self._ready = asyncio.ensure_future(asyncio.to_thread(self.index.cleanup))
+        try:
+            await asyncio.shield(self._ready)
+        except Exception as e:
+            logger.warning(f"清理图片缓存目录失败: {e}")
+
+    async def get(self, url: str, inline: bool = True) -> CachedImage:
+        """取图片：命中返回磁盘文件（inline 时小文件带内容），未命中回源；同一 URL 的并发回源合并为一次"""
+        await self._ensure_ready()
+        key = self.key(url)
+        item = await asyncio.to_thread(self.index.lookup, key, inline)
+        if item is not None and time.time() - item.stored_at < self.ttl:
+            cache_hit("res_logo")
+            return item
+
+        cache_miss("res_logo")
+        task = self._inflight.get(key)
+        if task is None:
+            # 回源放在独立任务中，发起请求的客户端断开不影响其他等待者
+            task = asyncio.ensure_future(self._fetch(key, url))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, url: str) -> CachedImage:
+        try:
+            resp = await self._client_for_loop().get(url)
+        except httpx.HTTPError:
+            IMAGE_CACHE_FETCHES.inc(outcome="error")
+            raise
+        content = resp.content
+        item = CachedImage(
+            etag=_etag(content),
+            size=len(content),
+            stored_at=time.time(),
+            content_type=resp.headers.get("content-type"),
+            last_modified=resp.headers.get("last-modified"),
+            content=content,
+            status_code=resp.status_code,
+        )
+        if resp.status_code != 200 or item.size > MAX_ITEM_BYTES:
+            IMAGE_CACHE_FETCHES.inc(outcome="uncached")
+            return item
+        return await self.put(key, item, content)
+
+    async def put(self, key: str, item: CachedImage, content: bytes) -> CachedImage:
+        """落盘并登记索引；写入失败时仍返回带内容的条目"""
+        try:
+            await asyncio.to_thread(self.index.store, key, item, content)
+        except Exception as e:
+            IMAGE_CACHE_FETCHES.inc(outcome="store_failed")
+            logger.info(f"缓存响应失败: {str(e)}")
+            return item
+        IMAGE_CACHE_FETCHES.inc(outcome="ok")
+        # 已落盘的大文件由 FileResponse 发送，不再持有内容
+        if item.size > INLINE_MAX_BYTES:
+            item.content = None
+        return item
+
+    def get_info(self) -> dict:
+        return {**self.index.stats(), "inflight": len(self._inflight)}
+
+
+image_cache = ImageCache(
+    cache_dir=settings.cache_dir,
+    disk_bytes=settings.image_cache_disk_bytes,
+    ttl=settings.image_cache_ttl,
+)
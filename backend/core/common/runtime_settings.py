@@ -35,6 +35,7 @@ class RuntimeSettings:
                 "GATHER_CONTENT_AUTO_INTERVAL", default
             ),
             "webhook.content_format": settings.webhook_content_format,
+            "webhook.payload_mode": settings.webhook_payload_mode,
             "avatar.max_bytes": settings.avatar_max_bytes,
             "local_avatar": settings.local_avatar,
         }
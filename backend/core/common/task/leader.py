@@ -0,0 +1,181 @@
+"""调度器选主：基于 Supabase 租约行（scheduler_leases）+ 心跳。
+
+多个实例/容器同时启动时只有持有租约的节点运行定时采集；
+持有者每 heartbeat 秒续约一次，停止续约超过 ttl 秒后其他节点接管。
+本节点若连续续约失败接近 ttl，会主动让出（先停任务再丢租约），避免双主。
+租约函数不存在（未执行 scheduler_leases 迁移）时退出选主并回调 on_unavailable。
+其他节点通过 request_reload() 递增租约行的重载版本，主节点续约时发现变化后回调 on_reload。
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+from core.integrations.supabase.client import is_missing_function
+
+DEFAULT_LEASE_TTL = 15
+DEFAULT_HEARTBEAT = 5
+
+
+class LeaderElector:
+    """租约选主，当选/落选时回调（回调在选主线程中执行）"""
+
+    def __init__(
+        self,
+        client: Any,
+        name: str = "scheduler",
+        on_elected: Optional[Callable[[], None]] = None,
+        on_demoted: Optional[Callable[[], None]] = None,
+        on_unavailable: Optional[Callable[[], None]] = None,
+        on_reload: Optional[Callable[[], None]] = None,
+        ttl: int = DEFAULT_LEASE_TTL,
+        heartbeat: float = DEFAULT_HEARTBEAT,
+    ):
+        self.client = client
+        self.name = name
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.on_unavailable = on_unavailable
+        self.on_reload = on_reload
+        # 租约函数不存在、已退回单实例运行
+        self.unavailable = False
+        self.ttl = max(ttl, 3)
+        self.heartbeat = min(heartbeat, self.ttl / 3)
+        self.holder = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._is_leader = False
+        self._last_renewed = 0.0
+        # 当选后读到的重载版本，None 表示尚未读取
+        self._reload_version: Optional[int] = None
+        self._reload_supported = True
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def _acquire(self) -> bool:
+        return bool(
+            run_sync(
+                self.client.rpc(
+                    "acquire_scheduler_lease",
+                    {"p_name": self.name, "p_holder": self.holder, "p_ttl_seconds": self.ttl},
+                )
+            )
+        )
+
+    def _release(self) -> None:
+        run_sync(
+            self.client.rpc(
+                "release_scheduler_lease", {"p_name": self.name, "p_holder": self.holder}
+            )
+        )
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader == self._is_leader:
+            return
+        self._is_leader = leader
+        self._reload_version = None
+        callback = self.on_elected if leader else self.on_demoted
+        logger.warning(f"[leader:{self.name}] {self.holder} {'当选' if leader else '让出'}")
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"[leader:{self.name}] 回调执行失败: {e}")
+
+    def _tick(self) -> None:
+        try:
+            held = self._acquire()
+        except Exception as e:
+            if is_missing_function(e) and not self._is_leader:
+                logger.error(f"[leader:{self.name}] 租约函数不存在，退出选主（请执行 scheduler_leases 迁移）: {e}")
+                self._stop.set()
+                self.unavailable = True
+                if self.on_unavailable:
+                    self.on_unavailable()
+                return
+            logger.warning(f"[leader:{self.name}] 续约失败: {e}")
+            # 续约失败不立即让出，接近租约到期仍未恢复时才停止任务
+            if self._is_leader and time.monotonic() - self._last_renewed > self.ttl - self.heartbeat:
+                self._set_leader(False)
+            return
+        if held:
+            self._last_renewed = time.monotonic()
+        self._set_leader(held)
+        if held:
+            self._check_reload()
+
+    def _check_reload(self) -> None:
+        """主节点：重载版本变化时回调 on_reload（当选后首次读取只记录基线）"""
+        if self.on_reload is None or not self._reload_supported:
+            return
+        try:
+            version = int(
+                run_sync(self.client.rpc("scheduler_reload_version", {"p_name": self.name})) or 0
+            )
+        except Exception as e:
+            if is_missing_function(e):
+                self._reload_supported = False
+                logger.warning(f"[leader:{self.name}] 重载版本函数不存在，不再检查重载请求: {e}")
+            else:
+                logger.warning(f"[leader:{self.name}] 读取重载版本失败: {e}")
+            return
+        previous, self._reload_version = self._reload_version, version
+        if previous is None or version == previous:
+            return
+        logger.warning(f"[leader:{self.name}] 收到重载请求 version={version}")
+        try:
+            self.on_reload()
+        except Exception as e:
+            logger.error(f"[leader:{self.name}] 重载回调执行失败: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._tick()
+            self._stop.wait(self.heartbeat)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name=f"leader-{self.name}"
+        )
+        self._thread.start()
+        logger.info(f"[leader:{self.name}] 参与选主 holder={self.holder} ttl={self.ttl}s")
+
+    def stop(self) -> None:
+        """停止参与选主；持有租约时先停任务再释放，其他节点可立即接管"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat + 1)
+        if self._is_leader:
+            self._set_leader(False)
+            try:
+                self._release()
+            except Exception as e:
+                logger.warning(f"[leader:{self.name}] 释放租约失败: {e}")
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "is_leader": self._is_leader,
+            "ttl": self.ttl,
+            "last_renewed_s": (
+                round(time.monotonic() - self._last_renewed, 1) if self._last_renewed else None
+            ),
+        }
+
+
+def request_reload(client: Any, name: str = "scheduler") -> bool:
+    """通知主节点重载（任意节点可调用），返回是否有主节点接收；主节点在下次续约时处理"""
+    version = run_sync(client.rpc("request_scheduler_reload", {"p_name": name}))
+    return version is not None
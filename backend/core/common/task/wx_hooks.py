@@ -46,11 +46,13 @@ def build_wx_gather_hooks() -> WxGatherHooks:
         except Exception:
             pass
 
-        # 2) 清理任务队列（best-effort）
+        # 2) 暂停任务队列，重新登录后恢复（任务保留，不再清空）（best-effort）
         try:
-            from core.common.utils.task_queue import TaskQueue
+            from core.common.utils.task_queue import get_task_queue
 
-            TaskQueue.delete_queue()
+            # 采集与正文抓取依赖公众号会话
+            get_task_queue("collect").pause()
+            get_task_queue("content").pause()
         except Exception:
             pass
 
@@ -1,5 +1,5 @@
-from core.common.utils.task_queue import TaskQueueManager, TaskQueue
+from core.common.utils.task_queue import TaskQueueManager, TaskQueue, get_task_queue
 from core.common.utils.async_tools import run_sync
 
 
-__all__ = ["TaskQueue", "run_sync"]
+__all__ = ["TaskQueue", "get_task_queue", "run_sync"]
@@ -1,33 +1,347 @@
-import queue
+"""持久化任务队列：SQLite(WAL) 存储，进程重启后未完成的任务继续执行。
+
+- 任务以 "模块:函数名" + JSON 参数落库，执行时再导入函数（不支持闭包/lambda）
+- 命名队列（collect/content/notify）共用一个数据库文件，
+  各自配置并发数与单任务超时，长任务不会阻塞其他队列
+- 同一队列内按 priority 从高到低、到期时间先后领取
+- 可见性超时：worker 领取任务后持有租约，执行期间定期续约；
+  进程崩溃导致租约过期的任务会被重新领取
+- 失败/超时按指数退避重试，超过最大次数后置为 dead 保留现场；cancel() 取消的任务不重试
+- dedup_key：同一 key 的任务在 pending/running 状态下只保留一条；
+  入队时带 subscriber 的重复提交会合并为已有任务的订阅者（结果扇出给所有订阅者）
+- 任务可以是普通函数或协程函数：协程超时/取消时真正被 cancel；
+  普通函数无法强制中止，超时后 worker 不再等待，函数可通过 is_cancelled() 协作退出
+- pause()/resume() 的状态存于同一数据库文件，对所有进程的 worker 生效
+"""
+
+import asyncio
+import importlib
+import inspect
+import json
+import math
+import os
+import sqlite3
 import threading
 import time
-import gc
-from typing import Callable, Any
+import uuid
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, List, Optional
+
 from core.common.log import logger
 
+DEFAULT_DB_PATH = "data/task_queue.db"
+# 领取后多久未续约视为 worker 已失效（秒）
+DEFAULT_VISIBILITY_TIMEOUT = 10 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+# 第 n 次失败后等待 RETRY_BACKOFF * 2^(n-1) 秒再重试，最多 RETRY_BACKOFF_MAX
+RETRY_BACKOFF = 30
+RETRY_BACKOFF_MAX = 30 * 60
+POLL_INTERVAL = 1.0
+# 延迟统计取每个队列最近多少次执行
+STATS_WINDOW = 500
+
+# 命名队列及默认并发数 / 单任务超时（秒）
+# 只声明有生产者的队列：每个队列的 worker 都会按轮询间隔开启 SQLite 写事务
+QUEUE_NAMES = ("collect", "content", "notify")
+DEFAULT_CONCURRENCY = {"collect": 1, "content": 1, "notify": 4}
+DEFAULT_TIMEOUTS = {"collect": 1800, "content": 1800, "notify": 60}
+
+_SCHEMA = """
+create table if not exists jobs (
+    id integer primary key autoincrement,
+    queue text not null,
+    func text not null,
+    payload text not null,
+    dedup_key text,
+    state text not null default 'pending',
+    priority integer not null default 0,
+    timeout real,
+    attempts integer not null default 0,
+    max_attempts integer not null,
+    run_at real not null,
+    lease_owner text,
+    lease_until real,
+    last_error text,
+    created_at real not null,
+    started_at real,
+    subscribers text not null default '[]'
+);
+create unique index if not exists idx_jobs_dedup
+    on jobs (queue, dedup_key)
+    where dedup_key is not null and state in ('pending', 'running');
+create table if not exists queue_stats (
+    queue text not null,
+    key text not null,
+    value integer not null default 0,
+    primary key (queue, key)
+);
+create table if not exists queue_pauses (
+    queue text primary key,
+    until real
+);
+create table if not exists job_runs (
+    id integer primary key autoincrement,
+    queue text not null,
+    finished_at real not null,
+    wait_ms real not null,
+    run_ms real not null,
+    ok integer not null
+);
+create index if not exists idx_job_runs_queue on job_runs (queue, id);
+"""
+# 早期版本建表后补充的列
+_ADDED_COLUMNS = {
+    "subscribers": "text not null default '[]'",
+    "priority": "integer not null default 0",
+    "timeout": "real",
+}
+# running 任务取走订阅者后进入 finishing：此后同 key 的提交会新建任务，不会丢订阅
+_ACTIVE_STATES = "('running', 'finishing')"
+
+
+class TaskCancelled(Exception):
+    """任务被取消或超时"""
+
+
+def _jsonable(value: Any) -> Any:
+    """任务参数序列化：pydantic 模型 / dataclass 转为 dict，其他类型在入队时报错"""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"任务参数无法 JSON 序列化: {type(value).__name__}")
+
+
+def _func_path(task: Callable[..., Any]) -> str:
+    module = getattr(task, "__module__", None)
+    qualname = getattr(task, "__qualname__", "")
+    if not module or not qualname or "<" in qualname:
+        raise ValueError(f"任务函数必须是模块级函数才能持久化: {task!r}")
+    return f"{module}:{qualname}"
+
+
+def _resolve_func(path: str) -> Callable[..., Any]:
+    module_name, _, qualname = path.partition(":")
+    obj: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _percentile(values: List[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, math.ceil(p * len(ordered)) - 1)], 1)
+
+
+class _Running:
+    """本进程内一个执行中的任务"""
+
+    def __init__(self, owner: str):
+        self.owner = owner
+        self.cancel_event = threading.Event()
+        self.cancel_reason: Optional[str] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.future: Optional[asyncio.Future] = None
+
+    def cancel(self, reason: str) -> None:
+        self.cancel_reason = self.cancel_reason or reason
+        self.cancel_event.set()
+        loop, future = self.loop, self.future
+        if loop is not None and future is not None:
+            try:
+                loop.call_soon_threadsafe(future.cancel)
+            except RuntimeError:
+                # 事件循环已结束
+                pass
+
 
 class TaskQueueManager:
-    """任务队列管理器，用于管理和执行排队任务"""
+    """任务队列管理器，用于管理和执行排队任务（SQLite 持久化）"""
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        tag: str = "",
+        name: str = "default",
+        db_path: str = DEFAULT_DB_PATH,
+        workers: int = 1,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        task_timeout: Optional[float] = None,
+    ):
+        """初始化任务队列（数据库文件在首次使用时创建）"""
+        self.maxsize = maxsize
+        self.tag = tag
+        self.name = name
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.task_timeout = task_timeout
 
-    def __init__(self, maxsize=0, tag: str = ""):
-        """初始化任务队列"""
-        self._queue = queue.Queue(maxsize=maxsize)
         self._lock = threading.Lock()
         self._is_running = False
-        self.tag = tag
+        self._wakeup = threading.Event()
+        self._local = threading.local()
+        self._schema_ready = False
+        # 本进程正在执行的任务 {job_id: _Running}，供续约线程与 cancel() 使用
+        self._active: Dict[int, _Running] = {}
+        self._threads: list[threading.Thread] = []
+        self._finished = 0
+
+    #! 存储
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    cols = {r["name"] for r in conn.execute("pragma table_info(jobs)")}
+                    for col, ddl in _ADDED_COLUMNS.items():
+                        if col not in cols:
+                            conn.execute(f"alter table jobs add column {col} {ddl}")
+                    conn.execute(
+                        "create index if not exists idx_jobs_claim "
+                        "on jobs (queue, state, priority desc, run_at)"
+                    )
+                    if self.name == "collect":
+                        # 单队列版本遗留的任务归入采集队列
+                        try:
+                            conn.execute("update jobs set queue = 'collect' where queue = 'default'")
+                        except sqlite3.IntegrityError:
+                            pass
+                    self._schema_ready = True
+        return conn
+
+    #! 入队
 
-    def add_task(self, task: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    def add_task(
+        self,
+        task: Callable[..., Any],
+        *args: Any,
+        dedup_key: Optional[str] = None,
+        delay: float = 0,
+        subscriber: Any = None,
+        priority: int = 0,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Optional[int]:
         """添加任务到队列
 
         Args:
-            task: 要执行的任务函数
-            *args: 任务函数的参数
+            task: 要执行的任务函数（模块级函数或协程函数）
+            *args: 任务函数的参数（需可 JSON 序列化）
+            dedup_key: 去重键，同一键已在排队/执行时忽略本次添加
+            delay: 延迟执行秒数
+            subscriber: 订阅者（需可 JSON 序列化），去重命中时追加到已有任务，
+                任务函数通过 take_subscribers() 取得全部订阅者
+            priority: 优先级，数值越大越先执行
+            timeout: 单任务超时秒数，默认使用队列配置
             **kwargs: 任务函数的关键字参数
+
+        Returns:
+            任务 id；因去重或队列已满被忽略时返回 None
+
+        Raises:
+            TypeError: 参数或订阅者无法 JSON 序列化
         """
         if not self._is_running:
             self.run_task_background()
-        self._queue.put((task, args, kwargs))
+        payload = json.dumps(
+            {"args": args, "kwargs": kwargs}, ensure_ascii=False, default=_jsonable
+        )
+        now = time.time()
+        conn = self._conn()
+        if self.maxsize and self._count_pending(conn) >= self.maxsize:
+            logger.warning(f"{self.tag}队列已满({self.maxsize})，忽略任务")
+            return None
+        subscribers = "[]"
+        if subscriber is not None:
+            subscribers = json.dumps([subscriber], ensure_ascii=False, default=_jsonable)
+        # 插入与合并在同一事务内，避免与 take_subscribers 交错导致订阅丢失
+        conn.execute("begin immediate")
+        try:
+            cur = conn.execute(
+                "insert or ignore into jobs (queue, func, payload, dedup_key, priority, timeout, "
+                "max_attempts, run_at, created_at, subscribers) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.name, _func_path(task), payload, dedup_key, priority, timeout,
+                    self.max_attempts, now + delay, now, subscribers,
+                ),
+            )
+            merged = cur.rowcount == 0
+            if merged:
+                if subscriber is not None:
+                    conn.execute(
+                        "update jobs set subscribers = json_insert(subscribers, '$[#]', json(json_extract(?, '$[0]'))) "
+                        "where queue = ? and dedup_key = ? and state in ('pending', 'running')",
+                        (subscribers, self.name, dedup_key),
+                    )
+                self._incr_stat(conn, "duplicate_fetches_avoided")
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        if merged:
+            logger.info(f"{self.tag}队列已有相同任务，已合并: {dedup_key}")
+            return None
+        self._wakeup.set()
         logger.success(f"{self.tag}队列任务添加成功\n")
+        return cur.lastrowid
+
+    def _incr_stat(self, conn: sqlite3.Connection, key: str, n: int = 1) -> None:
+        conn.execute(
+            "insert into queue_stats (queue, key, value) values (?, ?, ?) "
+            "on conflict (queue, key) do update set value = value + excluded.value",
+            (self.name, key, n),
+        )
+
+    def take_subscribers(self) -> list:
+        """在任务函数内调用：取走当前任务的全部订阅者（含执行期间新合并进来的）。
+
+        取走后任务不再接受合并，之后同 dedup_key 的提交会新建任务。
+        不在队列 worker 中调用时返回空列表。
+        """
+        job_id = getattr(self._local, "job_id", None)
+        if job_id is None:
+            return []
+        conn = self._conn()
+        conn.execute("begin immediate")
+        try:
+            row = conn.execute(
+                "select subscribers from jobs where id = ?", (job_id,)
+            ).fetchone()
+            conn.execute(
+                "update jobs set state = 'finishing', subscribers = '[]' where id = ?",
+                (job_id,),
+            )
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        return json.loads(row["subscribers"]) if row else []
+
+    def is_cancelled(self) -> bool:
+        """在任务函数内调用：当前任务是否已被取消/超时（普通函数用于协作退出）"""
+        running = self._active.get(getattr(self._local, "job_id", None))
+        return bool(running and running.cancel_event.is_set())
+
+    def _count_pending(self, conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            "select count(*) from jobs where queue = ? and state = 'pending'", (self.name,)
+        ).fetchone()[0]
+
+    #! 执行
 
     def run_task_background(self) -> None:
         with self._lock:
@@ -35,77 +349,413 @@ class TaskQueueManager:
                 logger.warning("队列任务已在后台运行，忽略重复启动")
                 return
             self._is_running = True
-        threading.Thread(target=self.run_tasks, daemon=True).start()
-        logger.warning("队列任务后台运行")
+            self._threads = [
+                threading.Thread(
+                    target=self.run_tasks, daemon=True, name=f"{self.name}-worker-{i}"
+                )
+                for i in range(self.workers)
+            ]
+            self._threads.append(
+                threading.Thread(
+                    target=self._renew_leases, daemon=True, name=f"{self.name}-lease"
+                )
+            )
+        for t in self._threads:
+            t.start()
+        logger.warning(f"{self.name}队列任务后台运行 workers={self.workers}")
+
+    def _claim(self, owner: str) -> Optional[sqlite3.Row]:
+        """领取一个到期任务（含租约过期的 running 任务），无任务时返回 None"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("begin immediate")
+        try:
+            row = conn.execute(
+                "select id, attempts, max_attempts from jobs where queue = ? and ("
+                f"(state = 'pending' and run_at <= ?) or (state in {_ACTIVE_STATES} and lease_until < ?)"
+                ") order by priority desc, run_at, id limit 1",
+                (self.name, now, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("commit")
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                # 已达最大次数仍租约过期（多为执行中进程崩溃），不再重试
+                conn.execute(
+                    "update jobs set state = 'dead', lease_owner = null, lease_until = null, "
+                    "last_error = coalesce(last_error, '租约过期') where id = ?",
+                    (row["id"],),
+                )
+                conn.execute("commit")
+                return self._claim(owner)
+            conn.execute(
+                "update jobs set state = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_until = ?, started_at = ? where id = ?",
+                (owner, now + self.visibility_timeout, now, row["id"]),
+            )
+            job = conn.execute("select * from jobs where id = ?", (row["id"],)).fetchone()
+            conn.execute("commit")
+            return job
+        except Exception:
+            conn.execute("rollback")
+            raise
+
+    def _finish(
+        self,
+        job: sqlite3.Row,
+        owner: str,
+        error: Optional[str],
+        run_ms: float,
+        retry: bool = True,
+    ) -> None:
+        conn = self._conn()
+        now = time.time()
+        wait_ms = max((job["started_at"] - job["run_at"]) * 1000, 0)
+        conn.execute(
+            "insert into job_runs (queue, finished_at, wait_ms, run_ms, ok) values (?, ?, ?, ?, ?)",
+            (self.name, now, wait_ms, run_ms, int(error is None)),
+        )
+        self._finished += 1
+        if self._finished % 50 == 0:
+            conn.execute(
+                "delete from job_runs where queue = ? and id <= "
+                "(select id from job_runs where queue = ? order by id desc limit 1 offset ?)",
+                (self.name, self.name, STATS_WINDOW),
+            )
+
+        if error is None:
+            conn.execute(
+                "delete from jobs where id = ? and lease_owner = ?", (job["id"], owner)
+            )
+            return
+        attempts = job["attempts"]
+        if not retry or attempts >= job["max_attempts"]:
+            conn.execute(
+                "update jobs set state = 'dead', lease_owner = null, lease_until = null, "
+                "last_error = ? where id = ? and lease_owner = ?",
+                (error, job["id"], owner),
+            )
+            logger.error(f"{self.tag}队列任务 {job['id']} 执行 {attempts} 次后终止: {error}")
+            return
+        delay = min(RETRY_BACKOFF * 2 ** (attempts - 1), RETRY_BACKOFF_MAX)
+        conn.execute(
+            "update jobs set state = 'pending', run_at = ?, lease_owner = null, "
+            "lease_until = null, last_error = ? where id = ? and lease_owner = ?",
+            (now + delay, error, job["id"], owner),
+        )
+        logger.warning(f"{self.tag}队列任务 {job['id']} 失败，{delay}秒后重试: {error}")
 
-    def run_tasks(self, timeout: float = 1.0) -> None:
-        """执行队列中的所有任务，并持续运行以接收新任务"""
+    def _paused(self) -> bool:
+        """读取共享的暂停状态；until 为空表示直到 resume()"""
         try:
-            while True:
-                with self._lock:
-                    if not self._is_running:
-                        break
+            conn = self._conn()
+            row = conn.execute("select until from queue_pauses where queue = ?", (self.name,)).fetchone()
+            if row is None:
+                return False
+            until = row["until"]
+            if until is not None and time.time() >= until:
+                cur = conn.execute(
+                    "delete from queue_pauses where queue = ? and until = ?", (self.name, until)
+                )
+                if cur.rowcount:
+                    logger.info(f"{self.tag}队列暂停到期，恢复执行")
+                return False
+        except Exception as e:
+            logger.warning(f"{self.tag}队列暂停状态读取失败: {e}")
+            return False
+        return True
+
+    def _call(self, job: sqlite3.Row, running: _Running) -> None:
+        """在执行线程中调用任务函数；协程函数在独立事件循环中运行以便取消"""
+        self._local.job_id = job["id"]
+        try:
+            payload = json.loads(job["payload"])
+            func = _resolve_func(job["func"])
+            if not inspect.iscoroutinefunction(func):
+                func(*payload["args"], **payload["kwargs"])
+                return
+            loop = asyncio.new_event_loop()
+            try:
+                future = loop.create_task(func(*payload["args"], **payload["kwargs"]))
+                running.loop, running.future = loop, future
+                if running.cancel_event.is_set():
+                    future.cancel()
                 try:
-                    # 阻塞获取任务，避免CPU空转
-                    task, args, kwargs = self._queue.get(timeout=timeout)
-                    try:
-                        start_time = time.time()
-                        task(*args, **kwargs)
-                        duration = time.time() - start_time
-                        logger.info(f"\n任务执行完成, 耗时: {duration:.2f}秒")
-                    except Exception as e:
-                        logger.error(f"队列任务执行失败: {e}")
-                    finally:
-                        self._queue.task_done()
-                except queue.Empty:
-                    continue
+                    loop.run_until_complete(future)
+                except asyncio.CancelledError:
+                    raise TaskCancelled(running.cancel_reason or "cancelled")
+            finally:
+                running.loop = running.future = None
+                loop.close()
         finally:
-            with self._lock:
-                self._is_running = False
-            gc.collect()
+            self._local.job_id = None
+
+    def _execute(self, job: sqlite3.Row, running: _Running) -> tuple[Optional[str], bool]:
+        """执行任务并等待结果（超时/取消时不再等待），返回 (错误信息, 是否允许重试)"""
+        result: Dict[str, BaseException] = {}
+
+        def target() -> None:
+            try:
+                self._call(job, running)
+            except BaseException as e:
+                result["error"] = e
+
+        thread = threading.Thread(target=target, daemon=True, name=f"{self.name}-job-{job['id']}")
+        thread.start()
+        timeout = job["timeout"] or self.task_timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        while thread.is_alive():
+            thread.join(POLL_INTERVAL)
+            if running.cancel_event.is_set():
+                break
+            if deadline and time.monotonic() > deadline:
+                running.cancel(f"timeout after {timeout}s")
+                break
+        if running.cancel_event.is_set():
+            # 协程会在此处被真正取消；普通函数继续在后台运行直到自行返回
+            thread.join(1)
+            reason = running.cancel_reason or "cancelled"
+            if thread.is_alive():
+                # 线程仍在执行，重试会让同一 key 的任务并行跑两份，只记为失败
+                logger.warning(f"{self.tag}队列任务 {job['id']} 超时后仍在后台执行，不再重试")
+                return f"{reason} (still running)", False
+            return reason, reason.startswith("timeout")
+        error = result.get("error")
+        if error is None:
+            return None, True
+        if isinstance(error, TaskCancelled):
+            return str(error), str(error).startswith("timeout")
+        return str(error) or error.__class__.__name__, True
+
+    def run_tasks(self, timeout: float = POLL_INTERVAL) -> None:
+        """循环领取并执行任务，直到 stop()"""
+        owner = f"{os.getpid()}-{threading.current_thread().name}-{uuid.uuid4().hex[:8]}"
+        while self._is_running:
+            if self._paused():
+                time.sleep(timeout)
+                continue
+            try:
+                job = self._claim(owner)
+            except Exception as e:
+                logger.error(f"{self.tag}队列领取任务失败: {e}")
+                time.sleep(timeout)
+                continue
+            if job is None:
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+                continue
+
+            running = _Running(owner)
+            self._active[job["id"]] = running
+            start_time = time.time()
+            try:
+                error, retry = self._execute(job, running)
+            finally:
+                self._active.pop(job["id"], None)
+            duration = time.time() - start_time
+            if error is None:
+                logger.info(f"\n任务执行完成, 耗时: {duration:.2f}秒")
+            else:
+                logger.error(f"队列任务执行失败: {error}")
+            try:
+                self._finish(job, owner, error, duration * 1000, retry=retry)
+            except Exception as e:
+                logger.error(f"{self.tag}队列更新任务状态失败: {e}")
+
+    def _renew_leases(self) -> None:
+        """为本进程执行中的任务续约，长任务不会被其他 worker 重复领取"""
+        interval = max(self.visibility_timeout / 3, 1)
+        while self._is_running:
+            time.sleep(interval)
+            active = list(self._active.items())
+            if not active:
+                continue
+            try:
+                conn = self._conn()
+                until = time.time() + self.visibility_timeout
+                conn.executemany(
+                    "update jobs set lease_until = ? where id = ? and lease_owner = ?",
+                    [(until, job_id, r.owner) for job_id, r in active],
+                )
+            except Exception as e:
+                logger.warning(f"{self.tag}队列续约失败: {e}")
+
+    #! 状态与控制
 
     def get_queue_info(self) -> dict:
-        """获取队列的当前状态信息"""
-        with self._lock:
-            return {
-                "is_running": self._is_running,
-                "pending_tasks": self._queue.qsize(),
+        """获取队列的当前状态信息（深度、等待时长与执行延迟）"""
+        now = time.time()
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "select "
+                "sum(state = 'pending') as pending, "
+                "sum(state = 'pending' and run_at <= ?) as ready, "
+                f"sum(state in {_ACTIVE_STATES}) as running, "
+                "sum(state = 'dead') as dead, "
+                "min(case when state = 'pending' then created_at end) as oldest_pending, "
+                f"min(case when state in {_ACTIVE_STATES} then started_at end) as oldest_running "
+                "from jobs where queue = ?",
+                (now, self.name),
+            ).fetchone()
+            stats = {
+                r["key"]: r["value"]
+                for r in conn.execute(
+                    "select key, value from queue_stats where queue = ?", (self.name,)
+                )
             }
+            runs = conn.execute(
+                "select wait_ms, run_ms, ok from job_runs where queue = ? order by id desc limit ?",
+                (self.name, STATS_WINDOW),
+            ).fetchall()
+        except Exception as e:
+            logger.warning(f"{self.tag}队列状态读取失败: {e}")
+            return {"is_running": self._is_running, "pending_tasks": None}
+
+        def age(ts: Optional[float]) -> Optional[float]:
+            return round(now - ts, 1) if ts else None
 
-    def join(self) -> None:
-        """阻塞等待队列中的所有任务完成"""
-        self._queue.join()
+        run_ms = [r["run_ms"] for r in runs]
+        wait_ms = [r["wait_ms"] for r in runs]
+        return {
+            "name": self.name,
+            "is_running": self._is_running,
+            "paused": self._paused(),
+            "workers": self.workers,
+            "pending_tasks": row["pending"] or 0,
+            "ready_tasks": row["ready"] or 0,
+            "running_tasks": row["running"] or 0,
+            "dead_tasks": row["dead"] or 0,
+            "oldest_pending_age_s": age(row["oldest_pending"]),
+            "oldest_running_age_s": age(row["oldest_running"]),
+            # 最近 STATS_WINDOW 次执行：执行耗时与排队等待
+            "recent_runs": len(runs),
+            "recent_failures": sum(1 for r in runs if not r["ok"]),
+            "avg_run_ms": round(sum(run_ms) / len(run_ms), 1) if run_ms else None,
+            "p95_run_ms": _percentile(run_ms, 0.95),
+            "avg_wait_ms": round(sum(wait_ms) / len(wait_ms), 1) if wait_ms else None,
+            "p95_wait_ms": _percentile(wait_ms, 0.95),
+            # 因去重/合并而省下的重复采集次数（累计）
+            "duplicate_fetches_avoided": stats.get("duplicate_fetches_avoided", 0),
+        }
+
+    def join(self, poll: float = POLL_INTERVAL) -> None:
+        """阻塞等待队列中的所有任务完成（不含 dead）"""
+        while True:
+            info = self.get_queue_info()
+            if not info.get("pending_tasks") and not info.get("running_tasks"):
+                return
+            time.sleep(poll)
 
     def stop(self) -> None:
-        """停止任务执行"""
+        """停止任务执行（未完成的任务保留在队列中，下次启动继续）"""
         with self._lock:
             self._is_running = False
+        self._wakeup.set()
 
-    def clear_queue(self) -> None:
-        """清空队列中的所有任务"""
-        with self._lock:
-            while not self._queue.empty():
-                try:
-                    self._queue.get_nowait()
-                    self._queue.task_done()
-                except queue.Empty:
-                    break
-            logger.success("队列已清空")
+    def pause(self, seconds: Optional[float] = None) -> None:
+        """暂停领取新任务（正在执行的任务不受影响，所有进程生效）；seconds 为空时直到 resume()"""
+        self._conn().execute(
+            "insert or replace into queue_pauses (queue, until) values (?, ?)",
+            (self.name, time.time() + seconds if seconds else None),
+        )
+        logger.warning(f"{self.tag}队列已暂停")
+
+    def resume(self) -> None:
+        cur = self._conn().execute("delete from queue_pauses where queue = ?", (self.name,))
+        if cur.rowcount:
+            # 其他进程的 worker 在下一次轮询（POLL_INTERVAL）时恢复
+            self._wakeup.set()
+            logger.info(f"{self.tag}队列已恢复")
+
+    def cancel(self, job_id: int) -> bool:
+        """取消任务：排队中的直接删除；本进程执行中的发出取消（不再重试）"""
+        cur = self._conn().execute(
+            "delete from jobs where id = ? and queue = ? and state = 'pending'",
+            (job_id, self.name),
+        )
+        if cur.rowcount:
+            logger.info(f"{self.tag}队列任务 {job_id} 已取消")
+            return True
+        running = self._active.get(job_id)
+        if running is not None:
+            running.cancel("cancelled")
+            logger.info(f"{self.tag}队列任务 {job_id} 正在取消")
+            return True
+        return False
+
+    def clear_queue(self, keep_subscribed: bool = False) -> None:
+        """清空队列中等待执行的任务
+
+        keep_subscribed: 保留带订阅者的任务（结果属于某次运行，删除后该运行要等到超时才发送）
+        """
+        self._conn().execute(
+            "delete from jobs where queue = ? and state = 'pending'"
+            + (" and subscribers = '[]'" if keep_subscribed else ""),
+            (self.name,),
+        )
+        logger.success("队列已清空")
 
     def delete_queue(self) -> None:
         """删除队列(停止并清空所有任务)"""
-        with self._lock:
-            self._is_running = False
-            while not self._queue.empty():
-                try:
-                    self._queue.get_nowait()
-                    self._queue.task_done()
-                except queue.Empty:
-                    break
-            logger.success("队列已删除")
+        self.stop()
+        self._conn().execute("delete from jobs where queue = ?", (self.name,))
+        logger.success("队列已删除")
+
+
+def _parse_queue_map(spec: str, cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """解析 "collect=1,notify=4" 形式的配置"""
+    out: Dict[str, Any] = {}
+    for part in (spec or "").split(","):
+        name, _, value = part.partition("=")
+        try:
+            out[name.strip()] = cast(value.strip())
+        except ValueError:
+            continue
+    return out
+
+
+def _build_queues() -> Dict[str, TaskQueueManager]:
+    from core.common.app_settings import settings
+
+    concurrency = {**DEFAULT_CONCURRENCY, **_parse_queue_map(settings.queue_concurrency, int)}
+    timeouts = {**DEFAULT_TIMEOUTS, **_parse_queue_map(settings.queue_timeouts, float)}
+    return {
+        name: TaskQueueManager(
+            tag=f"{name}",
+            name=name,
+            db_path=settings.queue_db,
+            workers=concurrency[name],
+            visibility_timeout=settings.queue_visibility_timeout,
+            task_timeout=timeouts[name] or None,
+        )
+        for name in QUEUE_NAMES
+    }
+
+
+task_queues = _build_queues()
+
+
+def get_task_queue(name: str) -> TaskQueueManager:
+    return task_queues[name]
+
+
+def get_all_queue_info() -> Dict[str, dict]:
+    return {name: q.get_queue_info() for name, q in task_queues.items()}
+
+
+def start_all_queues() -> None:
+    for q in task_queues.values():
+        q.run_task_background()
+
+
+def stop_all_queues() -> None:
+    for q in task_queues.values():
+        q.stop()
 
 
-TaskQueue = TaskQueueManager(tag="默认队列")
+# 兼容旧用法：默认队列即采集队列
+TaskQueue = task_queues["collect"]
 
 if __name__ == "__main__":
 
@@ -119,7 +769,7 @@ if __name__ == "__main__":
         logger.info(f"执行任务2, 参数: {name}")
         time.sleep(6)
 
-    manager = TaskQueueManager(tag="默认队列")
+    manager = TaskQueueManager(tag="默认队列", db_path="data/task_queue_demo.db")
     manager.run_task_background()
     manager.add_task(task1)
     manager.add_task(task2, "测试任务")
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any
+from core.integrations.supabase.keyset import apply_cursor
 
 
 class EventsRepository:
@@ -9,23 +10,50 @@ class EventsRepository:
     def __init__(self, client: Any):
         self.client = client
 
+    PAGE_ORDER = "created_at.desc,id.desc"
+
     async def get_events(
         self,
         article_id: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        cursor: Optional[str] = None,
     ):
-        """获取事件列表"""
+        """获取事件列表
+
+        按 (created_at, id) 倒序；传入 cursor 时走 keyset 分页，忽略 offset。
+        """
         filters: Dict[str, Any] = {}
         if article_id is not None:
             filters["article_id"] = article_id
 
+        if cursor:
+            return await self.client.select(
+                self.EVENT_TABLE,
+                filters=apply_cursor(filters, cursor, "created_at", "id"),
+                limit=limit,
+                order=self.PAGE_ORDER,
+            )
+
         return await self.client.select(
             self.EVENT_TABLE,
             filters=filters or None,
             limit=limit,
             offset=offset,
+            order=self.PAGE_ORDER,
+        )
+
+    async def get_event_article_ids(self, article_ids: Optional[List[str]] = None) -> List[str]:
+        """已生成活动记录的文章 id（只取 article_id 列，可限定在给定文章范围内）"""
+        filters: Optional[Dict[str, Any]] = None
+        if article_ids is not None:
+            if not article_ids:
+                return []
+            filters = {"article_id": {"in": article_ids}}
+        rows = await self.client.select(
+            self.EVENT_TABLE, filters=filters, columns="article_id"
         )
+        return [str(r["article_id"]) for r in rows if r.get("article_id")]
 
     async def get_event_by_id(self, event_id: str):
         """根据 ID 获取事件"""
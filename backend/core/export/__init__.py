@@ -0,0 +1,27 @@
+"""批量导出模块（NDJSON / Parquet 流式导出）。"""
+
+from core.export.formats import (
+    EXPORT_FORMATS,
+    MEDIA_TYPES,
+    ExportStats,
+    parquet_available,
+)
+from core.export.service import (
+    article_export_filters,
+    event_export_filters,
+    export_articles,
+    parse_day_range,
+    export_events,
+)
+
+__all__ = [
+    "EXPORT_FORMATS",
+    "MEDIA_TYPES",
+    "ExportStats",
+    "parquet_available",
+    "article_export_filters",
+    "event_export_filters",
+    "export_articles",
+    "export_events",
+    "parse_day_range",
+]
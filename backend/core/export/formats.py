@@ -0,0 +1,193 @@
+"""导出编码：把行迭代器编码为 NDJSON 或 Parquet(zstd) 字节块，边读边写。"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from core.common.log import logger
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+# NDJSON 攒够这么多字节再向下游发送一次
+NDJSON_CHUNK_BYTES = 64 * 1024
+# Parquet 每个 row group 最多的行数与（估算的）原始字节数，先到者为准；
+# 含 HTML 正文（content）时单行可达数百 KB，按字节限制保证内存占用有上界
+PARQUET_ROW_GROUP = 2000
+PARQUET_ROW_GROUP_BYTES = 8 * 1024 * 1024
+
+
+class ExportStats:
+    """导出吞吐统计"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.bytes = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-6)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "export": self.name,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "elapsed_s": round(self.elapsed, 3),
+            "mb_per_s": round(self.bytes / 1024 / 1024 / self.elapsed, 2),
+        }
+
+
+async def ndjson_chunks(
+    rows: AsyncIterator[Dict[str, Any]], stats: ExportStats
+) -> AsyncIterator[bytes]:
+    buf: List[bytes] = []
+    size = 0
+    async for row in rows:
+        line = json.dumps(row, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+        buf.append(line)
+        size += len(line)
+        stats.rows += 1
+        if size >= NDJSON_CHUNK_BYTES:
+            stats.bytes += size
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        stats.bytes += size
+        yield b"".join(buf)
+    logger.info(f"导出完成: {stats.summary()}")
+
+
+class _ChunkSink:
+    """供 pyarrow 写入的文件对象，写入内容由调用方按块取走"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.closed = False
+        self._pos = 0
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self.chunks.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        out = b"".join(self.chunks)
+        self.chunks = []
+        return out
+
+
+def _parquet_schema(columns: Iterable[str], int_columns: set, bool_columns: set):
+    import pyarrow as pa
+
+    fields = []
+    for col in columns:
+        if col in int_columns:
+            fields.append(pa.field(col, pa.int64()))
+        elif col in bool_columns:
+            fields.append(pa.field(col, pa.bool_()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+def _row_bytes(row: Dict[str, Any]) -> int:
+    """估算一行的原始大小：字符串按字符数，其他值按 8 字节"""
+    return sum(len(v) if isinstance(v, str) else 8 for v in row.values())
+
+
+def _to_column_batch(rows: List[Dict[str, Any]], schema) -> Dict[str, list]:
+    import pyarrow as pa
+
+    data: Dict[str, list] = {}
+    for field in schema:
+        values = [r.get(field.name) for r in rows]
+        if field.type == pa.string():
+            values = [
+                v if v is None or isinstance(v, str) else json.dumps(v, ensure_ascii=False, default=str)
+                for v in values
+            ]
+        data[field.name] = values
+    return data
+
+
+async def parquet_chunks(
+    rows: AsyncIterator[Dict[str, Any]],
+    stats: ExportStats,
+    columns: Optional[List[str]] = None,
+    int_columns: Optional[set] = None,
+    bool_columns: Optional[set] = None,
+) -> AsyncIterator[bytes]:
+    """按 row group 写 Parquet(zstd)，每写完一个 row group 即发送。
+
+    row group 按行数与字节数双重限制；建表与 zstd 编码在线程中执行，不阻塞事件循环。
+    columns 为空时以首行的键为准；需要 pyarrow（可选依赖）。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    batch: List[Dict[str, Any]] = []
+    batch_bytes = 0
+
+    def write_batch(rows_: List[Dict[str, Any]]) -> bytes:
+        table = pa.Table.from_pydict(_to_column_batch(rows_, schema), schema=schema)
+        writer.write_table(table)
+        return sink.take()
+
+    def finish() -> bytes:
+        writer.close()
+        return sink.take()
+
+    async for row in rows:
+        if writer is None:
+            schema = _parquet_schema(
+                columns or list(row.keys()), int_columns or set(), bool_columns or set()
+            )
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        batch.append(row)
+        batch_bytes += _row_bytes(row)
+        stats.rows += 1
+        if len(batch) >= PARQUET_ROW_GROUP or batch_bytes >= PARQUET_ROW_GROUP_BYTES:
+            chunk = await asyncio.to_thread(write_batch, batch)
+            batch, batch_bytes = [], 0
+            if chunk:
+                stats.bytes += len(chunk)
+                yield chunk
+
+    if writer is None:
+        # 空结果也输出合法的空文件
+        schema = _parquet_schema(columns or [], int_columns or set(), bool_columns or set())
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    if batch:
+        await asyncio.to_thread(write_batch, batch)
+    tail = await asyncio.to_thread(finish)
+    if tail:
+        stats.bytes += len(tail)
+        yield tail
+    logger.info(f"导出完成: {stats.summary()}")
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,159 @@
+"""文章/活动批量导出：组合过滤条件 + keyset 流式读取 + 编码。"""
+
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from core.articles import article_repo, article_columns
+from core.events import event_repo
+from core.export.formats import ExportStats, ndjson_chunks, parquet_chunks
+from core.tags import tag_repo
+
+# 导出读取的页大小；prefetch 下内存中最多两页
+EXPORT_PAGE_SIZE = 500
+
+ARTICLE_INT_COLUMNS = {"publish_time"}
+ARTICLE_BOOL_COLUMNS = {"is_gathered"}
+
+
+def parse_day_range(
+    start: Optional[str], end: Optional[str]
+) -> tuple[Optional[datetime], Optional[datetime]]:
+    """YYYY-MM-DD 日期区间 -> [start 00:00, end 次日 00:00)（UTC）"""
+    lo = hi = None
+    if start:
+        lo = datetime.combine(
+            datetime.strptime(start, "%Y-%m-%d").date(), dt_time.min, timezone.utc
+        )
+    if end:
+        hi = datetime.combine(
+            datetime.strptime(end, "%Y-%m-%d").date(), dt_time.min, timezone.utc
+        ) + timedelta(days=1)
+    return lo, hi
+
+
+async def _resolve_mp_ids(
+    mp_id: Optional[str], tag_id: Optional[str]
+) -> Optional[List[str]]:
+    """公众号/标签 -> mp_id 列表；均未指定时返回 None 表示不过滤"""
+    if tag_id is None or str(tag_id).strip() == "":
+        return [mp_id] if mp_id else None
+    ids = await tag_repo.get_feed_ids_by_tag(tag_id)
+    if mp_id:
+        ids = [i for i in ids if i == mp_id]
+    return ids
+
+
+async def article_export_filters(
+    mp_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """构造文章导出过滤条件；标签下没有公众号时返回 None 以外的空匹配条件"""
+    filters: Dict[str, Any] = {}
+    mp_ids = await _resolve_mp_ids(mp_id, tag_id)
+    if mp_ids is not None:
+        filters["mp_id"] = {"in": mp_ids or [""]}
+    lo, hi = parse_day_range(start, end)
+    if lo or hi:
+        rng: Dict[str, int] = {}
+        if lo:
+            rng["gte"] = int(lo.timestamp())
+        if hi:
+            rng["lt"] = int(hi.timestamp())
+        filters["publish_time"] = rng
+    return filters or None
+
+
+async def event_export_filters(
+    mp_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """构造活动导出过滤条件（公众号/标签经 events.article_id -> articles 内联过滤）"""
+    filters: Dict[str, Any] = {}
+    mp_ids = await _resolve_mp_ids(mp_id, tag_id)
+    if mp_ids is not None:
+        filters["articles.mp_id"] = {"in": mp_ids or [""]}
+    lo, hi = parse_day_range(start, end)
+    if lo or hi:
+        rng: Dict[str, str] = {}
+        if lo:
+            rng["gte"] = lo.isoformat()
+        if hi:
+            rng["lt"] = hi.isoformat()
+        filters["created_at"] = rng
+    return filters or None
+
+
+async def _strip_embedded(
+    rows: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[Dict[str, Any]]:
+    async for row in rows:
+        articles = row.pop("articles", None)
+        if isinstance(articles, dict) and "mp_id" in articles:
+            row["mp_id"] = articles["mp_id"]
+        yield row
+
+
+def encode(
+    rows: AsyncIterator[Dict[str, Any]],
+    fmt: str,
+    stats: ExportStats,
+    columns: Optional[List[str]] = None,
+    int_columns: Optional[set] = None,
+    bool_columns: Optional[set] = None,
+) -> AsyncIterator[bytes]:
+    if fmt == "parquet":
+        return parquet_chunks(rows, stats, columns, int_columns, bool_columns)
+    return ndjson_chunks(rows, stats)
+
+
+async def export_articles(
+    fmt: str = "ndjson",
+    projection: str = "full",
+    mp_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+) -> AsyncIterator[bytes]:
+    """按过滤条件导出文章（按 id 升序）"""
+    stats = stats or ExportStats("articles")
+    filters = await article_export_filters(mp_id, tag_id, start, end)
+    columns = article_columns(projection)
+    rows = article_repo.stream_articles(
+        filters=filters, projection=columns, page_size=EXPORT_PAGE_SIZE, prefetch=True
+    )
+    async for chunk in encode(
+        rows,
+        fmt,
+        stats,
+        [c.strip() for c in columns.split(",")] if columns != "*" else None,
+        ARTICLE_INT_COLUMNS,
+        ARTICLE_BOOL_COLUMNS,
+    ):
+        yield chunk
+
+
+async def export_events(
+    fmt: str = "ndjson",
+    mp_id: Optional[str] = None,
+    tag_id: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    stats: Optional[ExportStats] = None,
+) -> AsyncIterator[bytes]:
+    """按过滤条件导出活动记录（按 id 升序），附带所属公众号 mp_id"""
+    stats = stats or ExportStats("events")
+    filters = await event_export_filters(mp_id, tag_id, start, end)
+    rows = event_repo.client.stream(
+        event_repo.EVENT_TABLE,
+        filters=filters,
+        columns="*,articles!inner(mp_id)",
+        page_size=EXPORT_PAGE_SIZE,
+        prefetch=True,
+    )
+    async for chunk in encode(_strip_embedded(rows), fmt, stats):
+        yield chunk
@@ -1,6 +1,5 @@
 from typing import Any, Callable, Optional
 
-from core.integrations.wx import create_gather
 from core.common.log import logger
 from core.common.runtime_settings import runtime_settings
 
@@ -28,7 +27,12 @@ def collect_feed_articles(
     if not faker_id:
         raise ValueError("公众号缺少 faker_id, 无法采集")
 
-    wx = create_gather()
+    # 采集器依赖 requests / bs4，调用时再导入
+    from core.integrations.wx import create_gather
+    from core.integrations.wx.transport import wx_transport
+
+    # 各公众号共用同一连接池，连接在公众号之间复用
+    wx = create_gather(session=wx_transport.session)
     gather_content = runtime_settings.get_bool_sync("gather.content", True)
     gather_mode = runtime_settings.get_sync("gather.model", "app")
     logger.info(
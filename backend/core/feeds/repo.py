@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from core.common.utils.async_tools import run_sync
+from core.integrations.supabase.keyset import apply_cursor
 
 
 class FeedRepository:
@@ -16,10 +17,30 @@ class FeedRepository:
         limit: Optional[int] = None,
         offset: Optional[int] = None,
         order_by: str = "created_at.desc",
+        cursor: Optional[str] = None,
+        columns: str = "*",
     ):
-        """获取订阅源列表（通用过滤）"""
+        """获取订阅源列表（通用过滤）
+
+        传入 cursor 时走 (created_at, id) keyset 分页，方向取自 order_by，忽略 offset。
+        columns 用于只取需要的列（如 "id,name"）。
+        """
+        if cursor:
+            direction = "desc" if order_by.split(",")[0].endswith(".desc") else "asc"
+            return await self.client.select(
+                self.FEED_TABLE,
+                filters=apply_cursor(filters, cursor, "created_at", "id", direction),
+                columns=columns,
+                limit=limit,
+                order=f"created_at.{direction},id.{direction}",
+            )
         return await self.client.select(
-            self.FEED_TABLE, filters=filters, limit=limit, offset=offset, order=order_by
+            self.FEED_TABLE,
+            filters=filters,
+            columns=columns,
+            limit=limit,
+            offset=offset,
+            order=order_by,
         )
 
     async def get_feeds_by_status(
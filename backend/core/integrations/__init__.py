@@ -1,5 +1,5 @@
-"""外部系统集成模块。"""
+"""外部系统集成模块。
 
-from core.integrations import supabase, notice, wx
-
-__all__ = ["supabase", "notice", "wx"]
+子包（supabase、notice、wx）按需导入，不在此处预先加载：
+导入任一集成时不会连带导入其余集成及其依赖（supabase-py、requests、bs4 等）。
+"""
@@ -2,39 +2,31 @@ from core.integrations.notice.wechat import send_wechat_message
 from core.integrations.notice.dingtalk import send_dingtalk_message
 from core.integrations.notice.feishu import send_feishu_message
 from core.integrations.notice.custom import send_custom_message
+from core.integrations.notice.dispatcher import notice_dispatcher, channel_of
 from core.common.log import logger
 
+__all__ = [
+    "notice",
+    "send_wechat_message",
+    "send_dingtalk_message",
+    "send_feishu_message",
+    "send_custom_message",
+]
+
 
 def notice(webhook_url, title, text, notice_type: str = None):
     """
-    公用通知方法，根据类型判断调用哪种通知
+    公用通知方法，根据 webhook 地址判断渠道，写入发件箱后立即返回（后台异步发送）
 
     参数:
-    - notice_type: 通知类型，'wechat' 或 'dingtalk'
     - webhook_url: 对应机器人的Webhook地址
     - title: 消息标题
     - text: 消息内容
+    - notice_type: 通知类型（wechat、dingtalk、feishu、custom），默认按地址判断
     """
-    if len(str(webhook_url)) == 0:
+    if len(str(webhook_url or "")) == 0:
         logger.info("未提供webhook_url")
-        return
-    if "qyapi.weixin.qq.com" in webhook_url:
-        notice_type = "wechat"
-    elif "oapi.dingtalk.com" in webhook_url:
-        notice_type = "dingtalk"
-    # 兼容企业本地化部署的飞书，如open.feishu.xxxx.com
-    elif "open.feishu." in webhook_url:
-        notice_type = "feishu"
-    else:
-        notice_type = "custom"
-
-    if notice_type == "wechat":
-        send_wechat_message(webhook_url, title, text)
-    elif notice_type == "dingtalk":
-        send_dingtalk_message(webhook_url, title, text)
-    elif notice_type == "feishu":
-        send_feishu_message(webhook_url, title, text)
-    elif notice_type == "custom":
-        send_custom_message(webhook_url, title, text)
-    else:
-        logger.info("不支持的通知类型")
+        return None
+    return notice_dispatcher.enqueue(
+        webhook_url, title, text, channel=notice_type or channel_of(webhook_url)
+    )
@@ -1,23 +1,23 @@
-import requests
-import json
-from core.common.log import logger
+def build_custom_payload(title, text):
+    """
+    自定义 Webhook 消息体
+
+    参数:
+    - title: 消息标题
+    - text: 消息内容
+    """
+    return {"title": title, "content": text}
 
 
 def send_custom_message(webhook_url, title, text):
     """
-    发送微信消息
+    发送自定义 Webhook 消息（写入通知发件箱，后台异步发送）
 
     参数:
     - webhook_url: 自定义Webhook地址
     - title: 消息标题
     - text: 消息内容
     """
-    headers = {"Content-Type": "application/json"}
-    data = {"title": title, "content": text}
-    try:
-        response = requests.post(
-            url=webhook_url, headers=headers, data=json.dumps(data)
-        )
-        logger.info(response.text)
-    except Exception as e:
-        logger.error(f"自定义webhook通知发送失败: {e}")
+    from core.integrations.notice.dispatcher import notice_dispatcher
+
+    return notice_dispatcher.enqueue(webhook_url, title, text, channel="custom")
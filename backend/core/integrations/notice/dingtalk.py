@@ -1,32 +1,32 @@
-import requests
-import json
-from core.common.log import logger
-
-
-def send_dingtalk_message(webhook_url, title, text, is_at_all=False, at_mobiles=[]):
+def build_dingtalk_payload(title, text, is_at_all=False, at_mobiles=None):
     """
-    发送Markdown格式消息
+    钉钉 Markdown 消息体
 
     参数:
-    - webhook_url: 机器人Webhook地址
     - title: 消息标题
     - text: Markdown格式内容
     - is_at_all: 是否@所有人
     - at_mobiles: 要@的手机号列表
     """
-    headers = {"Content-Type": "application/json"}
-    data = {
+    return {
         "msgtype": "markdown",
         "markdown": {"title": title, "text": text},
-        "at": {"atMobiles": at_mobiles, "isAtAll": is_at_all},
+        "at": {"atMobiles": at_mobiles or [], "isAtAll": is_at_all},
     }
-    try:
-        response = requests.post(
-            url=webhook_url, headers=headers, data=json.dumps(data)
-        )
-        logger.info(response.text)
-    except Exception as e:
-        logger.error(f"通知发送失败: {e}")
+
+
+def send_dingtalk_message(webhook_url, title, text):
+    """
+    发送Markdown格式消息（写入通知发件箱，后台异步发送；不支持@成员）
+
+    参数:
+    - webhook_url: 机器人Webhook地址
+    - title: 消息标题
+    - text: Markdown格式内容
+    """
+    from core.integrations.notice.dispatcher import notice_dispatcher
+
+    return notice_dispatcher.enqueue(webhook_url, title, text, channel="dingtalk")
 
 
 # 使用示例
@@ -37,4 +37,4 @@ def send_dingtalk_message(webhook_url, title, text, is_at_all=False, at_mobiles=
 # - [查看详情](http://example.com)
 # """
 # webhook="https://oapi.dingtalk.com/robot/send?access_token=xxx"
-# send_dingtalk_markdown(webhook, "项目状态通知", markdown_text)
+# send_dingtalk_message(webhook, "项目状态通知", markdown_text)
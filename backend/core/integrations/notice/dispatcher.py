@@ -0,0 +1,469 @@
+"""通知发送器：SQLite 发件箱 + 后台事件循环异步发送。
+
+- notice() 只负责落库并唤醒发送线程，调用方（notify 队列 worker）不再被慢接口阻塞
+- 共用一个 httpx.AsyncClient，按主机复用连接；连接与读取均有超时
+- 失败按指数退避重试，超过最大次数或不可重试的错误置为 dead 保留现场
+- 按机器人（webhook 地址）限速：钉钉 / 企业微信 20 条/分钟，飞书 100 条/分钟且 5 条/秒；
+  发送记录存库，多进程共用同一限额
+- 积压消息超过当前可用额度时合并为汇总消息（单条长度不超过平台限制）
+- 领取消息时加租约，多进程共用发件箱时同一条消息只由一个进程发送
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from core.common.log import logger
+from core.common.metrics import counter, gauge, histogram
+from core.integrations.notice.custom import build_custom_payload
+from core.integrations.notice.dingtalk import build_dingtalk_payload
+from core.integrations.notice.feishu import build_feishu_payload
+from core.integrations.notice.wechat import build_wechat_payload
+
+# 每个机器人的限额：((条数, 窗口秒数), ...)
+RATE_LIMITS: Dict[str, Tuple[Tuple[int, float], ...]] = {
+    "dingtalk": ((20, 60),),
+    "wechat": ((20, 60),),
+    "feishu": ((100, 60), (5, 1)),
+    "custom": (),
+}
+# 汇总消息正文长度上限，0 表示不限；企业微信 markdown 按 UTF-8 字节计（4096），其余按字符计
+MAX_TEXT = {"dingtalk": 15000, "wechat": 4096, "feishu": 15000, "custom": 0}
+MAX_TEXT_IN_BYTES = {"wechat"}
+# 单条汇总最多合并的消息数
+DIGEST_MAX_ITEMS = 20
+DIGEST_SEPARATOR = "\n\n---\n\n"
+# 不限速的渠道每轮最多领取的消息数
+MAX_BATCH = 50
+# 第 n 次失败后等待 RETRY_BACKOFF * 2^(n-1) 秒再重试，最多 RETRY_BACKOFF_MAX
+RETRY_BACKOFF = 10
+RETRY_BACKOFF_MAX = 30 * 60
+# 领取后租约基础时长（秒），另按待发送条数加上请求超时
+LEASE_SECONDS = 60
+POLL_INTERVAL = 1.0
+MAX_CONNECTIONS = 20
+# 平台返回的限流 / 系统繁忙错误码，按失败重试
+RETRYABLE_CODES = {-1, 130101, 45009, 9499, 11232, 11233}
+
+_PAYLOAD_BUILDERS: Dict[str, Callable[[str, str], dict]] = {
+    "dingtalk": build_dingtalk_payload,
+    "wechat": build_wechat_payload,
+    "feishu": build_feishu_payload,
+    "custom": build_custom_payload,
+}
+
+_SCHEMA = """
+create table if not exists notice_outbox (
+    id integer primary key autoincrement,
+    url text not null,
+    channel text not null,
+    title text not null,
+    text text not null,
+    state text not null default 'pending',
+    attempts integer not null default 0,
+    next_at real not null,
+    lease_owner text,
+    lease_until real,
+    last_error text,
+    created_at real not null
+);
+create index if not exists idx_notice_outbox_due on notice_outbox (state, url, next_at);
+create table if not exists notice_sends (
+    url text not null,
+    sent_at real not null
+);
+create index if not exists idx_notice_sends on notice_sends (url, sent_at);
+"""
+
+NOTICE_MESSAGES = counter(
+    "notice_messages_total",
+    "通知消息数（queued 入队 / sent 送达 / coalesced 合并进汇总 / retry 重试 / dead 放弃）",
+    ["channel", "result"],
+)
+NOTICE_SECONDS = histogram(
+    "notice_send_duration_seconds", "通知发送请求耗时", ["channel", "outcome"]
+)
+NOTICE_OUTBOX = gauge("notice_outbox_messages", "通知发件箱消息数", ["state"])
+
+
+def channel_of(webhook_url: str) -> str:
+    """根据 webhook 地址判断通知渠道"""
+    if "qyapi.weixin.qq.com" in webhook_url:
+        return "wechat"
+    if "oapi.dingtalk.com" in webhook_url:
+        return "dingtalk"
+    # 兼容企业本地化部署的飞书，如open.feishu.xxxx.com
+    if "open.feishu." in webhook_url:
+        return "feishu"
+    return "custom"
+
+
+def _section(row: sqlite3.Row) -> str:
+    return f"#### {row['title']}\n\n{row['text']}" if row["title"] else row["text"]
+
+
+def _text_size(text: str, in_bytes: bool) -> int:
+    return len(text.encode("utf-8")) if in_bytes else len(text)
+
+
+def _pack(
+    rows: List[sqlite3.Row], capacity: int, max_text: int, in_bytes: bool = False
+) -> List[List[sqlite3.Row]]:
+    """按顺序把消息装入至多 capacity 条汇总，每条不超过 DIGEST_MAX_ITEMS 条、max_text 字符（in_bytes 时为字节）"""
+    groups: List[List[sqlite3.Row]] = []
+    current: List[sqlite3.Row] = []
+    size = 0
+    for row in rows:
+        piece = _text_size(_section(row) + DIGEST_SEPARATOR, in_bytes)
+        if current and (len(current) >= DIGEST_MAX_ITEMS or (max_text and size + piece > max_text)):
+            groups.append(current)
+            current, size = [], 0
+            if len(groups) >= capacity:
+                break
+        current.append(row)
+        size += piece
+    if current and len(groups) < capacity:
+        groups.append(current)
+    return groups
+
+
+def _message(group: List[sqlite3.Row]) -> Tuple[str, str]:
+    if len(group) == 1:
+        return group[0]["title"], group[0]["text"]
+    return f"{len(group)} 条通知汇总", DIGEST_SEPARATOR.join(_section(r) for r in group)
+
+
+class NoticeDispatcher:
+    """通知发件箱与后台发送线程"""
+
+    def __init__(self, db_path: str, timeout: float = 10, max_attempts: int = 6):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.max_attempts = max(1, max_attempts)
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+        self._is_running = False
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    #! 存储
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def enqueue(self, webhook_url: str, title: str, text: str, channel: Optional[str] = None) -> Optional[int]:
+        """消息落库后立即返回，由后台线程发送"""
+        if not webhook_url:
+            logger.info("未提供webhook_url")
+            return None
+        channel = channel or channel_of(webhook_url)
+        if channel not in _PAYLOAD_BUILDERS:
+            logger.info("不支持的通知类型")
+            return None
+        now = time.time()
+        cur = self._conn().execute(
+            "insert into notice_outbox (url, channel, title, text, next_at, created_at) "
+            "values (?, ?, ?, ?, ?, ?)",
+            (webhook_url, channel, title or "", text or "", now, now),
+        )
+        NOTICE_MESSAGES.inc(channel=channel, result="queued")
+        self.start()
+        self._wakeup()
+        return cur.lastrowid
+
+    #! 后台线程
+
+    def start(self) -> None:
+        with self._lock:
+            if self._is_running:
+                return
+            self._is_running = True
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), daemon=True, name="notice-dispatcher"
+            )
+        self._thread.start()
+        ready.wait(5)
+        logger.info(f"通知发送线程已启动 owner={self.owner}")
+
+    def stop(self, timeout: float = 5) -> None:
+        """停止发送；发送中的消息租约到期后由下次启动（或其他进程）继续"""
+        with self._lock:
+            self._is_running = False
+        self._wakeup()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _wakeup(self) -> None:
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._serve(ready))
+        finally:
+            self._loop = self._wake = None
+            loop.close()
+
+    async def _serve(self, ready: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        ready.set()
+        async with httpx.AsyncClient(
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5)),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS
+            ),
+        ) as client:
+            while self._is_running:
+                try:
+                    delay = await self._dispatch(client)
+                except Exception as e:
+                    logger.error(f"通知发送轮询失败: {e}")
+                    delay = POLL_INTERVAL
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    #! 发送
+
+    async def _dispatch(self, client: httpx.AsyncClient) -> float:
+        """处理所有有到期消息的机器人，返回下次轮询前的等待秒数"""
+        conn = self._conn()
+        now = time.time()
+        # 租约过期（发送中进程退出）的消息重新排队
+        conn.execute(
+            "update notice_outbox set state = 'pending', lease_owner = null, lease_until = null "
+            "where state = 'sending' and lease_until < ?",
+            (now,),
+        )
+        conn.execute("delete from notice_sends where sent_at < ?", (now - 3600,))
+        bots = conn.execute(
+            "select url, channel, min(next_at) as due from notice_outbox "
+            "where state = 'pending' group by url, channel"
+        ).fetchall()
+        waits = [POLL_INTERVAL]
+        ready = []
+        for bot in bots:
+            if bot["due"] <= now:
+                ready.append(bot)
+            else:
+                waits.append(bot["due"] - now)
+        if ready:
+            results = await asyncio.gather(
+                *(self._drain(client, b["url"], b["channel"]) for b in ready),
+                return_exceptions=True,
+            )
+            for bot, result in zip(ready, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"通知发送失败 channel={bot['channel']}: {result}")
+                elif result:
+                    waits.append(result)
+        return max(min(waits), 0.05)
+
+    def _capacity(self, conn: sqlite3.Connection, url: str, channel: str, now: float) -> Tuple[Optional[int], float]:
+        """当前可发送条数（None 表示不限）与额度耗尽时的等待秒数"""
+        capacity: Optional[int] = None
+        wait = 0.0
+        for limit, window in RATE_LIMITS.get(channel, ()):
+            row = conn.execute(
+                "select count(*) as n, min(sent_at) as oldest from notice_sends "
+                "where url = ? and sent_at > ?",
+                (url, now - window),
+            ).fetchone()
+            remaining = max(limit - row["n"], 0)
+            capacity = remaining if capacity is None else min(capacity, remaining)
+            if remaining == 0 and row["oldest"] is not None:
+                wait = max(wait, row["oldest"] + window - now)
+        return capacity, wait
+
+    def _claim(self, url: str, channel: str) -> Tuple[List[List[sqlite3.Row]], float]:
+        """按可用额度领取消息并分组，同时登记发送记录占用额度；返回 (分组, 额度耗尽时的等待秒数)"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("begin immediate")
+        try:
+            capacity, wait = self._capacity(conn, url, channel, now)
+            if capacity == 0:
+                conn.execute("commit")
+                return [], wait
+            limit = MAX_BATCH if capacity is None else capacity * DIGEST_MAX_ITEMS
+            rows = conn.execute(
+                "select * from notice_outbox where url = ? and state = 'pending' and next_at <= ? "
+                "order by id limit ?",
+                (url, now, limit),
+            ).fetchall()
+            if capacity is None or len(rows) <= capacity:
+                groups = [[r] for r in rows]
+            else:
+                groups = _pack(
+                    rows, capacity, MAX_TEXT.get(channel, 0), channel in MAX_TEXT_IN_BYTES
+                )
+            ids = [r["id"] for g in groups for r in g]
+            if ids:
+                lease = now + LEASE_SECONDS + self.timeout * len(groups)
+                conn.executemany(
+                    "update notice_outbox set state = 'sending', lease_owner = ?, lease_until = ? "
+                    "where id = ?",
+                    [(self.owner, lease, i) for i in ids],
+                )
+                if RATE_LIMITS.get(channel):
+                    conn.executemany(
+                        "insert into notice_sends (url, sent_at) values (?, ?)",
+                        [(url, now)] * len(groups),
+                    )
+            conn.execute("commit")
+            return groups, 0.0
+        except Exception:
+            conn.execute("rollback")
+            raise
+
+    async def _drain(self, client: httpx.AsyncClient, url: str, channel: str) -> float:
+        groups, wait = self._claim(url, channel)
+        if not groups:
+            return wait
+        if any(len(g) > 1 for g in groups):
+            merged = sum(len(g) for g in groups)
+            logger.info(f"{channel} 通知达到限额，{merged} 条消息合并为 {len(groups)} 条汇总")
+        # 同一机器人按顺序发送
+        for group in groups:
+            await self._send_group(client, url, channel, group)
+        return 0.0
+
+    async def _send_group(self, client: httpx.AsyncClient, url: str, channel: str, group: List[sqlite3.Row]) -> None:
+        title, text = _message(group)
+        payload = _PAYLOAD_BUILDERS[channel](title, text)
+        start = time.perf_counter()
+        error, retryable = await self._post(client, url, channel, payload)
+        NOTICE_SECONDS.observe(
+            time.perf_counter() - start, channel=channel, outcome="ok" if error is None else "error"
+        )
+        ids = [r["id"] for r in group]
+        conn = self._conn()
+        if error is None:
+            conn.executemany(
+                "delete from notice_outbox where id = ? and lease_owner = ?",
+                [(i, self.owner) for i in ids],
+            )
+            NOTICE_MESSAGES.inc(len(group), channel=channel, result="sent")
+            if len(group) > 1:
+                NOTICE_MESSAGES.inc(len(group), channel=channel, result="coalesced")
+            return
+        self._fail(conn, group, channel, error, retryable)
+
+    def _fail(self, conn: sqlite3.Connection, group: List[sqlite3.Row], channel: str, error: str, retryable: bool) -> None:
+        now = time.time()
+        for row in group:
+            attempts = row["attempts"] + 1
+            if not retryable or attempts >= self.max_attempts:
+                conn.execute(
+                    "update notice_outbox set state = 'dead', attempts = ?, last_error = ?, "
+                    "lease_owner = null, lease_until = null where id = ? and lease_owner = ?",
+                    (attempts, error, row["id"], self.owner),
+                )
+                NOTICE_MESSAGES.inc(channel=channel, result="dead")
+                logger.error(f"{channel} 通知 {row['id']} 发送 {attempts} 次后放弃: {error}")
+                continue
+            delay = min(RETRY_BACKOFF * 2 ** (attempts - 1), RETRY_BACKOFF_MAX)
+            conn.execute(
+                "update notice_outbox set state = 'pending', attempts = ?, next_at = ?, last_error = ?, "
+                "lease_owner = null, lease_until = null where id = ? and lease_owner = ?",
+                (attempts, now + delay, error, row["id"], self.owner),
+            )
+            NOTICE_MESSAGES.inc(channel=channel, result="retry")
+            logger.warning(f"{channel} 通知 {row['id']} 发送失败，{delay}秒后重试: {error}")
+
+    async def _post(self, client: httpx.AsyncClient, url: str, channel: str, payload: dict) -> Tuple[Optional[str], bool]:
+        """发送一条消息，返回 (错误信息, 是否可重试)"""
+        try:
+            resp = await client.post(url, json=payload)
+        except httpx.TimeoutException as e:
+            return f"timeout: {e.__class__.__name__}", True
+        except httpx.HTTPError as e:
+            return str(e) or e.__class__.__name__, True
+        if resp.status_code == 429 or resp.status_code >= 500:
+            return f"HTTP {resp.status_code}", True
+        if resp.status_code >= 400:
+            return f"HTTP {resp.status_code}: {resp.text[:200]}", False
+        if channel == "custom":
+            return None, True
+        try:
+            body: Any = resp.json()
+        except ValueError:
+            return None, True
+        if isinstance(body, dict):
+            code = body.get("errcode", body.get("code", body.get("StatusCode", 0)))
+            if code not in (0, None):
+                msg = body.get("errmsg") or body.get("msg") or body.get("StatusMessage") or ""
+                return f"errcode={code} {msg}".strip(), code in RETRYABLE_CODES
+        return None, True
+
+    #! 状态
+
+    def get_info(self) -> dict:
+        rows = self._conn().execute(
+            "select state, count(*) as n, min(created_at) as oldest from notice_outbox group by state"
+        ).fetchall()
+        now = time.time()
+        return {
+            "is_running": self._is_running,
+            **{f"{r['state']}_messages": r["n"] for r in rows},
+            "oldest_pending_age_s": next(
+                (round(now - r["oldest"], 1) for r in rows if r["state"] == "pending"), None
+            ),
+        }
+
+
+def _outbox_samples():
+    try:
+        rows = notice_dispatcher._conn().execute(
+            "select state, count(*) as n from notice_outbox group by state"
+        ).fetchall()
+    except Exception:
+        return []
+    return [({"state": r["state"]}, r["n"]) for r in rows]
+
+
+def _build_dispatcher() -> NoticeDispatcher:
+    from core.common.app_settings import settings
+
+    return NoticeDispatcher(
+        db_path=settings.queue_db,
+        timeout=settings.notice_timeout,
+        max_attempts=settings.notice_max_attempts,
+    )
+
+
+notice_dispatcher = _build_dispatcher()
+NOTICE_OUTBOX.set_function(_outbox_samples)
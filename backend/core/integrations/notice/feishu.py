@@ -1,19 +1,12 @@
-import requests
-import json
-from core.common.log import logger
-
-
-def send_feishu_message(webhook_url, title, text):
+def build_feishu_payload(title, text):
     """
-    发送飞书 Markdown 格式消息
+    飞书 Markdown 卡片消息体
 
     参数:
-    - webhook_url: 飞书机器人 Webhook 地址
     - title: 消息标题
     - text: Markdown 格式内容
     """
-    headers = {"Content-Type": "application/json"}
-    data = {
+    return {
         "msg_type": "interactive",
         "card": {
             "config": {"wide_screen_mode": True, "enable_forward": True},
@@ -24,10 +17,17 @@ def send_feishu_message(webhook_url, title, text):
             },
         },
     }
-    try:
-        response = requests.post(
-            url=webhook_url, headers=headers, data=json.dumps(data)
-        )
-        logger.info(response.text)
-    except Exception as e:
-        logger.error(f"飞书通知发送失败: {e}")
+
+
+def send_feishu_message(webhook_url, title, text):
+    """
+    发送飞书 Markdown 格式消息（写入通知发件箱，后台异步发送）
+
+    参数:
+    - webhook_url: 飞书机器人 Webhook 地址
+    - title: 消息标题
+    - text: Markdown 格式内容
+    """
+    from core.integrations.notice.dispatcher import notice_dispatcher
+
+    return notice_dispatcher.enqueue(webhook_url, title, text, channel="feishu")
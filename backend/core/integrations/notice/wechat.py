@@ -1,25 +1,25 @@
-import requests
-import json
-from core.common.log import logger
+def build_wechat_payload(title, text):
+    """
+    企业微信机器人 Markdown 消息体
+
+    参数:
+    - title: 消息标题（企业微信 markdown 消息无标题字段）
+    - text: 消息内容
+    """
+    # 企业微信 markdown 内容上限 4096 字节（UTF-8），按字节截取且不截断多字节字符
+    text = text.encode("utf-8")[:4096].decode("utf-8", "ignore")
+    return {"msgtype": "markdown", "markdown": {"content": f"{text}"}}
 
 
 def send_wechat_message(webhook_url, title, text):
     """
-    发送微信消息
+    发送微信消息（写入通知发件箱，后台异步发送）
 
     参数:
     - webhook_url: 微信机器人Webhook地址
     - title: 消息标题
     - text: 消息内容
     """
-    # 截取 text 确保字符数不超过 4096 个
-    text = text[:2048]
-    headers = {"Content-Type": "application/json"}
-    data = {"msgtype": "markdown", "markdown": {"content": f"{text}"}}
-    try:
-        response = requests.post(
-            url=webhook_url, headers=headers, data=json.dumps(data)
-        )
-        logger.info(response.text)
-    except Exception as e:
-        logger.error(f"微信通知发送失败: {e}")
+    from core.integrations.notice.dispatcher import notice_dispatcher
+
+    return notice_dispatcher.enqueue(webhook_url, title, text, channel="wechat")
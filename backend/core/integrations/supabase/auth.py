@@ -1,5 +1,5 @@
 import os
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import (
@@ -7,13 +7,15 @@ from fastapi.security import (
     HTTPBearer,
     HTTPAuthorizationCredentials,
 )
-from supabase import create_client, Client
 from pydantic import BaseModel
 
 from core.integrations.supabase.settings import settings
 from core.auth.model import UserCredentials, TokenResponse
 from core.common.log import logger
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 # Supabase 配置
 SUPABASE_URL = settings.url
 SUPABASE_ANON_KEY = settings.anon_key
@@ -31,8 +33,8 @@ class SupabaseAuthManager:
         self.url: str = SUPABASE_URL
         self.anon_key: str = SUPABASE_ANON_KEY
         self.service_key: str = SUPABASE_SERVICE_KEY
-        self.client: Optional[Client] = None
-        self.service_client: Optional[Client] = None
+        self.client: Optional["Client"] = None
+        self.service_client: Optional["Client"] = None
         self._initialized: bool = False
 
     def init(self) -> None:
@@ -43,6 +45,8 @@ class SupabaseAuthManager:
         if self._initialized and self.client is not None:
             return
 
+        from supabase import create_client
+
         try:
             # 匿名客户端（用于用户登录注册）
             self.client = create_client(self.url, self.anon_key)
@@ -58,7 +62,7 @@ class SupabaseAuthManager:
             logger.error(f"Supabase 认证客户端初始化失败: {e}")
             raise
 
-    def get_client(self, use_service: bool = False) -> Client:
+    def get_client(self, use_service: bool = False) -> "Client":
         """获取 Supabase 客户端"""
         if not self._initialized or (
             not self.client and not (use_service and self.service_client)
@@ -171,6 +175,8 @@ class SupabaseAuthManager:
     async def get_user_by_token(self, token: str) -> Optional[Dict[str, Any]]:
         """根据 Supabase Access Token 获取用户信息"""
         try:
+            from supabase import create_client
+
             # 使用独立客户端，避免共享会话在并发请求中串号
             client = create_client(self.url, self.anon_key)
             # 使用 Access Token 设置当前会话并获取用户
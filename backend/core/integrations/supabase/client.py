@@ -1,10 +1,34 @@
+import asyncio
 import os
-from typing import Optional, Dict, List, Union, Any, cast
-from supabase import create_client, Client
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Dict, List, Union, Any, cast
 
 from core.integrations.supabase.settings import settings
 from core.common.log import logger
+from core.common.metrics import histogram
 
+if TYPE_CHECKING:
+    from supabase import Client
+
+
+# PostgREST 支持的计数模式
+COUNT_MODES = ("exact", "planned", "estimated")
+# 数据库函数不存在：PostgREST 未找到函数（PGRST202）/ Postgres undefined_function（42883）
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+QUERY_SECONDS = histogram(
+    "supabase_query_duration_seconds",
+    "Supabase(PostgREST) 请求耗时，rpc 的 table 标签为函数名",
+    ["table", "op", "outcome"],
+)
+
+
+def is_missing_function(error: BaseException) -> bool:
+    """rpc 失败是否因为数据库函数不存在（多为未执行对应迁移）"""
+    if getattr(error, "code", None) in MISSING_FUNCTION_CODES:
+        return True
+    text = str(error)
+    return any(code in text for code in MISSING_FUNCTION_CODES)
 
 
 class SupabaseClient:
@@ -13,7 +37,7 @@ class SupabaseClient:
     def __init__(self):
         self.url = settings.url
         self.key = settings.service_key
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self._initialized = False
 
     def init(self):
@@ -24,6 +48,9 @@ class SupabaseClient:
         if self._initialized:
             return
 
+        # supabase-py 导入较慢，首次使用时再导入
+        from supabase import create_client
+
         try:
             # 使用服务角色密钥以绕过RLS限制
             self.client = create_client(self.url, self.key)
@@ -33,7 +60,7 @@ class SupabaseClient:
             logger.error(f"Supabase客户端初始化失败: {e}")
             raise
 
-    def get_client(self) -> Client:
+    def get_client(self) -> "Client":
         """获取Supabase客户端实例"""
         if not self._initialized or not self.client:
             self.init()
@@ -67,6 +94,76 @@ class SupabaseClient:
             query = query.order(column, desc=desc)
         return query
 
+    def _apply_filters(self, query: Any, filters: Optional[Dict]):
+        """
+        将项目内的过滤字典转换为 PostgREST 查询条件：
+        - {"col": value}                  -> eq
+        - {"col": {"gt": 1, "lt": 9}}     -> 组合比较
+        - {"col": {"is": None}}           -> is null
+        - {"or": "a.eq.1,b.gt.2"}         -> 原生 PostgREST or 表达式
+        - {"or": [{"title": {"like": "%x%"}}, ...]} -> 逐项拼接为 or 表达式
+        """
+        if not filters:
+            return query
+        for key, value in filters.items():
+            if key == "or":
+                expr = self._build_or_expression(value)
+                if expr:
+                    query = query.or_(expr)
+                continue
+            if isinstance(value, dict):
+                for op, val in value.items():
+                    if op == "eq":
+                        query = query.eq(key, val)
+                    elif op == "gt":
+                        query = query.gt(key, val)
+                    elif op == "gte":
+                        query = query.gte(key, val)
+                    elif op == "lt":
+                        query = query.lt(key, val)
+                    elif op == "lte":
+                        query = query.lte(key, val)
+                    elif op == "neq":
+                        query = query.neq(key, val)
+                    elif op == "like":
+                        query = query.like(key, val)
+                    elif op == "ilike":
+                        query = query.ilike(key, val)
+                    elif op == "in":
+                        query = query.in_(key, val)
+                    elif op == "is":
+                        query = query.is_(key, "null" if val is None else val)
+            else:
+                query = query.eq(key, value)
+        return query
+
+    def _build_or_expression(self, value: Any) -> str:
+        """兼容字符串与条件列表两种 or 写法。"""
+        if isinstance(value, str):
+            return value.strip()
+        parts: List[str] = []
+        for item in value or []:
+            if not isinstance(item, dict):
+                continue
+            for column, cond in item.items():
+                if isinstance(cond, dict):
+                    for op, val in cond.items():
+                        parts.append(f"{column}.{op}.{'null' if val is None else val}")
+                else:
+                    parts.append(f"{column}.eq.{cond}")
+        return ",".join(parts)
+
+    def _execute(self, query: Any, table: str, op: str):
+        """执行查询并记录耗时（按表与操作类型）"""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = query.execute()
+            outcome = "ok"
+            return response
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - start, table=table, op=op, outcome=outcome)
+
     #! 以下为基础CRUD操作
     async def select(
         self,
@@ -78,32 +175,22 @@ class SupabaseClient:
         offset: Optional[int] = None,
     ):
         """查询数据"""
+        return self._select_sync(table, filters, columns, order, limit, offset)
+
+    def _select_sync(
+        self,
+        table: str,
+        filters: Optional[Dict] = None,
+        columns: str = "*",
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         try:
             query = self.from_table(table).select(columns)
 
             # 添加过滤条件
-            if filters:
-                for key, value in filters.items():
-                    if isinstance(value, dict):
-                        for op, val in value.items():
-                            if op == "gt":
-                                query = query.gt(key, val)
-                            elif op == "gte":
-                                query = query.gte(key, val)
-                            elif op == "lt":
-                                query = query.lt(key, val)
-                            elif op == "lte":
-                                query = query.lte(key, val)
-                            elif op == "neq":
-                                query = query.neq(key, val)
-                            elif op == "like":
-                                query = query.like(key, val)
-                            elif op == "ilike":
-                                query = query.ilike(key, val)
-                            elif op == "in":
-                                query = query.in_(key, val)
-                    else:
-                        query = query.eq(key, value)
+            query = self._apply_filters(query, filters)
 
             # 添加排序
             if order:
@@ -115,42 +202,85 @@ class SupabaseClient:
             if offset:
                 query = query.offset(offset)
 
-            response = query.execute()
+            response = self._execute(query, table, "select")
             return response.data if response.data else []
 
         except Exception as e:
             logger.error(f"查询表 {table} 失败: {e}")
             raise
 
-    async def count(self, table: str, filters: Optional[Dict] = None):
-        """统计记录数量"""
+    async def stream(
+        self,
+        table: str,
+        filters: Optional[Dict] = None,
+        columns: str = "*",
+        page_size: int = 500,
+        key: str = "id",
+        prefetch: bool = False,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """按 key 升序 keyset 分页逐行遍历大结果集，内存占用不超过 1~2 页。
+
+        用法：async for row in supabase_client.stream("articles", columns="id,title"):
+        - key 必须唯一且可比较（默认主键 id），会自动补进 columns
+        - 每页查询在线程池执行，不阻塞事件循环
+        - prefetch=True 时在消费当前页的同时并发拉取下一页
+        - filters 中若已对 key 设置 gt 条件，会被游标条件覆盖
+        """
+        if columns != "*" and key not in [c.strip() for c in columns.split(",")]:
+            columns = f"{key},{columns}"
+        order = f"{key}.asc"
+
+        def fetch(after: Any) -> List[Dict[str, Any]]:
+            page_filters = dict(filters or {})
+            if after is not None:
+                cond = page_filters.get(key)
+                cond = dict(cond) if isinstance(cond, dict) else {}
+                cond["gt"] = after
+                page_filters[key] = cond
+            return self._select_sync(
+                table, page_filters or None, columns, order, page_size
+            )
+
+        pending: Optional[asyncio.Task] = None
+        rows = await asyncio.to_thread(fetch, None)
         try:
-            query = self.from_table(table).select("*", count=cast(Any, "exact"))
-            if filters:
-                for key, value in filters.items():
-                    if isinstance(value, dict):
-                        # 支持复杂查询条件，如{"gt": 10}
-                        for op, val in value.items():
-                            if op == "gt":
-                                query = query.gt(key, val)
-                            elif op == "gte":
-                                query = query.gte(key, val)
-                            elif op == "lt":
-                                query = query.lt(key, val)
-                            elif op == "lte":
-                                query = query.lte(key, val)
-                            elif op == "neq":
-                                query = query.neq(key, val)
-                            elif op == "like":
-                                query = query.like(key, val)
-                            elif op == "ilike":
-                                query = query.ilike(key, val)
-                            elif op == "in":
-                                query = query.in_(key, val)
-                    else:
-                        query = query.eq(key, value)
+            while rows:
+                last = rows[-1].get(key)
+                has_more = len(rows) >= page_size and last is not None
+                if has_more and prefetch:
+                    pending = asyncio.ensure_future(asyncio.to_thread(fetch, last))
+                for row in rows:
+                    yield row
+                if not has_more:
+                    return
+                if pending is not None:
+                    rows, pending = await pending, None
+                else:
+                    rows = await asyncio.to_thread(fetch, last)
+        finally:
+            if pending is not None:
+                pending.cancel()
 
-            response = query.execute()
+    async def count(
+        self, table: str, filters: Optional[Dict] = None, mode: str = "exact"
+    ):
+        """统计记录数量
+
+        mode 对应 PostgREST 的 Prefer: count=...：
+        - exact: count(*)，结果准确但大表需全表扫描
+        - planned: 取执行计划的行数估算，几乎零成本
+        - estimated: 小结果集用 exact，超过 max-rows 时退化为 planned
+        """
+        if mode not in COUNT_MODES:
+            raise ValueError(f"不支持的计数模式: {mode}")
+        try:
+            # head=True 只取 Content-Range，不回传行数据
+            query = self.from_table(table).select(
+                "*", count=cast(Any, mode), head=True
+            )
+            query = self._apply_filters(query, filters)
+
+            response = self._execute(query, table, "count")
             data = response.data or []
             return response.count if hasattr(response, "count") else len(data)
 
@@ -158,10 +288,19 @@ class SupabaseClient:
             logger.error(f"统计表 {table} 记录数量失败: {e}")
             return 0
 
+    async def rpc(self, fn: str, params: Optional[Dict] = None):
+        """调用数据库函数（PostgREST /rpc）"""
+        try:
+            response = self._execute(self.get_client().rpc(fn, params or {}), fn, "rpc")
+            return response.data
+        except Exception as e:
+            logger.error(f"调用函数 {fn} 失败: {e}")
+            raise
+
     async def insert(self, table: str, data: Dict):
         """插入数据"""
         try:
-            response = self.from_table(table).insert(data).execute()
+            response = self._execute(self.from_table(table).insert(data), table, "insert")
             return response.data[0] if response.data else {}
         except Exception as e:
             logger.error(f"插入数据到表 {table} 失败: {e}")
@@ -176,7 +315,7 @@ class SupabaseClient:
             for key, value in filters.items():
                 query = query.eq(key, value)
 
-            response = query.execute()
+            response = self._execute(query, table, "update")
             return response.data if response.data else []
 
         except Exception as e:
@@ -188,37 +327,31 @@ class SupabaseClient:
         try:
             query = self.from_table(table).delete()
 
-            # 添加过滤条件
-            for key, value in filters.items():
-                if isinstance(value, dict):
-                    # 支持复杂查询条件，如 {"in": [...]} 等
-                    for op, val in value.items():
-                        if op == "gt":
-                            query = query.gt(key, val)
-                        elif op == "gte":
-                            query = query.gte(key, val)
-                        elif op == "lt":
-                            query = query.lt(key, val)
-                        elif op == "lte":
-                            query = query.lte(key, val)
-                        elif op == "neq":
-                            query = query.neq(key, val)
-                        elif op == "like":
-                            query = query.like(key, val)
-                        elif op == "ilike":
-                            query = query.ilike(key, val)
-                        elif op == "in":
-                            query = query.in_(key, val)
-                else:
-                    query = query.eq(key, value)
+            # 添加过滤条件（支持复杂查询条件，如 {"in": [...]} 等）
+            query = self._apply_filters(query, filters)
 
-            response = query.execute()
+            response = self._execute(query, table, "delete")
             return response.data if response.data else []
 
         except Exception as e:
             logger.error(f"删除表 {table} 数据失败: {e}")
             raise
 
+    async def delete_count(self, table: str, filters: Dict) -> int:
+        """删除数据，只返回删除条数（return=minimal，不回传整行）"""
+        try:
+            query = self.from_table(table).delete(
+                count=cast(Any, "exact"), returning=cast(Any, "minimal")
+            )
+            query = self._apply_filters(query, filters)
+
+            response = self._execute(query, table, "delete")
+            return int(response.count or 0)
+
+        except Exception as e:
+            logger.error(f"删除表 {table} 数据失败: {e}")
+            raise
+
     async def upsert(
         self,
         table: str,
@@ -235,7 +368,7 @@ class SupabaseClient:
             else:
                 query = self.from_table(table).upsert(data)
 
-            response = query.execute()
+            response = self._execute(query, table, "upsert")
             rows = response.data or []
             return rows
 
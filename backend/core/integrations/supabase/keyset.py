@@ -0,0 +1,97 @@
+"""Keyset（游标）查询辅助。
+
+用 (排序列, 主键) 组合构造 PostgREST 的 or 表达式，配合复合索引实现
+"紧邻上一条/下一条" 与深翻页，避免 offset 扫描与全量拉取。
+"""
+
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+
+def quote_value(value: Any) -> str:
+    """按 PostgREST 语法转义过滤值（文本值加双引号，避免逗号/括号截断表达式）。"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_condition(
+    sort_column: str,
+    tie_column: str,
+    sort_value: Any,
+    tie_value: Any,
+    direction: str = "desc",
+) -> str:
+    """构造 "位于 (sort_value, tie_value) 之后" 的 or 表达式。
+
+    - direction="desc": (sort, tie) < (sort_value, tie_value)
+    - direction="asc":  (sort, tie) > (sort_value, tie_value)
+    """
+    op = "lt" if str(direction).lower() == "desc" else "gt"
+    sv = quote_value(sort_value)
+    tv = quote_value(tie_value)
+    return (
+        f"{sort_column}.{op}.{sv},"
+        f"and({sort_column}.eq.{sv},{tie_column}.{op}.{tv})"
+    )
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解析（被篡改或来自不同的排序方式）。"""
+
+
+def encode_cursor(sort_value: Any, tie_value: Any) -> str:
+    """将 (排序值, 主键) 编码为不透明游标。"""
+    raw = json.dumps([sort_value, tie_value], ensure_ascii=False, default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    """解析 encode_cursor 生成的游标。"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError("cursor shape")
+        if value[0] is None or value[1] is None:
+            raise ValueError("cursor value")
+        return value[0], value[1]
+    except Exception as e:
+        raise InvalidCursorError(f"无效的分页游标: {cursor}") from e
+
+
+def apply_cursor(
+    filters: Optional[Dict[str, Any]],
+    cursor: Optional[str],
+    sort_column: str,
+    tie_column: str,
+    direction: str = "desc",
+) -> Optional[Dict[str, Any]]:
+    """在过滤条件上追加游标条件；cursor 为空时原样返回。"""
+    if not cursor:
+        return filters
+    sort_value, tie_value = decode_cursor(cursor)
+    merged = dict(filters or {})
+    merged["or"] = keyset_condition(
+        sort_column, tie_column, sort_value, tie_value, direction
+    )
+    return merged
+
+
+def next_cursor(
+    rows: List[Dict[str, Any]],
+    limit: Optional[int],
+    sort_column: str,
+    tie_column: str,
+) -> Optional[str]:
+    """根据本页最后一行生成下一页游标；不足一页说明已到末尾。"""
+    if not rows or not limit or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.get(sort_column) is None or last.get(tie_column) is None:
+        return None
+    return encode_cursor(last[sort_column], last[tie_column])
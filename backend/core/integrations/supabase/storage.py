@@ -1,9 +1,21 @@
 import json
+import time
 import uuid
 import httpx
 
 from core.integrations.supabase.settings import settings
 from core.common.log import logger
+from core.common.metrics import BYTES_BUCKETS, histogram
+
+# Storage 批量删除接口单次请求的对象数上限
+DELETE_BATCH = 1000
+
+STORAGE_SECONDS = histogram(
+    "storage_request_duration_seconds", "Supabase Storage 请求耗时", ["bucket", "op", "outcome"]
+)
+STORAGE_UPLOAD_BYTES = histogram(
+    "storage_upload_bytes", "Supabase Storage 单次上传字节数", ["bucket"], buckets=BYTES_BUCKETS
+)
 
 
 class SupabaseStorage:
@@ -20,7 +32,13 @@ class SupabaseStorage:
         self.bucket = bucket_conf.name
         self.path = bucket_conf.path
         self.expires = bucket_conf.expires
-        self._client = httpx.AsyncClient(timeout=30.0)
+        # 首次请求时创建，导入模块不建立连接池
+        self._client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
 
     def valid(self) -> bool:
         return bool(self.url and self.key and self.bucket)
@@ -31,6 +49,19 @@ class SupabaseStorage:
             h["Content-Type"] = content_type
         return h
 
+    async def _request(self, op: str, method: str, url: str, **kwargs) -> httpx.Response:
+        """发请求并记录耗时，outcome 取 HTTP 状态码或 error"""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            resp = await self._http().request(method, url, **kwargs)
+            outcome = str(resp.status_code)
+            return resp
+        finally:
+            STORAGE_SECONDS.observe(
+                time.perf_counter() - start, bucket=self.bucket, op=op, outcome=outcome
+            )
+
     async def upload_bytes(
         self,
         path: str,
@@ -38,7 +69,10 @@ class SupabaseStorage:
         content_type: str = "application/octet-stream",
     ) -> str:
         url = f"{self.url}/storage/v1/object/{self.bucket}/{path}"
-        resp = await self._client.post(
+        STORAGE_UPLOAD_BYTES.observe(len(data or b""), bucket=self.bucket)
+        resp = await self._request(
+            "upload",
+            "POST",
             url,
             headers=self._headers(content_type),
             content=data,
@@ -69,7 +103,9 @@ class SupabaseStorage:
         ex = expires or self.expires
         url = f"{self.url}/storage/v1/object/sign/{self.bucket}/{path}"
         body = {"expiresIn": ex}
-        resp = await self._client.post(
+        resp = await self._request(
+            "sign",
+            "POST",
             url,
             headers=self._headers("application/json"),
             json=body,
@@ -95,7 +131,7 @@ class SupabaseStorage:
         if not path:
             return False
         url = f"{self.url}/storage/v1/object/{self.bucket}/{path}"
-        resp = await self._client.head(url, headers=self._headers())
+        resp = await self._request("exists", "HEAD", url, headers=self._headers())
         if resp.status_code == 200:
             return True
         if resp.status_code in (404, 400):
@@ -108,7 +144,7 @@ class SupabaseStorage:
         if not path:
             return True
         url = f"{self.url}/storage/v1/object/{self.bucket}/{path}"
-        resp = await self._client.delete(url, headers=self._headers())
+        resp = await self._request("delete", "DELETE", url, headers=self._headers())
         if resp.status_code in (200, 204, 404):
             return True
         # 自部署 Supabase 可能返回 400 + not found，按已删除处理
@@ -121,6 +157,44 @@ class SupabaseStorage:
         )
         return False
 
+    async def delete_objects(
+        self, paths: list[str], bucket: str | None = None
+    ) -> tuple[list[str], list[str]]:
+        """批量删除对象（每次请求最多 DELETE_BATCH 个），返回 (已删除, 失败) 路径。
+
+        不存在的对象不会出现在响应里，同样按已删除处理。
+        """
+        bucket = bucket or self.bucket
+        url = f"{self.url}/storage/v1/object/{bucket}"
+        deleted: list[str] = []
+        failed: list[str] = []
+        unique = list(dict.fromkeys(p for p in paths if p))
+        for start in range(0, len(unique), DELETE_BATCH):
+            chunk = unique[start : start + DELETE_BATCH]
+            try:
+                resp = await self._request(
+                    "delete_batch",
+                    "DELETE",
+                    url,
+                    headers=self._headers("application/json"),
+                    content=json.dumps({"prefixes": chunk}),
+                )
+            except Exception as e:
+                logger.warning(
+                    f"[supabase-storage] batch delete error bucket={bucket} count={len(chunk)}: {e}"
+                )
+                failed.extend(chunk)
+                continue
+            if resp.status_code in (200, 204):
+                deleted.extend(chunk)
+                continue
+            logger.warning(
+                f"[supabase-storage] batch delete failed bucket={bucket} count={len(chunk)} "
+                f"status={resp.status_code} body={(resp.text or '')[:300]}"
+            )
+            failed.extend(chunk)
+        return deleted, failed
+
     async def upload_qr(self, data: bytes) -> dict[str, str]:
         path = self.path
         if "{uuid}" in path:
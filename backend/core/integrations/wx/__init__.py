@@ -1,3 +1,5 @@
+import requests
+
 from core.integrations.wx.base import WxGather
 from core.integrations.wx.modes.api import MpsApi
 from core.integrations.wx.modes.app import MpsAppMsg
@@ -20,18 +22,18 @@ def search_Biz(kw: str = "", limit: int = 10, offset: int = 0):
     return WxGather().search_Biz(kw, limit=limit, offset=offset)
 
 
-def create_gather(mode: str | None = None, is_add: bool = False):
-    """根据配置或显式 mode 创建采集器实例。"""
+def create_gather(mode: str | None = None, is_add: bool = False, session: requests.Session | None = None):
+    """根据配置或显式 mode 创建采集器实例；session 为采集编排层注入的共用 HTTP 会话。"""
     selected_mode = str(mode or runtime_settings.get_sync("gather.model", "app")).strip().lower()
     if selected_mode == "api":
-        return MpsApi(is_add=is_add)
+        return MpsApi(is_add=is_add, session=session)
     if selected_mode == "web":
-        return MpsWeb(is_add=is_add)
+        return MpsWeb(is_add=is_add, session=session)
     if selected_mode == "app":
-        return MpsAppMsg(is_add=is_add)
+        return MpsAppMsg(is_add=is_add, session=session)
 
     logger.warning(f"未知采集模式: {selected_mode}, 回退到 app")
-    return MpsAppMsg(is_add=is_add)
+    return MpsAppMsg(is_add=is_add, session=session)
 
 if __name__ == "__main__":
     pass
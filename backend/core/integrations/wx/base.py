@@ -1,21 +1,18 @@
 import requests
-import json
 import re
 import os
+from core.common.app_settings import settings
 from core.common.log import logger
+from core.common.metrics import counter, histogram
+from core.integrations.wx.context import FALLBACK_USER_AGENTS, session_context
+from core.integrations.wx.transport import wx_transport
 import random
+import time
 
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
 
-_FALLBACK_USER_AGENTS = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_4) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Mobile/15E148 Safari/604.1",
-]
-
-
 @dataclass
 class WxGatherHooks:
     """WxGather 的副作用钩子（由编排层注入）。
@@ -32,15 +29,31 @@ class WxGatherHooks:
     on_error: Optional[Callable[[str, Optional[str], dict], None]] = None
 
 
+WX_REQUESTS = counter(
+    "wx_requests_total",
+    "公众号平台接口请求次数，ret 为 base_resp.ret（请求失败记为 error）",
+    ["endpoint", "ret"],
+)
+WX_REQUEST_SECONDS = histogram(
+    "wx_request_duration_seconds", "公众号平台接口请求耗时", ["endpoint"]
+)
+
+
 # 定义基类
 class WxGather:
 
-    def __init__(self, is_add: bool = False, hooks: WxGatherHooks | None = None):
+    def __init__(
+        self,
+        is_add: bool = False,
+        hooks: WxGatherHooks | None = None,
+        session: requests.Session | None = None,
+    ):
         self.articles: list = []
         self.aids: set[str] = set()
         self.is_add = is_add
 
-        self.session = requests.Session()
+        # HTTP 会话由采集编排层注入；未注入时使用进程内共用的连接池
+        self.session = session if session is not None else wx_transport.session
         # requests 不支持给 Session 设置默认 timeout；统一在请求处显式传 timeout
         self._timeout = (5, 10)
 
@@ -57,23 +70,6 @@ class WxGather:
 
         self.ensure_http_context()
 
-    def _load_persisted_token(self) -> str:
-        """best-effort: 从持久化会话读取 token。"""
-        try:
-            from driver.session.store import Store
-
-            sess = Store.load_session()
-            if isinstance(sess, dict):
-                token = sess.get("token")
-                logger.info(
-                    f"[wx-token-debug] persisted_token_exists={bool(token)} updated_at={sess.get('updated_at')}"
-                )
-                if token:
-                    return str(token)
-        except Exception:
-            pass
-        return ""
-
     def all_count(self):
         if getattr(self, "articles", None) is not None:
             return len(self.articles)
@@ -102,6 +98,7 @@ class WxGather:
             rows = article_repo.sync_get_articles(
                 filters={"id": {"in": ids}},
                 limit=len(ids),
+                projection="id",
             )
             return {str((row or {}).get("id")) for row in (rows or []) if (row or {}).get("id")}
         except Exception as e:
@@ -123,11 +120,11 @@ class WxGather:
 
         h = (headers or {}).copy()
         h.setdefault("Cookie", cookies)
-        h.setdefault("User-Agent", getattr(self, "user_agent", "") or random.choice(_FALLBACK_USER_AGENTS))
+        h.setdefault("User-Agent", getattr(self, "user_agent", "") or random.choice(FALLBACK_USER_AGENTS))
 
         try:
             # 访问后台首页，让服务端完成跳转并尽量在 URL 中暴露 token
-            url = "https://mp.weixin.qq.com/cgi-bin/home?t=home/index&lang=zh_CN"
+            url = f"{settings.wx_mp_base}/cgi-bin/home?t=home/index&lang=zh_CN"
             r = self.session.get(
                 url, headers=h, allow_redirects=True, timeout=self._timeout
             )
@@ -164,11 +161,11 @@ class WxGather:
         return ""
 
     def ensure_http_context(self, force_refresh: bool = False) -> None:
-        """确保 HTTP 请求上下文已初始化（Cookie + UA + base headers）。
+        """确保 HTTP 请求上下文已初始化（Cookie + UA + base headers + 已知 token）。
 
         说明：
-        - Cookie 来源：driver.wx.service.get_cookie_header()（唯一出口）。
-        - UA 来源：driver.browser.playwright.get_realistic_user_agent()（公开接口）。
+        - 上下文来自进程级缓存 session_context（Cookie 唯一出口仍为 driver.wx.service.get_cookie_header()）。
+        - force_refresh 时按会话签名重新校验缓存：会话未变化时不读文件、不发请求。
         - 不在此处派生 mp token。
         """
         if (not force_refresh) and getattr(self, "headers", None) and getattr(self, "cookies", None) and getattr(self, "user_agent", None):
@@ -176,39 +173,14 @@ class WxGather:
 
         self.Gather_Content = os.getenv("GATHER_CONTENT", "false").lower() in ("1", "true", "yes")
 
-        # 1) Cookie header（唯一出口）
-        cookies = ""
-        try:
-            from driver.wx.service import get_cookie_header
-
-            env = get_cookie_header()
-            if isinstance(env, dict) and env.get("ok"):
-                s = env.get("data")
-                cookies = str(s) if s else ""
-        except Exception:
-            cookies = ""
-
-        # 2) User-Agent（公开接口）
-        ua = ""
-        try:
-            from driver.browser.playwright import get_realistic_user_agent
-
-            ua = str(get_realistic_user_agent(mobile_mode=False) or "")
-        except Exception:
-            ua = ""
-        if not ua:
-            ua = random.choice(_FALLBACK_USER_AGENTS) if _FALLBACK_USER_AGENTS else "Mozilla/5.0"
-
-        self.cookies = cookies
-        self.user_agent = ua
-        self.headers = {
-            "Cookie": self.cookies,
-            "User-Agent": self.user_agent,
-        }
-
-        # token 优先读内存/持久化会话，缺失时按需推导
-        if not hasattr(self, "token"):
-            self.token = ""
+        ctx = session_context.get()
+        self._context_generation = ctx.generation
+        wx_transport.sync_cookies(ctx.generation)
+        self.cookies = ctx.cookies
+        self.user_agent = ctx.user_agent
+        self.headers = ctx.headers
+        # token 优先取缓存（持久化会话或此前推导的结果），缺失时按需推导
+        self.token = ctx.token
 
     def ensure_mp_token(self) -> str:
         """确保 mp token 可用（仅在需要 token 的接口里调用）。"""
@@ -216,14 +188,11 @@ class WxGather:
         if token:
             logger.info("[wx-token-debug] token_source=memory")
             return token
-        token = self._load_persisted_token()
-        if token:
-            self.token = token
-            logger.info("[wx-token-debug] token_source=persisted")
-            return token
         self.ensure_http_context()
         token = self._derive_mp_token_from_cookies(self.cookies, headers=self.headers)
         self.token = token
+        # 推导结果写回进程级缓存，其他采集器不再重复请求 cgi-bin/home
+        session_context.set_token(token, getattr(self, "_context_generation", 0))
         logger.info(f"[wx-token-debug] token_source=derived success={bool(token)}")
         return token
 
@@ -257,6 +226,24 @@ class WxGather:
         )
         return headers
 
+    def get_json(self, url: str, endpoint: str, params: dict | None = None) -> dict:
+        """GET 公众号平台 JSON 接口，记录耗时与 ret 码；请求/解析失败抛异常"""
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(
+                url, params=params, headers=self.fix_header(url), timeout=self._timeout
+            )
+            resp.raise_for_status()
+            msg = resp.json()
+        except Exception:
+            WX_REQUESTS.inc(endpoint=endpoint, ret="error")
+            raise
+        finally:
+            WX_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+        ret = (msg.get("base_resp") or {}).get("ret") if isinstance(msg, dict) else None
+        WX_REQUESTS.inc(endpoint=endpoint, ret=str(ret))
+        return msg
+
     def content_extract(self, url):
         text = ""
         session = self.session
@@ -300,7 +287,7 @@ class WxGather:
 
         self.ensure_http_context(force_refresh=True)
 
-        url = "https://mp.weixin.qq.com/cgi-bin/searchbiz"
+        url = f"{settings.wx_mp_base}/cgi-bin/searchbiz"
         params = {
             "action": "search_biz",
             "begin": offset,
@@ -310,22 +297,12 @@ class WxGather:
             "f": "json",
             "ajax": "1",
         }
-        headers = self.fix_header(url)
         token = self.require_mp_token()
         if not token:
             return
         params["token"] = token
-        data = {}
         try:
-            response = self.session.get(
-                url,
-                params=params,
-                headers=headers,
-                timeout=self._timeout,
-            )
-            response.raise_for_status()
-            data = response.text
-            msg = json.loads(data)
+            msg = self.get_json(url, "searchbiz", params)
             if msg["base_resp"]["ret"] == 200013:
                 self.Error("frequencey control, stop at {}".format(str(kw)))
                 return
@@ -386,6 +363,8 @@ class WxGather:
             pass
 
         if code == "Invalid Session":
+            # 会话失效：丢弃进程级上下文，重新登录后由新会话重新加载
+            session_context.invalidate("Invalid Session")
             logger.error(error)
             return
 
@@ -0,0 +1,144 @@
+"""公众号请求上下文（Cookie header、User-Agent、mp token）的进程级缓存。
+
+create_gather 按公众号、按补抓轮次创建采集器，若每次都经 driver.wx.service 读取并解密会话文件、
+重新推导 token，每个公众号都要多一次磁盘读取与 cgi-bin/home 请求。
+上下文在首次使用时加载，之后所有 WxGather 实例共用；以会话存储的签名
+（本进程保存/清理会话的版本号 + 会话文件修改时间）判断失效：
+登录、会话刷新、退出以及 Invalid Session 清理会话后自动重新加载，
+其余情况下校验只需一次 stat，不读文件、不发请求。
+"""
+
+import random
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Optional, Tuple
+
+from core.common.log import logger
+from core.common.metrics import cache_hit, cache_miss
+
+FALLBACK_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 13_4) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.5 Mobile/15E148 Safari/604.1",
+]
+
+
+@dataclass(frozen=True)
+class SessionContext:
+    """一次加载得到的请求上下文；generation 为缓存的加载代数，每次重新加载递增"""
+
+    cookies: str
+    user_agent: str
+    token: str = ""
+    generation: int = 0
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Cookie": self.cookies, "User-Agent": self.user_agent}
+
+
+def _session_signature() -> Tuple[int, int]:
+    try:
+        from driver.session.store import Store
+
+        return Store.signature()
+    except Exception:
+        return 0, 0
+
+
+def _load_cookies() -> str:
+    """Cookie header 唯一出口：driver.wx.service.get_cookie_header()"""
+    try:
+        from driver.wx.service import get_cookie_header
+
+        env = get_cookie_header()
+        if isinstance(env, dict) and env.get("ok"):
+            s = env.get("data")
+            return str(s) if s else ""
+    except Exception:
+        pass
+    return ""
+
+
+def _load_user_agent() -> str:
+    ua = ""
+    try:
+        from driver.browser.playwright import get_realistic_user_agent
+
+        ua = str(get_realistic_user_agent(mobile_mode=False) or "")
+    except Exception:
+        ua = ""
+    return ua or random.choice(FALLBACK_USER_AGENTS)
+
+
+def _load_persisted_token() -> str:
+    """best-effort: 从持久化会话读取 token"""
+    try:
+        from driver.session.store import Store
+
+        sess = Store.load_session()
+        if isinstance(sess, dict):
+            token = sess.get("token")
+            logger.info(
+                f"[wx-token-debug] persisted_token_exists={bool(token)} updated_at={sess.get('updated_at')}"
+            )
+            if token:
+                return str(token)
+    except Exception:
+        pass
+    return ""
+
+
+class SessionContextCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._context: Optional[SessionContext] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._generation = 0
+
+    def get(self) -> SessionContext:
+        """返回当前上下文；会话签名变化（或已失效）时重新加载，并发调用只加载一次"""
+        signature = _session_signature()
+        with self._lock:
+            if self._context is not None and signature == self._signature:
+                cache_hit("wx_session_context")
+                return self._context
+            cache_miss("wx_session_context")
+            cookies = _load_cookies()
+            token = _load_persisted_token() if cookies else ""
+            # UA 在进程内保持不变，与会话一起使用同一浏览器特征
+            user_agent = self._context.user_agent if self._context else _load_user_agent()
+            self._generation += 1
+            self._context = SessionContext(cookies, user_agent, token, self._generation)
+            self._signature = signature
+            logger.info(
+                f"[wx-context] loaded generation={self._generation} "
+                f"has_cookies={bool(cookies)} has_token={bool(token)}"
+            )
+            return self._context
+
+    def set_token(self, token: str, generation: int) -> None:
+        """记录推导出的 token；上下文已重新加载（generation 不同）时丢弃"""
+        with self._lock:
+            if token and self._context is not None and self._context.generation == generation:
+                self._context = replace(self._context, token=token)
+
+    def invalidate(self, reason: str = "") -> None:
+        with self._lock:
+            if self._context is None:
+                return
+            self._context = None
+            self._signature = None
+        logger.info(f"[wx-context] invalidated reason={reason}")
+
+    def get_info(self) -> dict:
+        ctx = self._context
+        return {
+            "generation": self._generation,
+            "loaded": ctx is not None,
+            "has_cookies": bool(ctx and ctx.cookies),
+            "has_token": bool(ctx and ctx.token),
+        }
+
+
+session_context = SessionContextCache()
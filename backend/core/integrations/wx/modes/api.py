@@ -6,6 +6,7 @@ import time
 from typing import Any, Optional
 
 from bs4 import BeautifulSoup
+from core.common.app_settings import settings
 from core.common.log import logger
 from core.integrations.wx.base import WxGather
 
@@ -23,9 +24,9 @@ class MpsApi(WxGather):
     - 可选抓取文章详情页 HTML，并用 BeautifulSoup 提取 #js_content 正文。
     """
 
-    def __init__(self, is_add: bool = False, hooks=None):
+    def __init__(self, is_add: bool = False, hooks=None, session=None):
         # hooks 由编排层注入；不传时由 WxGather 自行尝试加载默认 hooks
-        super().__init__(is_add=is_add, hooks=hooks)
+        super().__init__(is_add=is_add, hooks=hooks, session=session)
 
     def content_extract(self, url: str) -> str:
         """抓取并解析文章正文 HTML。
@@ -123,8 +124,7 @@ class MpsApi(WxGather):
         self.Start(mp_id=Mps_id)
 
         # 2) appmsg 列表接口
-        url = "https://mp.weixin.qq.com/cgi-bin/appmsg"
-        session = self.session
+        url = f"{settings.wx_mp_base}/cgi-bin/appmsg"
 
         # 分页参数
         count = 5  # 每页条数（历史默认）
@@ -148,8 +148,6 @@ class MpsApi(WxGather):
             except Exception:
                 pass
 
-            headers = self.fix_header(url)
-
             params = {
                 "action": "list_ex",
                 "begin": begin,
@@ -164,11 +162,7 @@ class MpsApi(WxGather):
             }
 
             try:
-                resp = session.get(
-                    url, params=params, headers=headers, timeout=self._timeout
-                )
-                resp.raise_for_status()
-                msg = resp.json()
+                msg = self.get_json(url, "appmsg", params)
             except Exception as e:
                 # 请求异常属于硬失败：抛出让上层感知（保持原有“异常可见”策略）
                 logger.error(f"请求失败: {e}")
@@ -9,6 +9,7 @@ from typing import Optional
 import requests
 from bs4 import BeautifulSoup
 
+from core.common.app_settings import settings
 from core.common.log import logger
 from core.integrations.wx.base import WxGather
 
@@ -24,9 +25,9 @@ class MpsAppMsg(WxGather):
     - 父类 WxGather 提供：Start()/fix_header()/session/统一回调与错误处理。
     """
 
-    def __init__(self, is_add: bool = False, hooks=None):
+    def __init__(self, is_add: bool = False, hooks=None, session=None):
         # hooks 由编排层注入；不传时由 WxGather 负责加载默认 hooks
-        super().__init__(is_add=is_add, hooks=hooks)
+        super().__init__(is_add=is_add, hooks=hooks, session=session)
 
     def content_extract(self, url: str) -> str:
         """抓取并解析文章正文 HTML。
@@ -89,8 +90,7 @@ class MpsAppMsg(WxGather):
 
         logger.info(f"APP浏览器模式,是否采集[{Mps_title}]内容：{Gather_Content}")
 
-        url = "https://mp.weixin.qq.com/cgi-bin/appmsgpublish"
-        session = self.session
+        url = f"{settings.wx_mp_base}/cgi-bin/appmsgpublish"
 
         count = 5
         i = int(start_page or 0)
@@ -128,16 +128,7 @@ class MpsAppMsg(WxGather):
                 pass
 
             try:
-                headers = self.fix_header(url)
-
-                resp = session.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=self._timeout,
-                )
-                resp.raise_for_status()
-                msg = resp.json()
+                msg = self.get_json(url, "appmsgpublish", params)
 
                 base_resp = msg.get("base_resp") or {}
                 ret = base_resp.get("ret")
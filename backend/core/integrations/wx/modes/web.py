@@ -8,6 +8,7 @@ import time
 import requests
 from bs4 import BeautifulSoup
 
+from core.common.app_settings import settings
 from core.common.log import logger
 from core.integrations.wx.base import WxGather
 
@@ -24,9 +25,9 @@ class MpsWeb(WxGather):
         - driver.wx.service.fetch_article：统一出口的文章抓取能力。
     """
 
-    def __init__(self, is_add: bool = False, hooks=None):
+    def __init__(self, is_add: bool = False, hooks=None, session=None):
         # hooks 由编排层注入；不传时由 WxGather 负责加载默认 hooks
-        super().__init__(is_add=is_add, hooks=hooks)
+        super().__init__(is_add=is_add, hooks=hooks, session=session)
 
     def content_extract(self, url: str) -> str:
         """通过 wx_service.fetch_article 抓取文章正文 HTML，并做清洗。"""
@@ -108,8 +109,7 @@ class MpsWeb(WxGather):
 
         logger.info(f"Web浏览器模式,是否采集[{Mps_title}]内容：{Gather_Content}")
 
-        url = "https://mp.weixin.qq.com/cgi-bin/appmsgpublish"
-        session = self.session
+        url = f"{settings.wx_mp_base}/cgi-bin/appmsgpublish"
 
         count = 5
         i = int(start_page or 0)
@@ -147,15 +147,7 @@ class MpsWeb(WxGather):
                 pass
 
             try:
-                headers = self.fix_header(url)
-                resp = session.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=self._timeout,
-                )
-                resp.raise_for_status()
-                msg = resp.json()
+                msg = self.get_json(url, "appmsgpublish", params)
 
                 base_resp = msg.get("base_resp") or {}
                 ret = base_resp.get("ret")
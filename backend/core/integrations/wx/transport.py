@@ -0,0 +1,142 @@
+"""公众号平台共用的 HTTP 连接池。
+
+create_gather 按公众号、按补抓轮次创建采集器；各采集器共用同一个 requests.Session，
+到 mp.weixin.qq.com 的 TCP/TLS 连接在公众号之间复用（keep-alive），不再每个采集器重新握手。
+- 每个主机保持最多 WX_HTTP_POOL_SIZE 个空闲连接供复用
+- GET 请求在连接失败或 502/503/504 时按 WX_HTTP_RETRIES 次退避重试
+- gzip/deflate 响应由 requests 自动解压
+- 统计每个主机的请求数与新建连接数，复用率 = 1 - 新建连接数 / 请求数
+
+requests 不支持 HTTP/2；连接复用已消除每个公众号一次的握手开销。
+Session 的 Cookie 罐在会话上下文重新加载（登录、退出、Invalid Session）时清空，
+避免旧登录态响应写入的 Cookie 带到新会话。
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from core.common.app_settings import settings
+from core.common.metrics import counter
+
+WX_HTTP_REQUESTS = counter("wx_http_requests_total", "公众号平台共用连接池发出的请求数", ["host"])
+WX_HTTP_CONNECTIONS = counter("wx_http_connections_total", "公众号平台共用连接池新建的连接数", ["host"])
+
+
+class WxTransport:
+    def __init__(self, pool_size: int, retries: int):
+        self.pool_size = pool_size
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._generation = 0
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._connections: Dict[str, int] = defaultdict(int)
+
+    def _record_request(self, host: str) -> None:
+        with self._lock:
+            self._requests[host] += 1
+        WX_HTTP_REQUESTS.inc(host=host)
+
+    def _record_connection(self, host: str) -> None:
+        with self._lock:
+            self._connections[host] += 1
+        WX_HTTP_CONNECTIONS.inc(host=host)
+
+    def _build(self) -> requests.Session:
+        session = requests.Session()
+        adapter = _CountingAdapter(
+            self,
+            pool_connections=8,
+            pool_maxsize=self.pool_size,
+            max_retries=Retry(
+                total=self.retries,
+                connect=self.retries,
+                read=self.retries,
+                status=self.retries,
+                backoff_factor=0.5,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD"]),
+                raise_on_status=False,
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """首次使用时创建；进程内所有采集器共用"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build()
+        return self._session
+
+    def sync_cookies(self, generation: int) -> None:
+        """会话上下文重新加载后清空 Cookie 罐（按上下文加载代数判断，只清一次）"""
+        if generation == self._generation:
+            return
+        with self._lock:
+            if generation == self._generation:
+                return
+            self._generation = generation
+            if self._session is not None:
+                self._session.cookies.clear()
+
+    def get_info(self) -> dict:
+        with self._lock:
+            hosts = {
+                host: {
+                    "requests": count,
+                    "connections": self._connections.get(host, 0),
+                    "reuse_ratio": round(1 - self._connections.get(host, 0) / count, 3) if count else 0.0,
+                }
+                for host, count in self._requests.items()
+            }
+        total = sum(h["requests"] for h in hosts.values())
+        connections = sum(h["connections"] for h in hosts.values())
+        return {
+            "pool_size": self.pool_size,
+            "requests": total,
+            "connections": connections,
+            "reuse_ratio": round(1 - connections / total, 3) if total else 0.0,
+            "hosts": hosts,
+        }
+
+
+def _counting_pool(base: type, transport: WxTransport) -> type:
+    class CountingPool(base):
+        def _new_conn(self):
+            transport._record_connection(self.host)
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):
+    """在连接池层统计新建连接，在 send 统计请求（重定向的每一跳各计一次）"""
+
+    def __init__(self, transport: WxTransport, **kwargs):
+        self._transport = transport
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._transport),
+            "https": _counting_pool(HTTPSConnectionPool, self._transport),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self._transport._record_request(urlsplit(request.url).hostname or "")
+        return super().send(request, *args, **kwargs)
+
+
+wx_transport = WxTransport(pool_size=settings.wx_http_pool_size, retries=settings.wx_http_retries)
@@ -6,6 +6,7 @@ from core.common.utils.async_tools import run_sync
 class MessageRepository:
 
     MESSAGE_TABLE = "message_tasks"
+    LOG_TABLE = "message_task_logs"
 
     def __init__(self, client: Any):
         self.client = client
@@ -54,6 +55,10 @@ class MessageRepository:
         result = await self.client.delete(self.MESSAGE_TABLE, filters={"id": task_id})
         return bool(result)
 
+    async def create_task_log(self, log_data: Dict):
+        """记录一次任务运行（状态、消息、文章数）"""
+        return await self.client.insert(self.LOG_TABLE, log_data)
+
     #! 同步方法，用于兼容同步代码jobs
 
     def sync_get_message_tasks(
@@ -69,3 +74,7 @@ class MessageRepository:
                 filters=filters, limit=limit, offset=offset, order_by=order_by
             )
         )
+
+    def sync_create_task_log(self, log_data: Dict):
+        """同步记录任务运行日志"""
+        return run_sync(self.create_task_log(log_data))
@@ -4,8 +4,9 @@ import json
 import random
 import uuid
 import threading
-from playwright.sync_api import sync_playwright
+import time
 from core.common.log import logger
+from core.common.metrics import histogram
 
 
 browsers_name = os.getenv("BROWSER_TYPE", "firefox")
@@ -16,6 +17,10 @@ if browsers_path:
 
 LAUNCH_MUTEX = threading.Lock()
 
+FETCH_SECONDS = histogram(
+    "playwright_fetch_duration_seconds", "Playwright 打开页面耗时", ["wait_until", "outcome"]
+)
+
 
 class PlaywrightController:
     """Playwright浏览器控制器类"""
@@ -56,6 +61,9 @@ class PlaywrightController:
         anti_crawler=True,
     ):
         """启动浏览器并返回页面对象"""
+        # Playwright 仅在真正启动浏览器时导入，导入本模块不加载驱动
+        from playwright.sync_api import sync_playwright
+
         try:
             # 固定锁顺序：先进程级，再实例级，避免与 cleanup 竞争
             with LAUNCH_MUTEX:
@@ -315,7 +323,15 @@ class PlaywrightController:
         try:
             if self.page is None:
                 raise Exception("页面未初始化，请先调用 start_browser()")
-            self.page.goto(url, wait_until=wait_until)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                self.page.goto(url, wait_until=wait_until)
+                outcome = "ok"
+            finally:
+                FETCH_SECONDS.observe(
+                    time.perf_counter() - start, wait_until=wait_until, outcome=outcome
+                )
         except Exception as e:
             raise Exception(f"打开URL失败: {str(e)}")
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import itertools
 import json
 import os
 from typing import Any, Dict, List, Optional
@@ -16,6 +17,23 @@ class KeyStore:
     def __init__(self):
         # lic_key 用于本地加密密钥；默认值仅用于开发环境
         self._crypto = FileCrypto(settings.safe_lic_key)
+        # 会话版本号：本进程每次保存/清理会话时递增，供上层缓存判断会话是否变化
+        self._generations = itertools.count(1)
+        self.generation = 0
+
+    def _bump(self) -> None:
+        self.generation = next(self._generations)
+
+    def signature(self) -> tuple[int, int]:
+        """会话签名：(本进程会话版本号, 会话文件修改时间)。
+
+        其他进程（如 Web 进程扫码登录）写入会话时文件修改时间变化；只做一次 stat，不读取文件。
+        """
+        try:
+            mtime = os.stat(self.key_file).st_mtime_ns
+        except OSError:
+            mtime = 0
+        return self.generation, mtime
 
     def _write_json(self, obj: Any) -> None:
         # 将对象序列化为 JSON 字符串，使用 utf-8 编码写入加密文件
@@ -75,7 +93,10 @@ class KeyStore:
             except Exception:
                 pass
 
-        self._write_json({"type": "wx_mp_session", "session": sess})
+        try:
+            self._write_json({"type": "wx_mp_session", "session": sess})
+        finally:
+            self._bump()
 
     def load_session(self) -> Optional[Dict[str, Any]]:
         """加载完整公众号会话"""
@@ -94,6 +115,12 @@ class KeyStore:
 
     def clear_session(self) -> None:
         """清理会话"""
+        try:
+            self._remove_session()
+        finally:
+            self._bump()
+
+    def _remove_session(self) -> None:
         try:
             if os.path.exists(self.key_file):
                 os.remove(self.key_file)
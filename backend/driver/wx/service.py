@@ -195,6 +195,15 @@ class WxService:
 
             # 延迟导入：避免在 wx_service import 阶段引入外部依赖
             def _on_state_change(state: str, qr_signed_url: Optional[str], error: Optional[str], expires_minutes: Optional[int]) -> None:
+                if state == LoginState.SUCCESS.value:
+                    # 登录成功：恢复因会话失效暂停的任务队列
+                    try:
+                        from core.common.utils.task_queue import get_task_queue
+
+                        get_task_queue("collect").resume()
+                        get_task_queue("content").resume()
+                    except Exception:
+                        pass
                 try:
                     from core.integrations.supabase.auth_session_store import (
                         auth_session_store,
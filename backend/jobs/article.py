@@ -1,6 +1,16 @@
 from core.articles import article_repo
 from core.common.app_settings import settings
+from core.common.image_variants import (
+    FORMAT_ORDER,
+    MIME_TYPES,
+    SIZES,
+    Variant,
+    build_srcset,
+    variant_encoder,
+    view_bytes,
+)
 from core.common.log import logger
+from core.common.metrics import BYTES_BUCKETS, counter, histogram
 from core.common.utils.async_tools import run_sync
 from core.integrations.supabase.storage import supabase_storage_articles
 from core.articles.content_format import format_content
@@ -9,6 +19,7 @@ from urllib.parse import urlparse
 import mimetypes
 import re
 import requests
+import time
 import uuid
 
 ARTICLE_COLUMNS = {
@@ -24,6 +35,25 @@ ARTICLE_COLUMNS = {
     "updated_at",
 }
 
+ARTICLE_IMAGES = counter(
+    "article_images_total", "文章图片转存结果", ["result"]
+)
+IMAGE_DOWNLOAD_SECONDS = histogram(
+    "article_image_download_duration_seconds", "文章图片下载耗时", ["outcome"]
+)
+IMAGE_DOWNLOAD_BYTES = histogram(
+    "article_image_download_bytes", "文章图片下载字节数", buckets=BYTES_BUCKETS
+)
+ARTICLE_VIEW_IMAGE_BYTES = histogram(
+    "article_view_image_bytes",
+    "单篇文章阅读一次下载的图片字节数（按 VIEW_WIDTH 估算）",
+    ["kind"],
+    buckets=BYTES_BUCKETS,
+)
+
+# 估算阅读下载量时假定的图片显示宽度（360px 手机屏 2 倍像素）
+VIEW_WIDTH = 720
+
 
 def _extract_object_path_from_storage_url(url: str) -> str:
     value = str(url or "").strip()
@@ -64,6 +94,85 @@ def _format_storage_path(template: str, values: dict[str, str]) -> str:
     return re.sub(r"\{([a-zA-Z0-9_]+)\}", replace, template)
 
 
+def _variant_path(path: str, variant: Variant) -> str:
+    """派生图与原图放在同一目录：a/b/photo.png -> a/b/photo@720w.webp"""
+    directory, sep, name = path.rpartition("/")
+    stem = name.rsplit(".", 1)[0] if "." in name else name
+    return f"{directory}{sep}{stem}@{variant.width}w.{variant.format}"
+
+
+def _upload_variants(path: str, origin_url: str, position: int, data: bytes) -> list[dict]:
+    """生成并上传原图的派生图，返回映射；单个派生图上传失败时跳过"""
+    mappings: list[dict] = []
+    for variant in variant_encoder.generate(data):
+        variant_path = _variant_path(path, variant)
+        try:
+            run_sync(
+                supabase_storage_articles.upload_bytes(
+                    path=variant_path,
+                    data=variant.data,
+                    content_type=variant.content_type,
+                )
+            )
+        except Exception as e:
+            logger.warning(f"文章图片派生图上传失败 path={variant_path}: {e}")
+            continue
+        mappings.append(
+            {
+                "bucket": supabase_storage_articles.bucket,
+                "object_path": variant_path,
+                "public_url": supabase_storage_articles.public_url(variant_path),
+                "origin_url": origin_url,
+                "position": position,
+                "variant": variant.name,
+                "source_path": path,
+                "width": variant.width,
+                "bytes": len(variant.data),
+                "content_type": variant.content_type,
+            }
+        )
+    return mappings
+
+
+def _apply_picture(soup: BeautifulSoup, img, variants: list[dict]) -> None:
+    """用 <picture> 包裹 img，按格式提供 srcset；img 保留原图作为不支持时的回退"""
+    if not variants or (img.parent is not None and img.parent.name == "picture"):
+        return
+    img.wrap(soup.new_tag("picture"))
+    for fmt in FORMAT_ORDER:
+        candidates = [
+            (v["public_url"], int(v["width"]))
+            for v in variants
+            if str(v.get("variant") or "").startswith(f"{fmt}-") and v.get("width")
+        ]
+        if candidates:
+            img.insert_before(
+                soup.new_tag(
+                    "source",
+                    attrs={"type": MIME_TYPES[fmt], "srcset": build_srcset(candidates), "sizes": SIZES},
+                )
+            )
+
+
+def _observe_view_bytes(images: list[tuple[int, list[dict]]]) -> None:
+    """记录阅读一次文章下载的图片字节数：原图 vs 按 srcset 选出的派生图"""
+    sized = [(size, variants) for size, variants in images if size]
+    if not sized:
+        return
+    original = sum(size for size, _ in sized)
+    optimized = sum(
+        view_bytes(
+            size,
+            [(str(v["variant"]).split("-", 1)[0], int(v["width"]), int(v["bytes"])) for v in variants],
+            VIEW_WIDTH,
+        )
+        for size, variants in sized
+    )
+    ARTICLE_VIEW_IMAGE_BYTES.observe(original, kind="original")
+    ARTICLE_VIEW_IMAGE_BYTES.observe(optimized, kind="optimized")
+    logger.info(f"文章图片阅读下载量（{VIEW_WIDTH}px）: 原图 {original} 字节，派生图 {optimized} 字节")
+
+
 def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
     content = str(article.get("content") or "")
     if not content or not supabase_storage_articles.valid():
@@ -81,6 +190,28 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
     stat_reuse_public_url = 0
     stat_reuse_existing_object = 0
     stat_uploaded = 0
+    # 每张图片的 (原图字节数, 派生图映射)，用于估算阅读下载量
+    view_images: list[tuple[int, list[dict]]] = []
+    existing_rows: list[dict] | None = None
+
+    def existing_variants(object_path: str, position: int) -> tuple[int, str, list[dict]]:
+        """复用已有对象时，从映射表取原图的字节数、Content-Type 与之前生成的派生图"""
+        nonlocal existing_rows
+        if existing_rows is None:
+            try:
+                existing_rows = list(article_repo.sync_get_article_images(article_id) or [])
+            except Exception as e:
+                logger.warning(f"读取文章图片映射失败 article_id={article_id}: {e}")
+                existing_rows = []
+        size, ctype = 0, ""
+        variants: list[dict] = []
+        for row in existing_rows:
+            if row.get("object_path") == object_path and not row.get("variant"):
+                size = int(row.get("bytes") or 0)
+                ctype = str(row.get("content_type") or "")
+            elif row.get("source_path") == object_path and row.get("variant"):
+                variants.append({**row, "position": position})
+        return size, ctype, variants
 
     for i, img in enumerate(images, start=1):
         src = (img.get("src") or img.get("data-src") or "").strip()
@@ -92,6 +223,7 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
             if f"/storage/v1/object/public/{supabase_storage_articles.bucket}/" in src:
                 existing_path = _extract_object_path_from_storage_url(src)
                 if existing_path:
+                    size, ctype, variants = existing_variants(existing_path, i)
                     mappings.append(
                         {
                             "bucket": supabase_storage_articles.bucket,
@@ -101,9 +233,14 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
                             ),
                             "origin_url": src,
                             "position": i,
+                            "bytes": size or None,
+                            "content_type": ctype or None,
                         }
                     )
                     stat_reuse_public_url += 1
+                    ARTICLE_IMAGES.inc(result="reused_public")
+                    mappings.extend(variants)
+                    view_images.append((size, variants))
                 continue
 
             filename = _guess_filename(src, "", i)
@@ -118,9 +255,17 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
             )
             # 目标已存在则直接复用，避免重复下载和上传
             exists = run_sync(supabase_storage_articles.exists(path))
+            size, ctype, variants = 0, "", []
             if not exists:
-                resp = requests.get(src, timeout=15)
-                resp.raise_for_status()
+                start = time.perf_counter()
+                try:
+                    resp = requests.get(src, timeout=15)
+                    resp.raise_for_status()
+                except Exception:
+                    IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - start, outcome="error")
+                    raise
+                IMAGE_DOWNLOAD_SECONDS.observe(time.perf_counter() - start, outcome="ok")
+                IMAGE_DOWNLOAD_BYTES.observe(len(resp.content))
                 ctype = (resp.headers.get("Content-Type") or "image/jpeg").split(";")[0]
                 run_sync(
                     supabase_storage_articles.upload_bytes(
@@ -130,12 +275,18 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
                     )
                 )
                 stat_uploaded += 1
+                ARTICLE_IMAGES.inc(result="uploaded")
+                size = len(resp.content)
+                variants = _upload_variants(path, src, i, resp.content)
             else:
                 stat_reuse_existing_object += 1
+                ARTICLE_IMAGES.inc(result="reused_object")
+                size, ctype, variants = existing_variants(path, i)
             public_url = supabase_storage_articles.public_url(path)
             img["src"] = public_url
             if "data-src" in img.attrs:
                 del img.attrs["data-src"]
+            _apply_picture(soup, img, variants)
             mappings.append(
                 {
                     "bucket": supabase_storage_articles.bucket,
@@ -143,9 +294,14 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
                     "public_url": public_url,
                     "origin_url": src,
                     "position": i,
+                    "bytes": size or None,
+                    "content_type": ctype or None,
                 }
             )
+            mappings.extend(variants)
+            view_images.append((size, variants))
         except Exception as e:
+            ARTICLE_IMAGES.inc(result="failed")
             logger.warning(f"文章图片上传失败，保留原链接: {e}")
 
     if stat_total > 0:
@@ -155,6 +311,7 @@ def _upload_article_images(article: dict) -> tuple[dict, list[dict]]:
             f"uploaded={stat_uploaded}"
         )
 
+    _observe_view_bytes(view_images)
     article["content"] = str(soup)
     return article, mappings
 
@@ -0,0 +1,76 @@
+"""命令行批量导出文章/活动到 NDJSON 或 Parquet(zstd) 文件。
+
+边读边写，内存只保留一页（Parquet 为一个 row group），结束时输出吞吐（MB/s）。
+
+用法：
+    python -m jobs.export articles -o articles.ndjson [--mp-id X] [--tag-id T]
+        [--since 2026-01-01] [--until 2026-03-31] [--projection summary]
+    python -m jobs.export events --format parquet -o events.parquet
+"""
+
+import argparse
+import sys
+
+from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+from core.export import (
+    EXPORT_FORMATS,
+    ExportStats,
+    export_articles,
+    export_events,
+    parquet_available,
+)
+
+
+async def export_to_file(
+    kind: str,
+    output: str,
+    fmt: str = "ndjson",
+    projection: str = "full",
+    mp_id: str | None = None,
+    tag_id: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> dict:
+    stats = ExportStats(kind)
+    if kind == "articles":
+        chunks = export_articles(fmt, projection, mp_id, tag_id, since, until, stats=stats)
+    else:
+        chunks = export_events(fmt, mp_id, tag_id, since, until, stats=stats)
+    with open(output, "wb") as f:
+        async for chunk in chunks:
+            f.write(chunk)
+    return stats.summary()
+
+
+def run(kind: str, output: str, **kwargs) -> dict:
+    result = run_sync(export_to_file(kind, output, **kwargs))
+    logger.info(f"导出到 {output}: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=["articles", "events"])
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument(
+        "--projection", choices=["summary", "with_markdown", "full"], default="full"
+    )
+    parser.add_argument("--mp-id")
+    parser.add_argument("--tag-id")
+    parser.add_argument("--since", help="YYYY-MM-DD")
+    parser.add_argument("--until", help="YYYY-MM-DD（含当天）")
+    args = parser.parse_args()
+    if args.format == "parquet" and not parquet_available():
+        sys.exit("Parquet 导出需要安装 pyarrow")
+    run(
+        args.kind,
+        args.output,
+        fmt=args.format,
+        projection=args.projection,
+        mp_id=args.mp_id,
+        tag_id=args.tag_id,
+        since=args.since,
+        until=args.until,
+    )
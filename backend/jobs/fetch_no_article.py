@@ -1,7 +1,9 @@
 from core.integrations.wx import create_gather
+from core.integrations.wx.transport import wx_transport
 from time import sleep
 import random
 
+from core.common.app_settings import settings
 from core.common.log import logger
 from core.common.runtime_settings import runtime_settings
 from driver.wx.service import fetch_article as wx_fetch_article
@@ -11,12 +13,13 @@ from core.common.status import DataStatus as DATA_STATUS
 
 def fetch_articles_without_content():
     """查询content为空的文章, 调用微信内容提取方法获取内容并更新数据库"""
-    ga = create_gather()
+    ga = create_gather(session=wx_transport.session)
     try:
         # 查询content为空的文章
         articles = article_repo.sync_get_articles(
                 filters={"or": [{"content": {"is": None}}, {"content": {"eq": ""}}]},
                 limit=10,
+                projection="summary",
             )
 
         if not articles:
@@ -28,7 +31,7 @@ def fetch_articles_without_content():
             if article.get("url"):
                 url = article.get("url")
             else:
-                url = f"https://mp.weixin.qq.com/s/{article.get('id')}"
+                url = f"{settings.wx_mp_base}/s/{article.get('id')}"
 
             logger.info(f"正在处理文章: {article.get('title')}, URL: {url}")
 
@@ -71,10 +74,10 @@ def fetch_articles_without_content():
 
 
 from core.common.task import TaskScheduler
-from core.common.utils import TaskQueue
+from core.common.utils import get_task_queue
 
 scheduler = TaskScheduler()
-task_queue = TaskQueue
+task_queue = get_task_queue("content")
 
 
 def start_sync_content():
@@ -83,11 +86,10 @@ def start_sync_content():
         return
     interval = runtime_settings.get_int_sync("gather.content_auto_interval", 1)  # 每隔多少分钟
     cron_exp = f"*/{interval} * * * *"
-    task_queue.clear_queue()
     scheduler.clear_all_jobs()
 
     def do_sync():
-        task_queue.add_task(fetch_articles_without_content)
+        task_queue.add_task(fetch_articles_without_content, dedup_key="sync_content")
 
     job_id = scheduler.add_cron_job(do_sync, cron_expr=cron_exp)
     logger.success(f"已添自动同步文章内容任务: {job_id}")
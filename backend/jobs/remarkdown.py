@@ -0,0 +1,51 @@
+"""根据 content 重新生成文章的 content_md（及其检索分词字段）。
+
+默认只处理 content_md 为空的文章；--all 时全量重建（markdown 转换规则调整后使用）。
+流式遍历，内存只保留一页。
+
+用法：
+    python -m jobs.remarkdown [--all] [--page-size 100]
+"""
+
+import argparse
+
+from core.articles import article_repo
+from core.articles.content_format import format_content
+from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+
+
+async def remarkdown(rebuild_all: bool = False, page_size: int = 100) -> dict:
+    filters = None if rebuild_all else {"content_md": {"is": None}}
+    scanned = updated = 0
+    async for row in article_repo.stream_articles(
+        filters=filters, projection="id,content", page_size=page_size, prefetch=True
+    ):
+        scanned += 1
+        content = str(row.get("content") or "").strip()
+        if not content:
+            continue
+        try:
+            await article_repo.update_article(
+                row["id"], {"content_md": format_content(content, "markdown")}
+            )
+            updated += 1
+        except Exception as e:
+            logger.warning(f"重建 content_md 失败 article_id={row['id']}: {e}")
+        if scanned % page_size == 0:
+            logger.info(f"重建 content_md 进度: scanned={scanned} updated={updated}")
+    return {"scanned": scanned, "updated": updated}
+
+
+def run(rebuild_all: bool = False, page_size: int = 100) -> dict:
+    result = run_sync(remarkdown(rebuild_all, page_size))
+    logger.info(f"重建 content_md 完成: {result}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--all", action="store_true")
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    run(args.all, args.page_size)
@@ -0,0 +1,24 @@
+"""为历史文章回填全文检索预分词字段（search_title / search_body）。
+
+用法：
+    python -m jobs.search_backfill --batch-size 200
+"""
+
+import argparse
+
+from core.articles import article_repo
+from core.common.log import logger
+from core.common.utils.async_tools import run_sync
+
+
+def run(batch_size: int = 200) -> int:
+    total = run_sync(article_repo.backfill_search_fields(batch_size=batch_size))
+    logger.info(f"文章检索字段回填完成: {total} 篇")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+    run(args.batch_size)
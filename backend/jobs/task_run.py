@@ -0,0 +1,312 @@
+"""消息任务的单次运行（run）汇总：一次定时/手动运行覆盖的所有公众号采集完成后，只发送一次消息。
+
+- add_job 开始一次运行，各公众号采集任务以 {task, run_id} 订阅者身份把结果记到该运行下
+- 全部公众号上报后（或超过 RUN_TIMEOUT 仍未齐）在 notify 队列发送汇总：
+  所有文章经 message_template 渲染一次；文章过多时按 DIGEST_MAX_ARTICLES 分块，
+  IM 消息渲染结果超过 DIGEST_MAX_CHARS 时继续对半拆分
+- 结果与耗时写入 message_task_logs：Webhook 记实际发送结果（success / failed）；
+  IM 消息写入通知发件箱即返回，记为 queued，实际送达与重试由发件箱负责
+- 分块发送的进度逐块记录，失败重试时只发送剩余的块
+- 运行状态存于任务队列同一个 SQLite 文件，进程重启不丢失
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, is_dataclass
+from typing import Any, List, Optional, Tuple
+
+from core.common.app_settings import settings
+from core.common.log import logger
+from core.common.utils import get_task_queue
+from core.message_tasks.model import MessageTask
+
+# 单条消息最多包含的文章数
+DIGEST_MAX_ARTICLES = 50
+# IM 消息（message_type=0）单条渲染结果的字符上限，超过则拆分
+DIGEST_MAX_CHARS = 15000
+# 部分公众号迟迟未上报（采集任务被放弃等）时，最多等待多久后按已有结果发送（秒）
+RUN_TIMEOUT = 6 * 3600
+# 运行记录保留天数
+RUN_RETENTION_DAYS = 7
+
+_SCHEMA = """
+create table if not exists task_runs (
+    run_id text primary key,
+    task text not null,
+    expected integer,
+    done integer not null default 0,
+    started_at real not null,
+    collected_at real,
+    sent_at real,
+    chunks_sent integer not null default 0
+);
+create table if not exists task_run_feeds (
+    id integer primary key autoincrement,
+    run_id text not null,
+    feed text not null,
+    articles text not null,
+    created_at real not null
+);
+create index if not exists idx_task_run_feeds_run on task_run_feeds (run_id);
+"""
+# 早期版本建表后补充的列
+_ADDED_COLUMNS = {"chunks_sent": "integer not null default 0"}
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if is_dataclass(value):
+        return asdict(value)
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_jsonable)
+
+
+class TaskRunStore:
+    """运行记录（SQLite）"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._schema_ready = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("pragma journal_mode=wal")
+            conn.execute("pragma synchronous=normal")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    cols = {r["name"] for r in conn.execute("pragma table_info(task_runs)")}
+                    for col, ddl in _ADDED_COLUMNS.items():
+                        if col not in cols:
+                            conn.execute(f"alter table task_runs add column {col} {ddl}")
+                    self._schema_ready = True
+        return conn
+
+    def start(self, task: MessageTask) -> str:
+        run_id = uuid.uuid4().hex
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "insert into task_runs (run_id, task, started_at) values (?, ?, ?)",
+            (run_id, _dumps(task), now),
+        )
+        cutoff = now - RUN_RETENTION_DAYS * 86400
+        conn.execute(
+            "delete from task_run_feeds where run_id in (select run_id from task_runs where started_at < ?)",
+            (cutoff,),
+        )
+        conn.execute("delete from task_runs where started_at < ?", (cutoff,))
+        return run_id
+
+    def set_expected(self, run_id: str, expected: int) -> bool:
+        """登记本次运行的公众号数，返回是否已全部上报"""
+        conn = self._conn()
+        conn.execute("update task_runs set expected = ? where run_id = ?", (expected, run_id))
+        return self._complete(conn, run_id)
+
+    def add_result(self, run_id: str, feed: Any, articles: List[Any]) -> bool:
+        """记录一个公众号的采集结果，返回是否已全部上报"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("begin immediate")
+        try:
+            conn.execute(
+                "insert into task_run_feeds (run_id, feed, articles, created_at) values (?, ?, ?, ?)",
+                (run_id, _dumps(feed), _dumps(articles or []), now),
+            )
+            conn.execute(
+                "update task_runs set done = done + 1, collected_at = ? where run_id = ?",
+                (now, run_id),
+            )
+            conn.execute("commit")
+        except Exception:
+            conn.execute("rollback")
+            raise
+        return self._complete(conn, run_id)
+
+    def _complete(self, conn: sqlite3.Connection, run_id: str) -> bool:
+        row = conn.execute(
+            "select expected, done from task_runs where run_id = ?", (run_id,)
+        ).fetchone()
+        return bool(row and row["expected"] is not None and row["done"] >= row["expected"])
+
+    def claim(self, run_id: str) -> Optional[Tuple[sqlite3.Row, List[sqlite3.Row]]]:
+        """占用待发送的运行（同一运行只会被一个发送任务取到），返回 (运行, 各公众号结果)"""
+        conn = self._conn()
+        cur = conn.execute(
+            "update task_runs set sent_at = ? where run_id = ? and sent_at is null",
+            (time.time(), run_id),
+        )
+        if not cur.rowcount:
+            return None
+        run = conn.execute("select * from task_runs where run_id = ?", (run_id,)).fetchone()
+        feeds = conn.execute(
+            "select feed, articles from task_run_feeds where run_id = ? order by id", (run_id,)
+        ).fetchall()
+        return run, feeds
+
+    def mark_sent(self, run_id: str, chunks: int) -> None:
+        """记录已发送的块数，重试时跳过"""
+        self._conn().execute("update task_runs set chunks_sent = ? where run_id = ?", (chunks, run_id))
+
+    def release(self, run_id: str) -> None:
+        """发送失败，交还运行以便重试（已发送的块不再重发）"""
+        self._conn().execute("update task_runs set sent_at = null where run_id = ?", (run_id,))
+
+    def done(self, run_id: str) -> None:
+        self._conn().execute("delete from task_run_feeds where run_id = ?", (run_id,))
+
+
+task_runs = TaskRunStore(settings.queue_db)
+
+
+def _notify_queue():
+    return get_task_queue("notify")
+
+
+def start_run(task: MessageTask) -> str:
+    """开始一次运行，并预约超时兜底发送"""
+    run_id = task_runs.start(task)
+    _notify_queue().add_task(
+        send_run_digest, run_id, dedup_key=f"digest-timeout:{run_id}", delay=RUN_TIMEOUT
+    )
+    return run_id
+
+
+def _send_when_complete(run_id: str) -> None:
+    _notify_queue().add_task(send_run_digest, run_id, dedup_key=f"digest:{run_id}")
+
+
+def finish_submit(run_id: str, expected: int) -> None:
+    """add_job 提交完本次运行的全部公众号后调用"""
+    if task_runs.set_expected(run_id, expected):
+        _send_when_complete(run_id)
+
+
+def record_feed_result(run_id: str, feed: Any, articles: List[Any]) -> None:
+    """采集任务上报一个公众号的结果（无新文章也要上报）"""
+    if task_runs.add_result(run_id, feed, articles):
+        _send_when_complete(run_id)
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _digest_feed(feeds: List[Any]) -> Any:
+    """汇总消息的 feed：单个公众号时原样使用，多个时合成名称"""
+    if len(feeds) == 1:
+        return feeds[0]
+    names = [str(_field(f, "mp_name") or _field(f, "name") or "") for f in feeds]
+    mp_name = "、".join(names[:3]) + (f" 等 {len(names)} 个公众号" if len(names) > 3 else "")
+    return {"id": "", "mp_name": mp_name}
+
+
+def _deliver(task: MessageTask, feed: Any, feeds: List[Any], articles: List[dict]) -> int:
+    """渲染并发送一组文章，返回实际发送的消息条数"""
+    from jobs.webhook import (
+        MESSAGE_TYPE_SEND,
+        MESSAGE_TYPE_WEBHOOK,
+        MessageWebHook,
+        call_webhook,
+        render_message,
+        send_message,
+    )
+
+    hook = MessageWebHook(task=task, feed=feed, articles=articles, feeds=feeds)
+    if task.message_type == MESSAGE_TYPE_WEBHOOK:
+        call_webhook(hook)
+        return 1
+    if task.message_type != MESSAGE_TYPE_SEND:
+        raise ValueError(f"未知的消息类型: {task.message_type}")
+    message = render_message(hook)
+    if len(message) > DIGEST_MAX_CHARS and len(articles) > 1:
+        mid = len(articles) // 2
+        return _deliver(task, feed, feeds, articles[:mid]) + _deliver(task, feed, feeds, articles[mid:])
+    send_message(hook, message)
+    return 1
+
+
+def send_run_digest(run_id: str) -> None:
+    """notify 队列任务：把一次运行的全部结果渲染成一条（或按大小分块的多条）消息"""
+    from core.message_tasks import message_repo
+    from jobs.webhook import MESSAGE_TYPE_SEND, article_to_dict
+
+    claimed = task_runs.claim(run_id)
+    if claimed is None:
+        return
+    run, rows = claimed
+    task = MessageTask.model_validate(json.loads(run["task"]))
+    feeds: List[Any] = []
+    articles: List[Any] = []
+    for row in rows:
+        feed = json.loads(row["feed"])
+        items = json.loads(row["articles"])
+        if not items:
+            continue
+        feeds.append(feed)
+        name = _field(feed, "mp_name")
+        for item in items:
+            article = article_to_dict(item)
+            article.setdefault("mp_name", name)
+            articles.append(article)
+
+    collected_s = (run["collected_at"] or run["sent_at"]) - run["started_at"]
+    status, sent, error = "empty", 0, ""
+    chunks = [articles[i : i + DIGEST_MAX_ARTICLES] for i in range(0, len(articles), DIGEST_MAX_ARTICLES)]
+    skipped = run["chunks_sent"]
+    start = time.perf_counter()
+    # IM 消息只写入通知发件箱，此处只能确认入队
+    queued = task.message_type == MESSAGE_TYPE_SEND
+    if articles:
+        feed = _digest_feed(feeds)
+        try:
+            for index in range(skipped, len(chunks)):
+                sent += _deliver(task, feed, feeds, chunks[index])
+                task_runs.mark_sent(run_id, index + 1)
+            status = "queued" if queued else "success"
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"任务[{task.name}]汇总消息发送失败: {e}")
+    deliver_s = time.perf_counter() - start
+    if status == "failed":
+        task_runs.release(run_id)
+    else:
+        task_runs.done(run_id)
+
+    expected = run["expected"] if run["expected"] is not None else "?"
+    message = (
+        f"公众号 {run['done']}/{expected} 个（有更新 {len(feeds)} 个），文章 {len(articles)} 篇，"
+        f"{'入队' if queued else '发送'} {sent} 条；采集 {collected_s:.1f}s，"
+        f"{'入队' if queued else '发送'} {deliver_s:.1f}s"
+    )
+    if skipped:
+        message += f"；跳过此前已发送的 {skipped}/{len(chunks)} 块"
+    if error:
+        message += f"；错误: {error}"
+    logger.info(f"任务[{task.name}]运行 {run_id} 汇总: {message}")
+    try:
+        message_repo.sync_create_task_log(
+            {"task_id": task.id, "status": status, "message": message, "article_count": len(articles)}
+        )
+    except Exception as e:
+        logger.warning(f"写入消息任务日志失败: {e}")
+    if status == "failed":
+        # 交由 notify 队列按退避策略重试
+        raise RuntimeError(f"汇总消息发送失败: {error}")
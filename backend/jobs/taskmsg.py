@@ -1,5 +1,5 @@
 from typing import Union, Optional, Dict, List
-from core.message_tasks import message_repo
+from core.message_tasks import message_repo, MessageTask
 from core.common.log import logger
 
 
@@ -16,7 +16,7 @@ def get_message_task(job_id: Union[str, list] = None) -> Optional[List[Dict]]:
 
         # 使用Supabase数据库管理器获取消息任务
         message_tasks = message_repo.sync_get_message_tasks(filters=filters)
-        return message_tasks if message_tasks else None
+        return [MessageTask.model_validate(t) for t in message_tasks] if message_tasks else None
     except Exception as e:
         logger.info(f"获取消息任务失败: {e}")
         return None
@@ -1,12 +1,15 @@
 import json
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Iterator
 
 import requests
 
 from core.articles.model import Article
 from core.articles.content_format import format_content
+from core.common.app_settings import settings
 from core.common.lax import TemplateParser
 from core.common.log import logger
 from core.common.runtime_settings import runtime_settings
@@ -20,34 +23,29 @@ MESSAGE_TYPE_WEBHOOK = 1
 
 DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
 
+# Webhook 负载模式：template=按模板渲染字符串，structured=构造对象后直接序列化（大负载流式发送）
+PAYLOAD_MODE_TEMPLATE = "template"
+PAYLOAD_MODE_STRUCTURED = "structured"
 
-def _article_to_dict(article: Article | dict[str, Any]) -> dict[str, Any]:
-    """将 Article 或字典转为模板用字典, publish_time 格式化为可读时间。"""
-    if isinstance(article, dict):
-        out = dict(article)
-    else:
-        out = article.model_dump(mode="json")
-    if out.get("publish_time") is not None:
-        try:
-            out["publish_time"] = datetime.fromtimestamp(int(out["publish_time"])).strftime(DATETIME_FMT)
-        except (TypeError, ValueError, OSError):
-            pass
-    return out
-
+# 正文字段 -> 格式，None 表示使用 webhook.content_format
+CONTENT_FIELDS: dict[str, str | None] = {
+    "content": None,
+    "content_html": "html",
+    "content_text": "text",
+    "content_markdown": "markdown",
+}
+_CONTENT_REF_RE = re.compile(r"\b(content(?:_html|_text|_markdown)?)\b")
+_LOOP_RE = re.compile(r"\{%\s*for\s+(\w+)\s+in\s+articles\s*%\}")
 
-@dataclass
-class MessageWebHook:
-    task: MessageTask
-    feed: Feed
-    articles: list[Article | dict[str, Any]]
+# 结构化模式未配置模板时输出的文章字段（与默认模板一致）
+DEFAULT_ARTICLE_FIELDS = ("id", "mp_id", "title", "pic_url", "url", "description", "publish_time")
 
+# 结构化负载超过该大小时改用 chunked 流式发送
+STREAM_THRESHOLD_BYTES = 256 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
 
-def send_message(hook: MessageWebHook) -> str:
-    """发送格式化消息"""
-    template = (
-        hook.task.message_template
-        if hook.task.message_template
-        else """
+# 未配置 message_template 时的默认模板（编译结果按模板文本缓存）
+DEFAULT_SEND_TEMPLATE = """
 ### {{feed.mp_name}} 订阅消息：
 {% if articles %}
 {% for article in articles %}
@@ -57,28 +55,8 @@ def send_message(hook: MessageWebHook) -> str:
 - 暂无文章\n
 {% endif %}
     """
-    )
-    parser = TemplateParser(template)
-    data = {
-        "feed": hook.feed,
-        "articles": hook.articles,
-        "task": hook.task,
-        "now": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    }
-    message = parser.render(data)
-    # TODO 这里可以添加发送消息的具体实现
 
-    logger.info(f"发送消息: {message}")
-    notice(hook.task.web_hook_url, hook.task.name, message)
-    return message
-
-
-def call_webhook(hook: MessageWebHook) -> str:
-    """调用webhook接口发送数据"""
-    template = (
-        hook.task.message_template
-        if hook.task.message_template
-        else """{
+DEFAULT_WEBHOOK_TEMPLATE = """{
   "feed": {
     "id": "{{ feed.id }}",
     "name": "{{ feed.mp_name }}"
@@ -105,70 +83,196 @@ def call_webhook(hook: MessageWebHook) -> str:
   "now": "{{ now }}"
 }
 """
+
+
+def article_to_dict(article: Article | dict[str, Any]) -> dict[str, Any]:
+    """将 Article 或字典转为模板用字典, publish_time 格式化为可读时间。"""
+    if isinstance(article, dict):
+        out = dict(article)
+    else:
+        out = article.model_dump(mode="json")
+    if out.get("publish_time") is not None:
+        try:
+            out["publish_time"] = datetime.fromtimestamp(int(out["publish_time"])).strftime(DATETIME_FMT)
+        except (TypeError, ValueError, OSError):
+            pass
+    return out
+
+
+@dataclass
+class MessageWebHook:
+    task: MessageTask
+    feed: Feed
+    articles: list[Article | dict[str, Any]]
+    # 汇总消息涉及的全部公众号（单公众号消息为空）
+    feeds: list[Any] = field(default_factory=list)
+
+
+def render_message(hook: MessageWebHook) -> str:
+    """按 message_template 渲染 IM 消息正文"""
+    template = (
+        hook.task.message_template
+        if hook.task.message_template
+        else DEFAULT_SEND_TEMPLATE
     )
+    data = {
+        "feed": hook.feed,
+        "feeds": hook.feeds or [hook.feed],
+        "articles": hook.articles,
+        "task": hook.task,
+        "now": datetime.now().strftime(DATETIME_FMT),
+    }
+    return TemplateParser(template).render(data)
 
-    # 检查template是否需要content
-    template_needs_content = "content" in template.lower()
 
-    # 根据content_format处理内容
-    content_format = runtime_settings.get_sync("webhook.content_format", "html")
-    logger.info(f"Content将以{content_format}格式发送")
-    processed_articles = []
-    for article in hook.articles:
-        if isinstance(article, dict) and "content" in article and article["content"]:
-            processed_article = article.copy()
-            # 只有template需要content时才进行格式转换
-            if template_needs_content:
-                processed_article["content"] = format_content(
-                    processed_article["content"], content_format
-                )
-            processed_articles.append(processed_article)
-        else:
-            processed_articles.append(article)
+def send_message(hook: MessageWebHook, message: str | None = None) -> str:
+    """发送格式化消息（已渲染时直接发送 message）"""
+    if message is None:
+        message = render_message(hook)
+
+    logger.info(f"发送消息: {message}")
+    notice(hook.task.web_hook_url, hook.task.name, message)
+    return message
 
+
+def _referenced_content_formats(template: str, default_format: str) -> dict[str, str]:
+    """模板中引用到的正文字段 -> 对应格式；未引用的格式不计算"""
+    formats: dict[str, str] = {}
+    for name in set(_CONTENT_REF_RE.findall(template.lower())):
+        formats[name] = CONTENT_FIELDS[name] or default_format
+    return formats
+
+
+def _content_values(article: Any, formats: dict[str, str]) -> dict[str, str]:
+    """按需把正文转换为引用到的各格式，同一格式只转换一次"""
+    raw = _field(article, "content")
+    converted: dict[str, str] = {}
+    values: dict[str, str] = {}
+    for name, fmt in formats.items():
+        if fmt not in converted:
+            converted[fmt] = format_content(raw, fmt) if raw else ""
+        values[name] = converted[fmt]
+    return values
+
+
+def _with_content(article: Any, formats: dict[str, str]) -> Any:
+    """模板模式：生成引用到的正文字段并做 JSON 转义，便于嵌入字符串模板"""
+    if not formats or not isinstance(article, dict):
+        return article
+    out = dict(article)
+    for name, value in _content_values(article, formats).items():
+        out[name] = json.dumps(value, ensure_ascii=False)[1:-1]
+    return out
+
+
+def _article_fields(template: str) -> list[str]:
+    """结构化模式输出的文章字段：自定义模板中循环变量引用到的字段，否则为默认字段"""
+    if not template:
+        return list(DEFAULT_ARTICLE_FIELDS)
+    fields: list[str] = []
+    for var in set(_LOOP_RE.findall(template)):
+        for name in re.findall(rf"\b{re.escape(var)}\.(\w+)", template):
+            if name not in fields:
+                fields.append(name)
+    return fields or list(DEFAULT_ARTICLE_FIELDS)
+
+
+def _field(obj: Any, name: str) -> Any:
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+@lru_cache(maxsize=1)
+def _json_encoder() -> Callable[[Any], bytes]:
+    """优先使用 orjson，未安装时回退标准库"""
+    try:
+        import orjson
+
+        return orjson.dumps
+    except ImportError:
+        return lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_webhook_payload(hook: MessageWebHook, content_format: str) -> Iterator[bytes]:
+    """结构化模式：逐篇构造文章对象并序列化，正文只在输出该篇时转换"""
+    dumps = _json_encoder()
+    template = hook.task.message_template or ""
+    fields = _article_fields(template)
+    formats = {
+        name: CONTENT_FIELDS[name] or content_format for name in fields if name in CONTENT_FIELDS
+    }
+
+    yield b'{"feed":' + dumps({"id": _field(hook.feed, "id"), "name": _field(hook.feed, "mp_name")})
+    yield b',"articles":['
+    for i, article in enumerate(hook.articles):
+        content = _content_values(article, formats) if formats else {}
+        item = {name: content[name] if name in content else _field(article, name) for name in fields}
+        yield (b"," if i else b"") + dumps(item)
+    yield b'],"task":' + dumps({"id": hook.task.id, "name": hook.task.name})
+    yield b',"now":' + dumps(datetime.now().strftime(DATETIME_FMT)) + b"}"
+
+
+def _request_body(pieces: Iterator[bytes]) -> bytes | Iterator[bytes]:
+    """小于 STREAM_THRESHOLD_BYTES 时整体发送（带 Content-Length），否则按块流式发送（chunked）"""
+    head: list[bytes] = []
+    size = 0
+    for piece in pieces:
+        head.append(piece)
+        size += len(piece)
+        if size >= STREAM_THRESHOLD_BYTES:
+            break
+    else:
+        return b"".join(head)
+
+    def chunks() -> Iterator[bytes]:
+        buf = bytearray(b"".join(head))
+        for piece in pieces:
+            buf += piece
+            if len(buf) >= STREAM_CHUNK_BYTES:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+
+    return chunks()
+
+
+def render_webhook_template(hook: MessageWebHook, content_format: str) -> str:
+    """模板模式：按模板渲染 JSON 字符串，只转换模板引用到的正文格式"""
+    template = hook.task.message_template or DEFAULT_WEBHOOK_TEMPLATE
+    formats = _referenced_content_formats(template, content_format)
     data = {
         "feed": hook.feed,
-        "articles": processed_articles,
+        "feeds": hook.feeds or [hook.feed],
+        "articles": [_with_content(a, formats) for a in hook.articles],
         "task": hook.task,
-        "now": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "now": datetime.now().strftime(DATETIME_FMT),
     }
+    return TemplateParser(template).render(data)
 
-    # 预处理 content 字段：JSON 转义，便于模板嵌入
-    def process_content(content: str | None) -> str:
-        if content is None:
-            return ""
-        # 进行JSON转义处理引号
-        json_escaped = json.dumps(content, ensure_ascii=False)
-        # 去掉外层引号避免重复
-        return json_escaped[1:-1]
-
-    # 处理articles中的content字段，进行JSON转义
-    if "articles" in data:
-        for i, article in enumerate(data["articles"]):
-            if isinstance(article, dict):
-                if "content" in article:
-                    data["articles"][i]["content"] = process_content(article["content"])
-            elif hasattr(article, "content"):
-                setattr(
-                    data["articles"][i],
-                    "content",
-                    process_content(getattr(article, "content")),
-                )
-
-    parser = TemplateParser(template)
-
-    payload = parser.render(data)
-    # logger.info(payload)
 
+def call_webhook(hook: MessageWebHook) -> str:
+    """调用webhook接口发送数据"""
     if not hook.task.web_hook_url:
         logger.error("web_hook_url为空")
         raise ValueError("web_hook_url 未配置")
 
+    content_format = runtime_settings.get_sync("webhook.content_format", "html")
+    payload_mode = runtime_settings.get_sync("webhook.payload_mode", PAYLOAD_MODE_TEMPLATE)
+    logger.info(f"Webhook 负载模式 {payload_mode}，Content将以{content_format}格式发送")
+
+    if payload_mode == PAYLOAD_MODE_STRUCTURED:
+        body = _request_body(iter_webhook_payload(hook, content_format))
+    else:
+        body = render_webhook_template(hook, content_format).encode("utf-8")
+
     try:
         response = requests.post(
             hook.task.web_hook_url,
-            data=payload,
-            headers={"Content-Type": "application/json"},
+            data=body,
+            headers={"Content-Type": "application/json; charset=utf-8"},
+            timeout=settings.notice_timeout,
         )
         response.raise_for_status()
         return "Webhook调用成功"
@@ -183,7 +287,7 @@ def web_hook(hook: MessageWebHook) -> str | None:
             logger.warning("没有更新到文章")
             return None
 
-        hook.articles = [_article_to_dict(a) for a in hook.articles]
+        hook.articles = [article_to_dict(a) for a in hook.articles]
 
         if hook.task.message_type == MESSAGE_TYPE_SEND:
             return send_message(hook)
@@ -1,5 +1,5 @@
 import json
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Tuple
 
 from jobs.article import UpdateArticle, Update_Over
 from core.feeds import feed_repo
@@ -7,9 +7,13 @@ from core.feeds.collector import collect_feed_articles
 from core.common.log import logger
 from core.common.task import TaskScheduler
 from core.common.runtime_settings import runtime_settings
-from core.common.utils import TaskQueue
+from core.common.app_settings import settings
+from core.common.utils import TaskQueue, get_task_queue
 from core.message_tasks.model import MessageTask
 from jobs.webhook import web_hook
+from jobs.task_run import start_run, finish_submit, record_feed_result
+
+notify_queue = get_task_queue("notify")
 
 def fetch_all_article():
     logger.info("开始更新")
@@ -36,7 +40,38 @@ def fetch_all_article():
         logger.info(f"所有公众号更新完成,共更新{total_count}条数据")
 
 
+def _subscribed_tasks(task: Any) -> List[Tuple[MessageTask, Optional[str]]]:
+    """本次采集的全部订阅者 [(任务, run_id)]：直接传入的 task + 队列合并进来的订阅者（按任务与运行去重）
+
+    订阅者为 {"task": ..., "run_id": ...}；早期入队的订阅者只有任务本身，run_id 为 None
+    """
+    subscribers: List[Tuple[MessageTask, Optional[str]]] = []
+    seen = set()
+    for sub in ([task] if task else []) + TaskQueue.take_subscribers():
+        run_id = None
+        if isinstance(sub, dict) and "task" in sub:
+            sub, run_id = sub["task"], sub.get("run_id")
+        # 从持久化队列取出时为 dict
+        if isinstance(sub, dict):
+            sub = MessageTask.model_validate(sub)
+        if (sub.id, run_id) in seen:
+            continue
+        seen.add((sub.id, run_id))
+        subscribers.append((sub, run_id))
+    return subscribers
+
+
+def send_task_message(task: Any, feed: Any, articles: List[Any]) -> None:
+    """notify 队列任务：按消息任务配置发送一次采集结果"""
+    from jobs.webhook import MessageWebHook
+
+    if isinstance(task, dict):
+        task = MessageTask.model_validate(task)
+    web_hook(MessageWebHook(task=task, feed=feed, articles=articles))
+
+
 def do_job(mp: Any = None, task: Optional[MessageTask] = None) -> None:
+    """采集一个公众号，并把结果发给所有订阅该公众号的任务"""
     logger.info("执行任务")
     articles = []
     count = 0
@@ -57,12 +92,19 @@ def do_job(mp: Any = None, task: Optional[MessageTask] = None) -> None:
     except Exception as e:
         logger.error(e)
     finally:
-        from jobs.webhook import MessageWebHook
-
-        tms = MessageWebHook(task=task, feed=mp, articles=articles)
-        web_hook(tms)
-        task_id = getattr(task, "id", "?")
-        logger.success(f"任务({task_id})[{mp_name}]执行成功,{count}成功条数")
+        subscribers = _subscribed_tasks(task)
+        for t, run_id in subscribers:
+            if run_id:
+                # 结果记到任务的本次运行，全部公众号上报后统一发送一条汇总
+                try:
+                    record_feed_result(run_id, mp, articles)
+                except Exception as e:
+                    logger.error(f"记录任务[{t.id}]运行结果失败: {e}")
+            elif articles:
+                # 消息发送放入 notify 队列，慢 webhook 不占用采集并发，失败按队列策略重试
+                notify_queue.add_task(send_task_message, t, mp, articles)
+        task_ids = ",".join(str(t.id) for t, _ in subscribers) or "?"
+        logger.success(f"任务({task_ids})[{mp_name}]执行成功,{count}成功条数")
 
 def add_job(
     feeds: Optional[List[Any]] = None,
@@ -70,19 +112,40 @@ def add_job(
     isTest: bool = False,
 ) -> None:
     if isTest:
-        TaskQueue.clear_queue()
+        # 带订阅者的采集属于进行中的运行，保留以免其汇总等到超时
+        TaskQueue.clear_queue(keep_subscribed=True)
+    if isinstance(task, dict):
+        task = MessageTask.model_validate(task)
+    # 一次运行的各公众号结果汇总后只发送一次消息
+    run_id = start_run(task) if task else None
+    subscriber = {"task": task, "run_id": run_id} if task else None
+    submitted = 0
+    avoided = 0
     for feed in feeds or []:
         # 兼容 dict / 对象两种形式，安全获取名称
         mp_name = getattr(feed, "mp_name", None) or getattr(feed, "name", None) or (
             (feed.get("mp_name") or feed.get("name")) if isinstance(feed, dict) else "未知公众号"
         )
 
-        TaskQueue.add_task(do_job, feed, task)
+        feed_id = getattr(feed, "id", None) or (feed.get("id") if isinstance(feed, dict) else None)
+        # 按公众号合并：已在排队/采集中的公众号只采集一次，本任务作为订阅者接收结果
+        job_id = TaskQueue.add_task(
+            do_job, feed, dedup_key=f"collect:{feed_id}", subscriber=subscriber
+        )
+        submitted += 1
         if isTest:
             logger.info(f"测试任务，{mp_name}，加入队列成功")
             reload_job()
             break
-        logger.info(f"{mp_name}，加入队列成功")
+        if job_id is None:
+            avoided += 1
+            logger.info(f"{mp_name}，已在队列中，合并到已有采集")
+        else:
+            logger.info(f"{mp_name}，加入队列成功")
+    if avoided:
+        logger.info(f"本次提交避免重复采集 {avoided} 个公众号")
+    if run_id:
+        finish_submit(run_id, submitted)
     logger.success(TaskQueue.get_queue_info())
 
 def get_feeds(task: Optional[MessageTask] = None) -> Optional[List[Any]]:
@@ -107,14 +170,36 @@ def get_feeds(task: Optional[MessageTask] = None) -> Optional[List[Any]]:
     return feed_repo.sync_get_feeds()
 
 scheduler = TaskScheduler()
+# 调度选主的租约名
+SCHEDULER_LEASE = "scheduler"
 
-def reload_job():
-    logger.success("重载任务")
+def _rebuild_jobs() -> None:
     scheduler.clear_all_jobs()
-    TaskQueue.clear_queue()
+    TaskQueue.clear_queue(keep_subscribed=True)
     start_job()
 
 
+def reload_job():
+    """重载定时任务；开启选主时只在调度主节点上重建，其他节点通知主节点在下次续约时重载"""
+    logger.success("重载任务")
+    leader = scheduler_leader
+    if settings.scheduler_leader_election and not (
+        leader is not None and (leader.is_leader or leader.unavailable)
+    ):
+        from core.common.task.leader import request_reload
+        from core.integrations.supabase.client import supabase_client
+
+        try:
+            if request_reload(supabase_client, SCHEDULER_LEASE):
+                logger.info("已通知调度主节点重载任务")
+            else:
+                logger.warning("当前没有调度主节点，任务将在选出主节点后加载")
+        except Exception as e:
+            logger.error(f"通知调度主节点重载任务失败: {e}")
+        return
+    _rebuild_jobs()
+
+
 def run(job_id: Optional[str] = None, isTest: bool = False):
     from .taskmsg import get_message_task
 
@@ -163,6 +248,45 @@ def start_all_task():
     start_job()
 
 
+def stop_all_task():
+    """移除所有定时任务（失去调度主节点身份时调用），已入队的任务照常执行完"""
+    from jobs.fetch_no_article import scheduler as content_scheduler
+
+    scheduler.clear_all_jobs()
+    content_scheduler.clear_all_jobs()
+    logger.warning("已停止定时任务")
+
+
+scheduler_leader = None
+
+
+def start_scheduler():
+    """启动定时任务；开启选主时仅在当选调度主节点后启动，落选/失联时停止"""
+    global scheduler_leader
+    if not settings.scheduler_leader_election:
+        start_all_task()
+        return
+    from core.common.task.leader import LeaderElector
+    from core.integrations.supabase.client import supabase_client
+
+    scheduler_leader = LeaderElector(
+        supabase_client,
+        name=SCHEDULER_LEASE,
+        on_elected=start_all_task,
+        on_demoted=stop_all_task,
+        # 未执行租约迁移时按单实例运行，不让定时任务静默停止
+        on_unavailable=start_all_task,
+        on_reload=_rebuild_jobs,
+        ttl=settings.scheduler_lease_ttl,
+    )
+    scheduler_leader.start()
+
+
+def stop_scheduler():
+    if scheduler_leader is not None:
+        scheduler_leader.stop()
+
+
 if __name__ == "__main__":
     # do_job()
     # start_all_task()
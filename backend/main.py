@@ -1,7 +1,7 @@
 import threading
 import asyncio
 import argparse
-import uvicorn
+import signal
 
 from core.common.app_settings import settings
 from core.common.log import configure_logger
@@ -13,6 +13,7 @@ def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("-job", help="启动任务", default=False)
     parser.add_argument("-init", help="初始化数据库,初始化用户", default=False)
+    parser.add_argument("-web", help="启动 Web 服务，False 时只运行定时任务", default=True)
     return parser.parse_known_args()[0]
 
 
@@ -20,6 +21,28 @@ def log_app_banner() -> None:
     logger.info(f"名称:{settings.app_name}\n版本:{VERSION} API_BASE:{API_BASE}")
 
 
+def run_jobs_only() -> None:
+    """只运行定时任务、任务队列与通知发送，不导入 uvicorn / FastAPI 及各路由"""
+    from core.common.utils.task_queue import start_all_queues, stop_all_queues
+    from core.common.image_variants import variant_encoder
+    from core.integrations.notice import notice_dispatcher
+    from jobs.wechat_accounts import start_scheduler, stop_scheduler
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    start_all_queues()
+    notice_dispatcher.start()
+    start_scheduler()
+    logger.info("定时任务进程已启动（未启动 Web 服务）")
+    stop.wait()
+    stop_scheduler()
+    notice_dispatcher.stop()
+    stop_all_queues()
+    variant_encoder.shutdown()
+
+
 if __name__ == "__main__":
     args = parse_args()
     configure_logger(level=settings.log_level, log_file=settings.log_file)
@@ -28,13 +51,22 @@ if __name__ == "__main__":
         import init_sys as init
 
         asyncio.run(init.init())
-    if args.job == "True" and settings.enable_job:
-        from jobs.wechat_accounts import start_all_task
+    job_enabled = args.job == "True" and settings.enable_job
+    if str(args.web) == "False":
+        if not job_enabled:
+            logger.warning("未开启定时任务，也未启动 Web 服务，直接退出")
+        else:
+            run_jobs_only()
+        raise SystemExit(0)
+    if job_enabled:
+        from jobs.wechat_accounts import start_scheduler
 
-        threading.Thread(target=start_all_task, daemon=False).start()
+        threading.Thread(target=start_scheduler, daemon=False).start()
     else:
         logger.warning("未开启定时任务")
     logger.info("启动服务器")
+    import uvicorn
+
     auto_reload = settings.auto_reload
     workers = settings.threads
     if auto_reload and workers > 1:
@@ -57,4 +89,8 @@ if __name__ == "__main__":
         )
 
     uvicorn.run(**run_kwargs)
-    pass
+    if job_enabled:
+        from jobs.wechat_accounts import stop_scheduler
+
+        # 主动释放调度租约，其他节点无需等待过期即可接管
+        stop_scheduler()
@@ -0,0 +1,27 @@
+from core.common.lax import TemplateParser
+
+
+def test_for_over_dict_field():
+    template = "{% for t in a.tags %}[{{ t }}]{% endfor %}"
+    assert TemplateParser(template).render({"a": {"tags": ["x", "y"]}}) == "[x]\n[y]"
+
+
+def test_nested_for_over_dict_field():
+    template = (
+        "{% for a in articles %}{{ a.title }}:"
+        "{% for t in a.tags %}{{ t }}{% if not loop.last %},{% endif %}{% endfor %}"
+        "{% endfor %}"
+    )
+    context = {
+        "articles": [
+            {"title": "一", "tags": ["x", "y"]},
+            {"title": "二", "tags": []},
+            {"title": "三"},
+        ]
+    }
+    assert TemplateParser(template).render(context) == "一:x,\ny\n二:\n三:"
+
+
+def test_for_over_missing_path_renders_nothing():
+    template = "{% for t in a.b.c %}{{ t }}{% endfor %}"
+    assert TemplateParser(template).render({"a": {}}) == ""
@@ -1,3 +1,4 @@
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, APIRouter
@@ -13,25 +14,41 @@ from apis.message_task import router as task_router
 from apis.sys_info import router as sys_info_router
 from apis.tags import router as tags_router
 from apis.events import router as events_router
+from apis.metrics import router as metrics_router
 
 from core.common.app_settings import settings
 from core.common.log import configure_logger
+from core.common.metrics import histogram
 from core.common.base import VERSION, API_BASE
-from core.common.utils import TaskQueue
+from core.common.utils.task_queue import start_all_queues, stop_all_queues
+from core.integrations.notice import notice_dispatcher
+from core.common.res.image_cache import image_cache
+from core.common.image_variants import variant_encoder
+from core.articles.retention import retention_job
 
 configure_logger(level=settings.log_level, log_file=settings.log_file)
 
+HTTP_SECONDS = histogram(
+    "http_request_duration_seconds", "HTTP 请求耗时", ["method", "route", "status"]
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # 应用启动时启动后台任务队列
-    TaskQueue.run_task_background()
+    # 应用启动时启动各命名任务队列（继续执行上次退出时未完成的任务）
+    start_all_queues()
+    # 继续发送发件箱中上次退出时未送达的通知
+    notice_dispatcher.start()
+    # 续跑上次进程退出时未完成的过期文章清理
+    retention_job.resume_interrupted()
     try:
         yield
     finally:
-        # 应用关闭时停止并清理任务队列
-        TaskQueue.stop()
-        TaskQueue.clear_queue()
+        # 应用关闭时停止领取任务，未完成的任务留在队列中
+        stop_all_queues()
+        notice_dispatcher.stop()
+        await image_cache.aclose()
+        variant_encoder.shutdown()
 
 
 app = FastAPI(
@@ -67,7 +84,20 @@ app.add_middleware(
 
 @app.middleware("http")
 async def add_custom_header(request: Request, call_next):
-    response = await call_next(request)
+    start = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+    finally:
+        # 以路由模板作标签（/articles/{id}），未匹配的路径归为 unmatched，避免标签基数膨胀
+        route = request.scope.get("route")
+        HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
     response.headers["X-Version"] = VERSION
     response.headers["X-Powered-By"] = "Phoenine"
     response.headers["GITHUB"] = "https://github.com/phoenine/wechat-events-harvester"
@@ -93,3 +123,4 @@ resource_router.include_router(res_router)
 # 注册API路由分组
 app.include_router(api_router)
 app.include_router(resource_router)
+app.include_router(metrics_router)
@@ -30,6 +30,7 @@ export interface Article {
  * @property search 搜索关键词
  * @property status 文章状态
  * @property mp_id 公众号ID
+ * @property cursor 上一页返回的 next_cursor（传入后忽略 page）
  */
 export interface ArticleListParams {
   page?: number
@@ -37,6 +38,7 @@ export interface ArticleListParams {
   search?: string
   status?: number
   mp_id?: string
+  cursor?: string
 }
 
 /**
@@ -71,6 +73,9 @@ export const getArticles = (params: ArticleListParams) => {
   if (params.mp_id !== undefined && String(params.mp_id).trim() !== '') {
     apiParams.mp_id = params.mp_id
   }
+  if (params.cursor) {
+    apiParams.cursor = params.cursor
+  }
   return http.get<ArticleListResult>('/wx/articles', {
     params: apiParams,
   })
@@ -0,0 +1,31 @@
+-- 文章清理：在数据库内做集合运算找出待删 id，后端只拿 id 分批删除
+
+-- 孤儿文章：mp_id 为空或对应公众号已不存在（anti-join）
+create or replace function public.find_orphan_article_ids(p_limit integer default 500)
+returns table (id text)
+language sql stable as $$
+  select a.id
+  from public.articles a
+  where not exists (select 1 from public.feeds f where f.id = a.mp_id)
+  limit greatest(1, coalesce(p_limit, 500));
+$$;
+
+-- 重复文章：同一 (mp_id, title) 只保留最新一篇（publish_time, id 最大）
+create or replace function public.find_duplicate_article_ids(p_limit integer default 500)
+returns table (id text)
+language sql stable as $$
+  select t.id
+  from (
+    select a.id,
+           row_number() over (
+             partition by a.mp_id, a.title
+             order by a.publish_time desc nulls last, a.id desc
+           ) as rn
+    from public.articles a
+  ) t
+  where t.rn > 1
+  limit greatest(1, coalesce(p_limit, 500));
+$$;
+
+create index if not exists idx_articles_mp_title_publish_id
+  on public.articles (mp_id, title, publish_time desc, id desc);
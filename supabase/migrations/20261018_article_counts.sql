@@ -0,0 +1,78 @@
+-- 文章计数缓存：按公众号维护 total / with_content，避免列表分页与 /sys/info 对 articles 做 exact count 全表扫描
+-- mp_id 为空的文章记在 '' 键下
+
+create table if not exists public.article_counts (
+  mp_id text primary key,
+  total bigint not null default 0,
+  with_content bigint not null default 0,
+  updated_at timestamptz not null default now()
+);
+
+-- 语句级触发器：批量写入/删除只做一次按 mp_id 聚合的 upsert
+create or replace function public.article_counts_apply()
+returns trigger language plpgsql security definer set search_path = public as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into public.article_counts as c (mp_id, total, with_content)
+    select coalesce(mp_id, ''), count(*), count(content)
+    from new_rows
+    group by 1
+    on conflict (mp_id) do update
+      set total = c.total + excluded.total,
+          with_content = c.with_content + excluded.with_content,
+          updated_at = now();
+  end if;
+
+  if tg_op in ('DELETE', 'UPDATE') then
+    insert into public.article_counts as c (mp_id, total, with_content)
+    select coalesce(mp_id, ''), -count(*), -count(content)
+    from old_rows
+    group by 1
+    on conflict (mp_id) do update
+      set total = c.total + excluded.total,
+          with_content = c.with_content + excluded.with_content,
+          updated_at = now();
+  end if;
+
+  return null;
+end $$;
+
+drop trigger if exists trg_article_counts_insert on public.articles;
+create trigger trg_article_counts_insert
+after insert on public.articles
+referencing new table as new_rows
+for each statement execute function public.article_counts_apply();
+
+drop trigger if exists trg_article_counts_update on public.articles;
+create trigger trg_article_counts_update
+after update on public.articles
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.article_counts_apply();
+
+drop trigger if exists trg_article_counts_delete on public.articles;
+create trigger trg_article_counts_delete
+after delete on public.articles
+referencing old table as old_rows
+for each statement execute function public.article_counts_apply();
+
+-- 全量校准（迁移时执行一次；计数漂移时可手动调用 select public.refresh_article_counts();）
+create or replace function public.refresh_article_counts()
+returns void language plpgsql security definer set search_path = public as $$
+begin
+  lock table public.article_counts in exclusive mode;
+  delete from public.article_counts;
+  insert into public.article_counts (mp_id, total, with_content)
+  select coalesce(mp_id, ''), count(*), count(content)
+  from public.articles
+  group by 1;
+end $$;
+
+select public.refresh_article_counts();
+
+alter table public.article_counts enable row level security;
+
+drop policy if exists "认证用户可以查看文章计数" on public.article_counts;
+create policy "认证用户可以查看文章计数"
+on public.article_counts for select
+to authenticated
+using (true);
@@ -0,0 +1,10 @@
+-- 文章图片派生图（WebP/AVIF 多宽度）：与原图一起登记在 article_images 中，
+-- 删除文章时按映射一并删除 storage 对象
+-- variant 为空表示原图，否则形如 webp-720；source_path 指向派生图对应的原图对象
+
+alter table public.article_images
+  add column if not exists variant text not null default '',
+  add column if not exists source_path text not null default '',
+  add column if not exists width integer,
+  add column if not exists bytes bigint,
+  add column if not exists content_type text;
@@ -0,0 +1,80 @@
+-- 文章全文检索：入库时由后端预分词（中文二元组 + 英文单词）写入 search_title / search_body，
+-- 生成列 search_vector 以 'simple' 配置建 GIN 索引，标题权重 A、正文权重 B
+
+alter table public.articles add column if not exists search_title text;
+alter table public.articles add column if not exists search_body text;
+
+alter table public.articles add column if not exists search_vector tsvector
+  generated always as (
+    setweight(to_tsvector('simple', coalesce(search_title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(search_body, '')), 'B')
+  ) stored;
+
+create index if not exists idx_articles_search_vector
+  on public.articles using gin (search_vector);
+
+-- 检索：按 (rank desc, id desc) 排序，after_rank/after_id 为上一页最后一行（keyset 分页）；
+-- p_offset 仅为旧版页码翻页保留。
+-- 不返回整篇 content_md：excerpt 为正文中首个命中词（p_terms，不区分大小写）前后 p_excerpt_chars 个字符，
+-- 无命中时取开头，后端据此生成高亮摘要
+drop function if exists public.search_articles(text, text, integer, real, text, integer);
+create or replace function public.search_articles(
+  q text,
+  p_mp_id text default null,
+  p_limit integer default 20,
+  after_rank real default null,
+  after_id text default null,
+  p_offset integer default 0,
+  p_terms text[] default null,
+  p_excerpt_chars integer default 600
+)
+returns table (
+  id text,
+  mp_id text,
+  title text,
+  url text,
+  publish_time bigint,
+  is_gathered boolean,
+  excerpt text,
+  rank real
+)
+language sql stable as $$
+  with query as (select to_tsquery('simple', q) as tsq),
+  hits as (
+    select a.id, a.mp_id, a.title, a.url, a.publish_time, a.is_gathered,
+           ts_rank(a.search_vector, query.tsq) as rank
+    from public.articles a, query
+    where a.search_vector @@ query.tsq
+      and (p_mp_id is null or a.mp_id = p_mp_id)
+  ),
+  page as (
+    select * from hits
+    where after_rank is null or (hits.rank, hits.id) < (after_rank, after_id)
+    order by hits.rank desc, hits.id desc
+    limit greatest(1, least(coalesce(p_limit, 20), 100))
+    offset greatest(0, coalesce(p_offset, 0))
+  )
+  select p.id, p.mp_id, p.title, p.url, p.publish_time, p.is_gathered,
+         substr(
+           coalesce(a.content_md, ''),
+           greatest(1, coalesce(pos.first_hit, 1) - greatest(1, coalesce(p_excerpt_chars, 600)) / 4),
+           greatest(1, coalesce(p_excerpt_chars, 600))
+         ) as excerpt,
+         p.rank
+  from page p
+  join public.articles a on a.id = p.id
+  left join lateral (
+    select min(nullif(strpos(lower(coalesce(a.content_md, '')), lower(t)), 0)) as first_hit
+    from unnest(coalesce(p_terms, '{}'::text[])) as t
+  ) pos on true
+  order by p.rank desc, p.id desc;
+$$;
+
+create or replace function public.search_articles_count(q text, p_mp_id text default null)
+returns bigint
+language sql stable as $$
+  select count(*)
+  from public.articles a
+  where a.search_vector @@ to_tsquery('simple', q)
+    and (p_mp_id is null or a.mp_id = p_mp_id);
+$$;
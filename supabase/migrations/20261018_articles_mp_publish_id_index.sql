@@ -0,0 +1,7 @@
+-- 文章上一篇/下一篇导航：
+-- 按 (mp_id, publish_time, id) 建复合索引，支撑
+--   publish_time < x (或 = x 且 id < y) order by publish_time desc, id desc limit 1
+-- 及反方向查询，单次导航只需一次索引定位。
+
+create index if not exists idx_articles_mp_publish_id
+  on public.articles (mp_id, publish_time desc, id desc);
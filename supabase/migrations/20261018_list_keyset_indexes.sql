@@ -0,0 +1,18 @@
+-- 列表接口 keyset（游标）分页索引：排序列 + 主键兜底，保证翻页顺序稳定且无需 offset 扫描
+
+-- 文章列表（全部公众号）：order by publish_time desc, id desc
+create index if not exists idx_articles_publish_id
+  on public.articles (publish_time desc, id desc);
+
+-- 公众号列表：order by created_at, id
+create index if not exists idx_feeds_created_id
+  on public.feeds (created_at, id);
+
+-- 活动记录列表：order by created_at desc, id desc（events 表可能尚未创建）
+do $$
+begin
+  if to_regclass('public.events') is not null then
+    execute 'create index if not exists idx_events_created_id on public.events (created_at desc, id desc)';
+    execute 'create index if not exists idx_events_article_created_id on public.events (article_id, created_at desc, id desc)';
+  end if;
+end $$;
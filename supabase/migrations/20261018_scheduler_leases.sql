@@ -0,0 +1,61 @@
+-- 调度器选主：多实例部署时只有持有租约的节点运行定时采集
+-- 租约行 + 心跳续约；持有者停止续约超过 ttl 后其他节点即可接管
+
+create table if not exists public.scheduler_leases (
+  name text primary key,
+  holder text not null,
+  acquired_at timestamptz not null default now(),
+  heartbeat_at timestamptz not null default now(),
+  expires_at timestamptz not null
+);
+-- 重载版本：任意节点请求重载定时任务时递增，主节点续约时发现变化后重建任务
+alter table public.scheduler_leases add column if not exists reload_version bigint not null default 0;
+
+-- 获取或续约：无人持有 / 已过期 / 本就是自己持有时成功，返回是否持有
+create or replace function public.acquire_scheduler_lease(
+  p_name text,
+  p_holder text,
+  p_ttl_seconds integer
+)
+returns boolean language plpgsql security definer set search_path = public as $$
+declare
+  v_holder text;
+begin
+  insert into public.scheduler_leases as l (name, holder, expires_at)
+  values (p_name, p_holder, now() + make_interval(secs => p_ttl_seconds))
+  on conflict (name) do update
+    set holder = excluded.holder,
+        acquired_at = case when l.holder = excluded.holder then l.acquired_at else now() end,
+        heartbeat_at = now(),
+        expires_at = excluded.expires_at
+    where l.holder = excluded.holder or l.expires_at < now()
+  returning holder into v_holder;
+  return v_holder is not null;
+end $$;
+
+-- 主动释放（正常退出时调用），其他节点无需等待过期
+create or replace function public.release_scheduler_lease(p_name text, p_holder text)
+returns void language sql security definer set search_path = public as $$
+  delete from public.scheduler_leases where name = p_name and holder = p_holder;
+$$;
+
+-- 请求主节点重载定时任务，返回新的重载版本；当前无人持有租约时返回 null
+create or replace function public.request_scheduler_reload(p_name text)
+returns bigint language sql security definer set search_path = public as $$
+  update public.scheduler_leases set reload_version = reload_version + 1
+  where name = p_name and expires_at >= now()
+  returning reload_version;
+$$;
+
+create or replace function public.scheduler_reload_version(p_name text)
+returns bigint language sql stable security definer set search_path = public as $$
+  select reload_version from public.scheduler_leases where name = p_name;
+$$;
+
+alter table public.scheduler_leases enable row level security;
+
+drop policy if exists "认证用户可以查看调度租约" on public.scheduler_leases;
+create policy "认证用户可以查看调度租约"
+on public.scheduler_leases for select
+to authenticated
+using (true);